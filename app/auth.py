@@ -4,8 +4,10 @@ from typing import List
 from pydantic import BaseModel, EmailStr
 
 from supabase_auth.errors import AuthApiError
+import jwt
 
-from app.utils.database import supabase
+from app.utils.database import supabase, get_async_supabase, ASYNC_ENDPOINTS
+from app.utils import jwt_verifier
 from app.services.user_service import UserService
 from app import schemas
 
@@ -15,75 +17,134 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 
 # ============== AUTH HELPERS ==============
 
-def get_current_user(
+def _verify_locally(token: str):
+    """
+    AUTH_MODE=local: verifies the JWT in-process against the cached signing keys.
+    Returns the auth user, or None when the key is unknown locally and the Supabase auth
+    server has to decide.
+    """
+    try:
+        return jwt_verifier.claims_to_auth_user(jwt_verifier.verify_token(token))
+    except jwt_verifier.UnknownSigningKey:
+        return None
+    except jwt.InvalidTokenError:
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+
+async def _verify_locally_async(token: str):
+    try:
+        claims = await jwt_verifier.verify_token_async(token)
+        return jwt_verifier.claims_to_auth_user(claims)
+    except jwt_verifier.UnknownSigningKey:
+        return None
+    except jwt.InvalidTokenError:
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+
+def _authenticate_token(token: str):
+    if jwt_verifier.AUTH_MODE == "local":
+        auth_user = _verify_locally(token)
+        if auth_user:
+            return auth_user
+
+    user_response = supabase.auth.get_user(token)
+    if not user_response or not user_response.user:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    return user_response.user
+
+
+async def _authenticate_token_async(token: str):
+    if jwt_verifier.AUTH_MODE == "local":
+        auth_user = await _verify_locally_async(token)
+        if auth_user:
+            return auth_user
+
+    user_response = await get_async_supabase().auth.get_user(token)
+    if not user_response or not user_response.user:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    return user_response.user
+
+
+def _is_stack_depth_error(error: Exception) -> bool:
+    # PostgreSQL error 54001, raised by recursive RLS policies/triggers
+    error_str = str(error)
+    return any(keyword in error_str.lower() for keyword in ["stack depth", "54001", "max_stack_depth"])
+
+
+def _minimal_user(auth_user) -> schemas.User:
+    """User built from auth data when the profile row is missing or unreadable."""
+    user_metadata = getattr(auth_user, "user_metadata", {}) or {}
+    if not isinstance(user_metadata, dict):
+        user_metadata = {}
+
+    return schemas.User(
+        user_id=auth_user.id,
+        email=getattr(auth_user, "email", ""),
+        full_name=user_metadata.get("full_name"),
+        tier_id=None,
+        role=schemas.UserRole.USER,
+        is_active=True,
+        storage_used_mb=0.0,
+        email_verified=getattr(auth_user, "email_confirmed_at") is not None,
+        last_login_at=None,
+        created_at=None,
+        deleted_at=None
+    )
+
+
+def _profile_error(auth_user, db_error: Exception) -> schemas.User:
+    if _is_stack_depth_error(db_error):
+        # Database has recursive trigger/RLS issue - create minimal user from auth
+        # This is a temporary workaround until database policies/triggers are fixed
+        return _minimal_user(auth_user)
+    # Re-raise if it's a different error
+    raise db_error
+
+
+def _authentication_failed(e: Exception) -> HTTPException:
+    if isinstance(e, HTTPException):
+        return e
+    return HTTPException(
+        status_code=401,
+        detail=f"Authentication failed: {str(e)}",
+    )
+
+
+def get_current_user_sync(
     credentials: HTTPAuthorizationCredentials = Depends(security),
 ) -> schemas.User:
-    token = credentials.credentials
     try:
-        user_response = supabase.auth.get_user(token)
-        if not user_response or not user_response.user:
-            raise HTTPException(status_code=401, detail="Invalid token")
+        auth_user = _authenticate_token(credentials.credentials)
 
-        user_id = user_response.user.id
-        auth_user = user_response.user
-        
         # Try to get user profile from database
         # If it fails due to stack depth (recursive RLS/trigger), create minimal user from auth data
         try:
-            user = UserService.get_user_by_id(user_id)
-            if user:
-                return user
+            user = UserService.get_user_by_id(auth_user.id)
         except Exception as db_error:
-            # Check if it's a stack depth error (PostgreSQL error 54001)
-            error_str = str(db_error)
-            if any(keyword in error_str.lower() for keyword in ["stack depth", "54001", "max_stack_depth"]):
-                # Database has recursive trigger/RLS issue - create minimal user from auth
-                # This is a temporary workaround until database policies/triggers are fixed
-                user_metadata = getattr(auth_user, "user_metadata", {}) or {}
-                if not isinstance(user_metadata, dict):
-                    user_metadata = {}
-                    
-                return schemas.User(
-                    user_id=user_id,
-                    email=getattr(auth_user, "email", ""),
-                    full_name=user_metadata.get("full_name"),
-                    tier_id=None,
-                    role=schemas.UserRole.USER,
-                    is_active=True,
-                    storage_used_mb=0.0,
-                    email_verified=getattr(auth_user, "email_confirmed_at") is not None,
-                    last_login_at=None,
-                    created_at=None,
-                    deleted_at=None
-                )
-            # Re-raise if it's a different error
-            raise
-        
+            return _profile_error(auth_user, db_error)
+
         # User profile not found in database - create minimal user from auth
-        user_metadata = getattr(auth_user, "user_metadata", {}) or {}
-        if not isinstance(user_metadata, dict):
-            user_metadata = {}
-            
-        return schemas.User(
-            user_id=user_id,
-            email=getattr(auth_user, "email", ""),
-            full_name=user_metadata.get("full_name"),
-            tier_id=None,
-            role=schemas.UserRole.USER,
-            is_active=True,
-            storage_used_mb=0.0,
-            email_verified=getattr(auth_user, "email_confirmed_at") is not None,
-            last_login_at=None,
-            created_at=None,
-            deleted_at=None
-        )
+        return user or _minimal_user(auth_user)
     except Exception as e:
-        if isinstance(e, HTTPException):
-            raise e
-        raise HTTPException(
-            status_code=401,
-            detail=f"Authentication failed: {str(e)}",
-        )
+        raise _authentication_failed(e)
+
+
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+) -> schemas.User:
+    """get_current_user on the event loop and the async Supabase client (ASYNC_ENDPOINTS)"""
+    try:
+        auth_user = await _authenticate_token_async(credentials.credentials)
+        try:
+            user = await UserService.get_user_by_id_async(auth_user.id)
+        except Exception as db_error:
+            return _profile_error(auth_user, db_error)
+        return user or _minimal_user(auth_user)
+    except Exception as e:
+        raise _authentication_failed(e)
+
+
+get_current_user = get_current_user_async if ASYNC_ENDPOINTS else get_current_user_sync
 
 
 class RoleChecker:
@@ -1,3 +1,5 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
 # Keep the application factory / app object here and include routers from submodules.
@@ -16,11 +18,27 @@ from app.routers import (
     markers,
     export_jobs,
     recording_tags,
+    search,
     admin
 )
 
+from app.utils.audit import shutdown_audit_writer
+from app.utils.database import close_async_supabase
+from app.utils.render_pool import shutdown_render_pool
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Write audit events still waiting in memory before the process exits
+    shutdown_audit_writer()
+    # Stop export render workers (no-op when they were never started)
+    shutdown_render_pool()
+    # Release pooled keep-alive connections of the async Supabase client
+    await close_async_supabase()
+
 
-app = FastAPI(title="Meeting Summary API")
+app = FastAPI(title="Meeting Summary API", lifespan=lifespan)
 
 # include auth endpoints
 app.include_router(auth_router)
@@ -37,6 +55,7 @@ app.include_router(ai_usage_logs.router)
 app.include_router(markers.router)  # Now uses /recordings/{id}/markers
 app.include_router(recording_tags.router)  # Now uses /recordings/{id}/tags
 app.include_router(export_jobs.router)  # Now uses /recordings/{id}/export
+app.include_router(search.router)
 
 app.include_router(admin.router)
 
@@ -1,8 +1,8 @@
 from fastapi import APIRouter, HTTPException, status, Query, Depends
 from typing import List, Optional
 from app import schemas
-from app.services.user_service import UserService
-from app.services.tier_service import TierService
+from app.services.user_service import UserService, user_cache
+from app.services.tier_service import TierService, tier_cache
 from app.auth import RoleChecker
 
 router = APIRouter(
@@ -61,6 +61,31 @@ def delete_tier(tier_id: int):
     TierService.delete_tier(tier_id)
     return None
 
+@router.get("/cache-stats")
+def get_cache_stats():
+    from app.utils import transcription_cache, signed_urls
+    return {
+        "users": user_cache.stats(),
+        "tiers": tier_cache.stats(),
+        "signed_urls": signed_urls.stats(),
+        "transcriptions": transcription_cache.stats()
+    }
+
+@router.post("/cache/invalidate", status_code=status.HTTP_204_NO_CONTENT)
+def invalidate_caches(
+    user_id: Optional[str] = Query(None, description="Only drop this user's profile"),
+    tier_id: Optional[int] = Query(None, description="Only drop this tier")
+):
+    # For rows changed directly in the database (SQL editor, migrations)
+    if user_id is None and tier_id is None:
+        user_cache.clear()
+        tier_cache.clear()
+    if user_id is not None:
+        user_cache.invalidate(user_id)
+    if tier_id is not None:
+        tier_cache.invalidate(tier_id)
+    return None
+
 @router.get("/audit-logs", response_model=List[schemas.AuditLogWithUser])
 def get_audit_logs(
     user_id: Optional[str] = Query(None, description="Filter by user ID"),
@@ -1,5 +1,5 @@
-from fastapi import APIRouter, HTTPException, status, BackgroundTasks
-from typing import List
+from fastapi import APIRouter, HTTPException, status
+from typing import List, Optional, Literal
 from pydantic import BaseModel
 
 from app import schemas
@@ -10,14 +10,16 @@ router = APIRouter(prefix="/recordings", tags=["Export Jobs"])
 
 
 class ExportRequest(BaseModel):
-    export_type: str  # "TRANSCRIPT_PDF", "TRANSCRIPT_DOCX", "SUMMARY_PDF", "SUMMARY_DOCX", "FULL_ZIP"
+    export_type: str  # "TRANSCRIPT_PDF", "TRANSCRIPT_DOCX", "TRANSCRIPT_SRT", "TRANSCRIPT_VTT", "TRANSCRIPT_JSONL", "SUMMARY_PDF", "SUMMARY_DOCX", "FULL_ZIP"
+    bundle_formats: Optional[List[Literal["docx", "json", "srt"]]] = None  # FULL_ZIP only
 
 
 @router.post("/{recording_id}/export", response_model=schemas.ExportJob, status_code=status.HTTP_201_CREATED)
-def create_export_job(recording_id: str, request: ExportRequest, background_tasks: BackgroundTasks):
+def create_export_job(recording_id: str, request: ExportRequest):
     """
     Create an export job for a recording.
-    Export types: TRANSCRIPT_PDF, TRANSCRIPT_DOCX, SUMMARY_PDF, SUMMARY_DOCX, FULL_ZIP
+    Export types: TRANSCRIPT_PDF, TRANSCRIPT_DOCX, TRANSCRIPT_SRT, TRANSCRIPT_VTT, TRANSCRIPT_JSONL,
+    SUMMARY_PDF, SUMMARY_DOCX, FULL_ZIP
     """
     # Verify recording exists
     recording = RecordingService.get_recording_by_id(recording_id)
@@ -25,7 +27,8 @@ def create_export_job(recording_id: str, request: ExportRequest, background_task
         raise HTTPException(status_code=404, detail="Recording not found")
 
     # Validate export type
-    valid_types = ["TRANSCRIPT_PDF", "TRANSCRIPT_DOCX", "SUMMARY_PDF", "SUMMARY_DOCX", "FULL_ZIP"]
+    valid_types = ["TRANSCRIPT_PDF", "TRANSCRIPT_DOCX", "TRANSCRIPT_SRT", "TRANSCRIPT_VTT", "TRANSCRIPT_JSONL",
+                   "SUMMARY_PDF", "SUMMARY_DOCX", "FULL_ZIP"]
     if request.export_type not in valid_types:
         raise HTTPException(
             status_code=400,
@@ -58,35 +61,22 @@ def create_export_job(recording_id: str, request: ExportRequest, background_task
                 detail="No summary available for this recording. Please generate summary first."
             )
 
-    # Create export job
-    job_data = schemas.ExportJobCreate(
-        user_id=recording.user_id,
-        recording_id=recording_id,
-        export_type=request.export_type,
-        status=schemas.ExportStatus.PENDING
-    )
-
-    job = ExportJobService.create_export_job(job_data)
-
-    # Add background task to process export
-    # DEBUG: Run synchronously to catch errors
-    # background_tasks.add_task(
-    #     ExportJobService.process_export_job,
-    #     job.export_id
-    # )
-    ExportJobService.process_export_job(job.export_id)
+    # Create export job: DONE right away when an identical export already exists, otherwise
+    # PENDING and queued for the background worker (PROCESSING -> DONE / FAILED)
+    options = {"bundle_formats": request.bundle_formats} if request.bundle_formats else None
+    job = ExportJobService.start_export(recording.user_id, recording_id, request.export_type, options)
 
     return job
 
 
-@router.get("/{recording_id}/exports", response_model=List[schemas.ExportJob])
+@router.get("/{recording_id}/exports", response_model=List[schemas.ExportJobDetail])
 def get_recording_exports(recording_id: str):
-    """Get all export jobs for a specific recording"""
+    """Get all export jobs for a specific recording, with download URLs for finished ones"""
     recording = RecordingService.get_recording_by_id(recording_id)
     if not recording:
         raise HTTPException(status_code=404, detail="Recording not found")
 
-    return ExportJobService.get_exports_by_recording_id(recording_id)
+    return ExportJobService.get_exports_with_download_urls(recording_id)
 
 
 # Export job management endpoints
@@ -121,10 +111,10 @@ def delete_export_job(export_id: str):
     if not job:
         raise HTTPException(status_code=404, detail="Export Job not found")
 
-    # Delete file from storage if exists
+    # Delete file from storage if exists (and no other job shares the cached artifact)
     if job.file_path:
         try:
-            ExportJobService.delete_export_file(job['file_path'])
+            ExportJobService.release_export_file(export_id, job.file_path)
         except Exception as e:
             print(f"Error deleting export file: {e}")
 
@@ -13,18 +13,33 @@ router = APIRouter(prefix="/recordings", tags=["Markers"])
 def get_recording_markers(recording_id: str, current_user: schemas.User = Depends(get_current_user)):
     """Get all markers for a specific recording"""
     # Verify ownership
-    recording = RecordingService.get_recording_details(current_user.user_id, recording_id)
+    recording = RecordingService.check_recording_access(current_user.user_id, recording_id)
     if not recording:
         raise HTTPException(status_code=404, detail="Recording not found")
 
     return MarkerService.get_markers_by_recording_id(recording_id)
 
 
+@router.get("/{recording_id}/markers/segments", response_model=List[schemas.MarkerSegments])
+def get_marker_segments(
+    recording_id: str,
+    transcript_id: Optional[str] = None,
+    context: int = Query(2, ge=0, le=20),
+    current_user: schemas.User = Depends(get_current_user)
+):
+    """The transcript lines around each marker: the segment at the marker plus `context` on either side"""
+    recording = RecordingService.check_recording_access(current_user.user_id, recording_id)
+    if not recording:
+        raise HTTPException(status_code=404, detail="Recording not found")
+
+    return MarkerService.get_marker_segments(recording_id, transcript_id, context)
+
+
 @router.post("/{recording_id}/markers", response_model=schemas.Marker, status_code=status.HTTP_201_CREATED)
 def create_recording_marker(recording_id: str, marker: schemas.MarkerCreate, current_user: schemas.User = Depends(get_current_user)):
     """Create a new marker for a recording"""
     # Verify ownership
-    recording = RecordingService.get_recording_details(current_user.user_id, recording_id)
+    recording = RecordingService.check_recording_access(current_user.user_id, recording_id, "user_id, duration_seconds")
     if not recording:
         raise HTTPException(status_code=404, detail="Recording not found")
 
@@ -32,10 +47,10 @@ def create_recording_marker(recording_id: str, marker: schemas.MarkerCreate, cur
     if marker.time_seconds < 0:
         raise HTTPException(status_code=400, detail="time_seconds must be non-negative")
 
-    if marker.time_seconds > recording.duration_seconds:
+    if marker.time_seconds > recording['duration_seconds']:
         raise HTTPException(
             status_code=400,
-            detail=f"time_seconds ({marker.time_seconds}) exceeds recording duration ({recording.duration_seconds})"
+            detail=f"time_seconds ({marker.time_seconds}) exceeds recording duration ({recording['duration_seconds']})"
         )
 
     # Set recording_id from path
@@ -52,7 +67,7 @@ def update_marker(marker_id: str, marker: schemas.MarkerUpdate, current_user: sc
         raise HTTPException(status_code=404, detail="Marker not found")
     
     # Verify ownership of the recording
-    recording = RecordingService.get_recording_details(current_user.user_id, existing_marker.recording_id)
+    recording = RecordingService.check_recording_access(current_user.user_id, existing_marker.recording_id, "user_id, duration_seconds")
     if not recording:
         raise HTTPException(status_code=404, detail="Recording not found")
 
@@ -60,10 +75,10 @@ def update_marker(marker_id: str, marker: schemas.MarkerUpdate, current_user: sc
     if marker.time_seconds is not None:
         if marker.time_seconds < 0:
             raise HTTPException(status_code=400, detail="time_seconds must be non-negative")
-        if marker.time_seconds > recording.duration_seconds:
+        if marker.time_seconds > recording['duration_seconds']:
             raise HTTPException(
                 status_code=400,
-                detail=f"time_seconds exceeds recording duration ({recording.duration_seconds})"
+                detail=f"time_seconds exceeds recording duration ({recording['duration_seconds']})"
             )
 
     updated_marker = MarkerService.update_marker(marker_id, marker)
@@ -80,7 +95,7 @@ def delete_marker(marker_id: str, current_user: schemas.User = Depends(get_curre
         raise HTTPException(status_code=404, detail="Marker not found")
 
     # Verify ownership
-    recording = RecordingService.get_recording_details(current_user.user_id, existing_marker.recording_id)
+    recording = RecordingService.check_recording_access(current_user.user_id, existing_marker.recording_id)
     if not recording:
         raise HTTPException(status_code=403, detail="Access denied")
 
@@ -18,7 +18,7 @@ class TagsCreateRequest(BaseModel):
 def get_recording_tags(recording_id: str, current_user: schemas.User = Depends(get_current_user)):
     """Get all tags for a specific recording"""
     # Verify ownership
-    recording = RecordingService.get_recording_details(current_user.user_id, recording_id)
+    recording = RecordingService.check_recording_access(current_user.user_id, recording_id)
     if not recording:
         raise HTTPException(status_code=404, detail="Recording not found")
 
@@ -29,7 +29,7 @@ def get_recording_tags(recording_id: str, current_user: schemas.User = Depends(g
 def add_recording_tags(recording_id: str, request: TagsCreateRequest, current_user: schemas.User = Depends(get_current_user)):
     """Add one or multiple tags to a recording"""
     # Verify ownership
-    recording = RecordingService.get_recording_details(current_user.user_id, recording_id)
+    recording = RecordingService.check_recording_access(current_user.user_id, recording_id)
     if not recording:
         raise HTTPException(status_code=404, detail="Recording not found")
 
@@ -51,6 +51,8 @@ def add_recording_tags(recording_id: str, request: TagsCreateRequest, current_us
 
     # Add tags (service handles duplicates)
     created_tags = RecordingTagService.add_tags_to_recording(recording_id, normalized_tags)
+    # Tag-filtered listing totals changed
+    RecordingService.invalidate_recording_counts(current_user.user_id)
     return created_tags
 
 
@@ -58,7 +60,7 @@ def add_recording_tags(recording_id: str, request: TagsCreateRequest, current_us
 def remove_recording_tag(recording_id: str, tag: str, current_user: schemas.User = Depends(get_current_user)):
     """Remove a specific tag from a recording"""
     # Verify ownership
-    recording = RecordingService.get_recording_details(current_user.user_id, recording_id)
+    recording = RecordingService.check_recording_access(current_user.user_id, recording_id)
     if not recording:
         raise HTTPException(status_code=404, detail="Recording not found")
 
@@ -70,6 +72,7 @@ def remove_recording_tag(recording_id: str, tag: str, current_user: schemas.User
     if not deleted:
         raise HTTPException(status_code=404, detail="Tag not found for this recording")
 
+    RecordingService.invalidate_recording_counts(current_user.user_id)
     return None
 
 
@@ -1,5 +1,9 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Response, BackgroundTasks
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, status, Depends, Response, Query, Header
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+import json
+from urllib.parse import quote
+from typing import Any, Dict, List, Optional, Literal
 
 from app import schemas
 from app.services.recording_service import RecordingService
@@ -9,38 +13,76 @@ from app.services.marker_service import MarkerService
 from app.services.recording_tag_service import RecordingTagService
 from app.services.export_job_service import ExportJobService
 from app.auth import get_current_user
+from app.utils import job_queue
+from app.utils.database import ASYNC_ENDPOINTS
 
 router = APIRouter(prefix="/recordings", tags=["Recordings"])
 
-@router.get("/", response_model=List[schemas.Recording])
-def get_recordings(
-    response: Response,
+def _recording_filters(
     folder_id: Optional[str] = None,
     is_trashed: Optional[bool] = False,
     search: Optional[str] = None,
     tag: Optional[str] = None,
     page: int = 1,
     page_size: int = 10,
-    current_user: schemas.User = Depends(get_current_user)
-):
-    result = RecordingService.get_filtered_recordings(
-        user_id=current_user.user_id,
-        folder_id=folder_id,
-        is_trashed=is_trashed,
-        search_query=search,
-        tag=tag,
-        page=page,
-        page_size=page_size
-    )
-    
-    # Add pagination header
-    response.headers["X-Total-Count"] = str(result["total"])
-    
+    pagination: Literal["offset", "cursor"] = "offset",
+    cursor: Optional[str] = None,
+    count: Literal["exact", "estimated", "none"] = "exact"
+) -> Dict[str, Any]:
+    return {
+        "folder_id": folder_id,
+        "is_trashed": is_trashed,
+        "search_query": search,
+        "tag": tag,
+        "page": page,
+        "page_size": page_size,
+        "cursor": cursor,
+        "pagination": "cursor" if cursor else pagination,
+        "count": count
+    }
+
+def _recordings_page(response: Response, result: Dict[str, Any]) -> List[Dict[str, Any]]:
+    # Add pagination headers
+    if result["total"] is not None:
+        response.headers["X-Total-Count"] = str(result["total"])
+    if result["next_cursor"]:
+        response.headers["X-Next-Cursor"] = result["next_cursor"]
     return result["data"]
 
+_RECORDINGS_DESCRIPTION = """
+Offset pages (page, page_size) or, with pagination=cursor, keyset pages: pass the
+X-Next-Cursor header of one page as cursor to get the next one. count=estimated uses the
+planner estimate for X-Total-Count; count=none leaves the header out.
+"""
+
+if ASYNC_ENDPOINTS:
+    @router.get("/", response_model=List[schemas.Recording], description=_RECORDINGS_DESCRIPTION)
+    async def get_recordings(
+        response: Response,
+        filters: Dict[str, Any] = Depends(_recording_filters),
+        current_user: schemas.User = Depends(get_current_user)
+    ):
+        try:
+            result = await RecordingService.get_filtered_recordings_async(user_id=current_user.user_id, **filters)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return _recordings_page(response, result)
+else:
+    @router.get("/", response_model=List[schemas.Recording], description=_RECORDINGS_DESCRIPTION)
+    def get_recordings(
+        response: Response,
+        filters: Dict[str, Any] = Depends(_recording_filters),
+        current_user: schemas.User = Depends(get_current_user)
+    ):
+        try:
+            result = RecordingService.get_filtered_recordings(user_id=current_user.user_id, **filters)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return _recordings_page(response, result)
+
 @router.get("/{recording_id}", response_model=schemas.RecordingDetail)
-def get_recording(recording_id: str, current_user: schemas.User = Depends(get_current_user)):
-    recording = RecordingService.get_recording_details(current_user.user_id, recording_id)
+def get_recording(recording_id: str, include_audio_url: bool = False, current_user: schemas.User = Depends(get_current_user)):
+    recording = RecordingService.get_recording_details(current_user.user_id, recording_id, include_audio_url=include_audio_url)
     if not recording:
         raise HTTPException(status_code=404, detail="Recording not found")
     return recording
@@ -56,7 +98,7 @@ def complete_upload(recording_id: str, request: schemas.RecordingUploadCompleteR
 @router.put("/{recording_id}", response_model=schemas.Recording)
 def update_recording(recording_id: str, recording: schemas.RecordingUpdate, current_user: schemas.User = Depends(get_current_user)):
     # Verify ownership
-    RecordingService.get_recording_details(current_user.user_id, recording_id)
+    RecordingService.check_recording_access(current_user.user_id, recording_id)
     updated_recording = RecordingService.update_recording(recording_id, recording)
     if not updated_recording:
         raise HTTPException(status_code=404, detail="Recording not found")
@@ -81,35 +123,94 @@ def hard_delete_recording(recording_id: str, current_user: schemas.User = Depend
     return None
 
 @router.post("/{recording_id}/transcribe", status_code=status.HTTP_202_ACCEPTED)
-def transcribe_recording(recording_id: str, background_tasks: BackgroundTasks, current_user: schemas.User = Depends(get_current_user)):
+def transcribe_recording(recording_id: str, stream: bool = False, current_user: schemas.User = Depends(get_current_user)):
+    """
+    With stream=true the new transcript is created right away and filled in window by window;
+    follow it with GET /recordings/{recording_id}/transcribe/stream.
+    """
     # Verify ownership
-    RecordingService.get_recording_details(current_user.user_id, recording_id)
-    
-    # Add to background tasks
-    background_tasks.add_task(RecordingService.transcribe_recording, recording_id)
-    
-    return {"message": "Transcription started in background"}
+    RecordingService.check_recording_access(current_user.user_id, recording_id)
 
-@router.get("/{recording_id}/transcripts", response_model=List[schemas.Transcript])
-def get_recording_transcripts(recording_id: str, latest: bool = False, current_user: schemas.User = Depends(get_current_user)):
-    # Verify ownership
-    RecordingService.get_recording_details(current_user.user_id, recording_id)
-    return TranscriptService.get_transcripts_by_recording_id(recording_id, latest)
+    if not stream:
+        # Hand off to the background worker (python -m app.worker)
+        job_id = job_queue.enqueue(job_queue.JOB_TRANSCRIBE, {"recording_id": recording_id})
+        return {"message": "Transcription started in background", "job_id": job_id}
+
+    try:
+        transcript = RecordingService.start_streaming_transcription(recording_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not transcript:
+        raise HTTPException(status_code=404, detail="Recording not found")
+    job_id = job_queue.enqueue(
+        job_queue.JOB_TRANSCRIBE, {"recording_id": recording_id, "transcript_id": transcript['transcript_id']}
+    )
+    return {"message": "Transcription started in background", "job_id": job_id, "transcript_id": transcript['transcript_id']}
+
+@router.get("/{recording_id}/transcribe/stream")
+async def stream_transcription(
+    recording_id: str,
+    transcript_id: Optional[str] = None,
+    after: int = 0,
+    last_event_id: Optional[str] = Header(None),
+    current_user: schemas.User = Depends(get_current_user)
+):
+    """
+    Server-Sent Events for a transcription in progress (the newest transcript version unless
+    transcript_id is given; it only becomes the active one once COMPLETED): "segments" events carry newly saved segments, "status" events the
+    status and progress, and "done" ends the stream. Event ids are segment sequences, so a
+    reconnecting EventSource resumes after the last segment it received (Last-Event-ID).
+    """
+    await RecordingService.check_recording_access_async(current_user.user_id, recording_id)
+    transcripts = await TranscriptService.get_transcripts_by_recording_id_async(recording_id)
+    if transcript_id is None:
+        # Ordered by version_no descending
+        transcript = transcripts[0] if transcripts else None
+    else:
+        transcript = next((t for t in transcripts if t['transcript_id'] == transcript_id), None)
+    if not transcript:
+        raise HTTPException(status_code=404, detail="Transcript not found")
+    if last_event_id and last_event_id.isdigit():
+        after = int(last_event_id)
+
+    async def events():
+        async for event, data, sequence in TranscriptService.stream_transcript(transcript['transcript_id'], after):
+            if event == "keepalive":
+                yield ": keepalive\n\n"
+                continue
+            lines = f"id: {sequence}\n" if sequence is not None else ""
+            yield f"{lines}event: {event}\ndata: {json.dumps(data, default=str, ensure_ascii=False)}\n\n"
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(events(), media_type="text/event-stream", headers=headers)
+
+if ASYNC_ENDPOINTS:
+    @router.get("/{recording_id}/transcripts", response_model=List[schemas.Transcript])
+    async def get_recording_transcripts(recording_id: str, latest: bool = False, current_user: schemas.User = Depends(get_current_user)):
+        # Verify ownership
+        await RecordingService.check_recording_access_async(current_user.user_id, recording_id)
+        return await TranscriptService.get_transcripts_by_recording_id_async(recording_id, latest)
+else:
+    @router.get("/{recording_id}/transcripts", response_model=List[schemas.Transcript])
+    def get_recording_transcripts(recording_id: str, latest: bool = False, current_user: schemas.User = Depends(get_current_user)):
+        # Verify ownership
+        RecordingService.check_recording_access(current_user.user_id, recording_id)
+        return TranscriptService.get_transcripts_by_recording_id(recording_id, latest)
 
 @router.post("/{recording_id}/summarize", status_code=status.HTTP_202_ACCEPTED)
-def generate_summary(recording_id: str, request: schemas.SummaryRequest, background_tasks: BackgroundTasks, current_user: schemas.User = Depends(get_current_user)):
+def generate_summary(recording_id: str, request: schemas.SummaryRequest, current_user: schemas.User = Depends(get_current_user)):
     # Verify ownership
-    RecordingService.get_recording_details(current_user.user_id, recording_id)
+    RecordingService.check_recording_access(current_user.user_id, recording_id)
     
-    # Add to background tasks
-    background_tasks.add_task(SummaryService.generate_summary, recording_id, request.summary_style)
+    # Hand off to the background worker (python -m app.worker)
+    job_id = job_queue.enqueue(job_queue.JOB_SUMMARIZE, {"recording_id": recording_id, "summary_style": request.summary_style})
     
-    return {"message": "Summary generation started in background"}
+    return {"message": "Summary generation started in background", "job_id": job_id}
 
 @router.get("/{recording_id}/summaries", response_model=List[schemas.Summary])
 def get_recording_summaries(recording_id: str, latest: bool = False, current_user: schemas.User = Depends(get_current_user)):
     # Verify ownership
-    RecordingService.get_recording_details(current_user.user_id, recording_id)
+    RecordingService.check_recording_access(current_user.user_id, recording_id)
     return SummaryService.get_summaries_by_recording_id(recording_id, latest)
 
 @router.get("/{recording_id}/speakers", response_model=List[schemas.RecordingSpeaker])
@@ -128,7 +229,7 @@ def update_recording_speaker(
 @router.get("/{recording_id}/markers", response_model=List[schemas.Marker])
 def get_recording_markers(recording_id: str, current_user: schemas.User = Depends(get_current_user)):
     # Verify access
-    RecordingService.get_recording_details(current_user.user_id, recording_id) 
+    RecordingService.check_recording_access(current_user.user_id, recording_id)
     return MarkerService.get_markers_by_recording_id(recording_id)
 
 @router.post("/{recording_id}/markers", response_model=schemas.Marker, status_code=status.HTTP_201_CREATED)
@@ -137,9 +238,11 @@ def create_recording_marker(
     marker: schemas.MarkerCreate, 
     current_user: schemas.User = Depends(get_current_user)
 ):
-    RecordingService.get_recording_details(current_user.user_id, recording_id)
+    recording = RecordingService.check_recording_access(current_user.user_id, recording_id, "user_id, duration_seconds")
     try:
-        return MarkerService.create_marker(recording_id, marker)
+        return MarkerService.create_marker(
+            recording_id, marker, duration_seconds=(recording['duration_seconds'] or 0) if recording else None
+        )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -149,8 +252,10 @@ def add_recording_tags(
     tags: List[str], 
     current_user: schemas.User = Depends(get_current_user)
 ):
-    RecordingService.get_recording_details(current_user.user_id, recording_id)
-    return RecordingTagService.add_tags(recording_id, tags)
+    RecordingService.check_recording_access(current_user.user_id, recording_id)
+    created = RecordingTagService.add_tags(recording_id, tags)
+    RecordingService.invalidate_recording_counts(current_user.user_id)
+    return created
 
 @router.delete("/{recording_id}/tags/{tag}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_recording_tag(
@@ -158,12 +263,15 @@ def delete_recording_tag(
     tag: str, 
     current_user: schemas.User = Depends(get_current_user)
 ):
-    RecordingService.get_recording_details(current_user.user_id, recording_id)
+    RecordingService.check_recording_access(current_user.user_id, recording_id)
     RecordingTagService.delete_tag(recording_id, tag)
+    RecordingService.invalidate_recording_counts(current_user.user_id)
     return None
 
 class ExportRequest(schemas.BaseModel):
     export_type: str
+    # FULL_ZIP only: extra formats to bundle next to the PDFs
+    bundle_formats: Optional[List[Literal["docx", "json", "srt"]]] = None
 
 @router.post("/{recording_id}/export", response_model=schemas.ExportJob, status_code=status.HTTP_201_CREATED)
 def create_export_job(
@@ -171,8 +279,40 @@ def create_export_job(
     request: ExportRequest, 
     current_user: schemas.User = Depends(get_current_user)
 ):
-    RecordingService.get_recording_details(current_user.user_id, recording_id)
+    RecordingService.check_recording_access(current_user.user_id, recording_id)
+    options = {"bundle_formats": request.bundle_formats} if request.bundle_formats else None
+    try:
+        job = ExportJobService.start_export(current_user.user_id, recording_id, request.export_type, options)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return job
+
+
+@router.get("/{recording_id}/export/stream")
+def stream_export(
+    recording_id: str,
+    export_type: str,
+    bundle_formats: Optional[List[Literal["docx", "json", "srt"]]] = Query(None),
+    cache: bool = False,
+    current_user: schemas.User = Depends(get_current_user)
+):
+    """
+    Render an export and download it in the same request (chunked). SRT/VTT/JSONL start
+    arriving while segments are read; PDF/DOCX/ZIP are rendered whole first, so they only save
+    the job, upload and signed URL round trips. With cache=true the file is also stored like a
+    finished export job, so later exports and /exports can reuse it.
+    """
+    if not RecordingService.check_recording_access(current_user.user_id, recording_id):
+        raise HTTPException(status_code=404, detail="Recording not found")
+    options = {"bundle_formats": bundle_formats} if bundle_formats else None
     try:
-        return ExportJobService.create_export_job(current_user.user_id, recording_id, request.export_type)
+        chunks, content_type, file_name, finish = ExportJobService.stream_export(
+            current_user.user_id, recording_id, export_type, options, cache
+        )
     except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # ASCII fallback plus the UTF-8 name (RFC 6266) so Vietnamese titles survive
+    fallback = "".join(c for c in file_name if c.isascii() and c.isprintable() and c not in '"\\') or f"export-{recording_id}"
+    headers = {"Content-Disposition": f"attachment; filename=\"{fallback}\"; filename*=UTF-8''{quote(file_name)}"}
+    return StreamingResponse(chunks, media_type=content_type, headers=headers, background=BackgroundTask(finish))
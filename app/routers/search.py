@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends, Query
+from typing import List, Optional, Literal
+
+from app import schemas
+from app.services.search_service import SearchService
+from app.auth import get_current_user
+
+router = APIRouter(prefix="/search", tags=["Search"])
+
+
+@router.get("/", response_model=List[schemas.SearchHit])
+def search(
+    q: str = Query(..., min_length=1, description="Words to find; accents are optional"),
+    kind: Optional[Literal["segment", "summary"]] = None,
+    limit: int = Query(20, ge=1, le=100),
+    current_user: schemas.User = Depends(get_current_user)
+):
+    """Search the current user's transcripts and summaries, best matches first"""
+    return SearchService.search(current_user.user_id, q, limit=limit, kind=kind)
+
+
+@router.post("/reindex")
+def reindex(current_user: schemas.User = Depends(get_current_user)):
+    """Rebuild the current user's search entries from the database"""
+    return {"recordings": SearchService.reindex_user(current_user.user_id)}
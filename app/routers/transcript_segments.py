@@ -1,5 +1,5 @@
-from fastapi import APIRouter, HTTPException, status
-from typing import List
+from fastapi import APIRouter, HTTPException, status, Query, Response
+from typing import List, Optional
 
 from app import schemas
 from app.services.transcript_segment_service import TranscriptSegmentService
@@ -10,10 +10,40 @@ router = APIRouter(prefix="/transcripts", tags=["Transcript Segments"])
 def get_transcript_segments(transcript_id: str):
     return TranscriptSegmentService.get_segments_by_transcript_id(transcript_id)
 
+@router.get("/{transcript_id}/segments/window", response_model=List[schemas.TranscriptSegment])
+def get_transcript_segments_in_window(
+    transcript_id: str,
+    response: Response,
+    start: float = Query(..., ge=0),
+    end: float = Query(..., ge=0),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000)
+):
+    """Segments overlapping [start, end] seconds, by start time; X-Total-Count holds the number of matches"""
+    try:
+        page = TranscriptSegmentService.get_segments_in_window(transcript_id, start, end, offset, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    response.headers["X-Total-Count"] = str(page["total"])
+    return page["data"]
+
+@router.get("/{transcript_id}/segments/at", response_model=Optional[schemas.TranscriptSegment])
+def get_transcript_segment_at(transcript_id: str, t: float = Query(..., ge=0)):
+    """The segment playing at t seconds; null between segments"""
+    return TranscriptSegmentService.get_segment_at(transcript_id, t)
+
 @router.post("/{transcript_id}/segments", response_model=schemas.TranscriptSegment, status_code=status.HTTP_201_CREATED)
 def create_transcript_segment(transcript_id: str, segment: schemas.TranscriptSegmentCreate):
     return TranscriptSegmentService.create_transcript_segment(transcript_id, segment)
 
+@router.patch("/{transcript_id}/segments", response_model=List[schemas.TranscriptSegment])
+def bulk_edit_transcript_segments(transcript_id: str, edit: schemas.TranscriptSegmentBulkEdit):
+    """
+    Edit many segments in one request: relabel a speaker across a sequence range, find/replace
+    text, and per-segment patches. Returns the segments that changed.
+    """
+    return TranscriptSegmentService.bulk_edit_segments(transcript_id, edit)
+
 @router.put("/{transcript_id}/segments/{segment_id}", response_model=schemas.TranscriptSegment)
 def update_transcript_segment(transcript_id: str, segment_id: int, segment: schemas.TranscriptSegmentUpdate):
     updated_segment = TranscriptSegmentService.update_transcript_segment(transcript_id, segment_id, segment)
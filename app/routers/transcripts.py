@@ -5,6 +5,7 @@ from app import schemas
 from app.services.transcript_service import TranscriptService
 from app.services.recording_service import RecordingService
 from app.auth import get_current_user
+from app.utils.database import ASYNC_ENDPOINTS
 
 router = APIRouter(prefix="/transcripts", tags=["Transcripts"])
 
@@ -13,23 +14,32 @@ def get_all_transcripts(current_user: schemas.User = Depends(get_current_user)):
     # This should be filtered by user, but for now require auth.
     return TranscriptService.get_all_transcripts()
 
-@router.get("/{transcript_id}", response_model=schemas.TranscriptDetail)
-def get_transcript(transcript_id: str, current_user: schemas.User = Depends(get_current_user)):
-    transcript = TranscriptService.get_transcript_by_id(transcript_id)
-    if not transcript:
-        raise HTTPException(status_code=404, detail="Transcript not found")
-        
-    # Verify ownership
-    recording = RecordingService.get_recording_details(current_user.user_id, transcript.recording_id)
-    if not recording:
-         raise HTTPException(status_code=403, detail="Access denied")
-         
-    return transcript
+if ASYNC_ENDPOINTS:
+    @router.get("/{transcript_id}", response_model=schemas.TranscriptDetail)
+    async def get_transcript(transcript_id: str, current_user: schemas.User = Depends(get_current_user)):
+        # Ownership is verified before the segments are read
+        transcript = await TranscriptService.get_transcript_by_id_async(transcript_id, user_id=current_user.user_id)
+        if not transcript:
+            raise HTTPException(status_code=404, detail="Transcript not found")
+        return transcript
+else:
+    @router.get("/{transcript_id}", response_model=schemas.TranscriptDetail)
+    def get_transcript(transcript_id: str, current_user: schemas.User = Depends(get_current_user)):
+        transcript = TranscriptService.get_transcript_by_id(transcript_id)
+        if not transcript:
+            raise HTTPException(status_code=404, detail="Transcript not found")
+
+        # Verify ownership
+        recording = RecordingService.check_recording_access(current_user.user_id, transcript.recording_id)
+        if not recording:
+            raise HTTPException(status_code=403, detail="Access denied")
+
+        return transcript
 
 @router.post("/", response_model=schemas.Transcript, status_code=status.HTTP_201_CREATED)
 def create_transcript(transcript: schemas.TranscriptCreate, current_user: schemas.User = Depends(get_current_user)):
     # Verify ownership
-    recording = RecordingService.get_recording_details(current_user.user_id, transcript.recording_id)
+    recording = RecordingService.check_recording_access(current_user.user_id, transcript.recording_id)
     if not recording:
          raise HTTPException(status_code=403, detail="Access denied")
          
@@ -42,7 +52,7 @@ def update_transcript(transcript_id: str, transcript: schemas.TranscriptUpdate,
         raise HTTPException(status_code=404, detail="Transcript not found")
         
     # Verify ownership
-    recording = RecordingService.get_recording_details(current_user.user_id, existing_transcript.recording_id)
+    recording = RecordingService.check_recording_access(current_user.user_id, existing_transcript.recording_id)
     if not recording:
          raise HTTPException(status_code=403, detail="Access denied")
          
@@ -56,7 +66,7 @@ def delete_transcript(transcript_id: str, current_user: schemas.User = Depends(g
         raise HTTPException(status_code=404, detail="Transcript not found")
         
     # Verify ownership
-    recording = RecordingService.get_recording_details(current_user.user_id, existing_transcript.recording_id)
+    recording = RecordingService.check_recording_access(current_user.user_id, existing_transcript.recording_id)
     if not recording:
          raise HTTPException(status_code=403, detail="Access denied")
          
@@ -25,6 +25,11 @@ class TranscriptType(str, Enum):
     USER_EDITED = "USER_EDITED"
     REGENERATED = "REGENERATED"
 
+class TranscriptStatus(str, Enum):
+    PROCESSING = "PROCESSING"
+    COMPLETED = "COMPLETED"
+    FAILED = "FAILED"
+
 class SummaryType(str, Enum):
     AI_GENERATED = "AI_GENERATED"
     USER_EDITED = "USER_EDITED"
@@ -250,6 +255,8 @@ class TranscriptBase(BaseModel):
     language: Optional[str] = None
     confidence_score: Optional[float] = None
     is_active: Optional[bool] = True
+    status: Optional[TranscriptStatus] = TranscriptStatus.COMPLETED
+    progress: Optional[float] = None  # share of the audio transcribed so far, 0..1
 
 class TranscriptCreate(TranscriptBase):
     pass
@@ -294,6 +301,33 @@ class TranscriptSegmentUpdate(BaseModel):
 class TranscriptSegment(TranscriptSegmentBase):
     segment_id: int
 
+class TranscriptSegmentPatch(BaseModel):
+    segment_id: int
+    start_time: Optional[float] = None
+    end_time: Optional[float] = None
+    content: Optional[str] = None
+    speaker_label: Optional[str] = None
+
+class SegmentRelabel(BaseModel):
+    from_label: str
+    to_label: str
+    # Inclusive sequence range; None means from the first / to the last segment
+    start_sequence: Optional[int] = None
+    end_sequence: Optional[int] = None
+
+class SegmentFindReplace(BaseModel):
+    find: str = Field(..., min_length=1)
+    replace: str = ""
+    match_case: bool = False
+    start_sequence: Optional[int] = None
+    end_sequence: Optional[int] = None
+
+class TranscriptSegmentBulkEdit(BaseModel):
+    """Applied in order: relabel, find/replace, then the per-segment patches"""
+    relabel: Optional[SegmentRelabel] = None
+    find_replace: Optional[SegmentFindReplace] = None
+    segments: List[TranscriptSegmentPatch] = Field(default_factory=list, max_length=5000)
+
 # ============================
 # RECORDING SPEAKERS
 # ============================
@@ -380,6 +414,10 @@ class Marker(MarkerBase):
     marker_id: str
     created_at: Optional[datetime] = None
 
+class MarkerSegments(BaseModel):
+    marker: Marker
+    segments: List[TranscriptSegment] = []
+
 # ============================
 # EXPORT_JOBS
 # ============================
@@ -420,4 +458,18 @@ class RecordingTag(RecordingTagBase):
 # EXPORT JOB DETAIL (with download URL)
 # ============================
 class ExportJobDetail(ExportJob):
-    download_url: Optional[str] = None
\ No newline at end of file
+    download_url: Optional[str] = None
+
+# ============================
+# SEARCH
+# ============================
+class SearchHit(BaseModel):
+    recording_id: str
+    recording_title: Optional[str] = None
+    kind: str  # "segment" or "summary"
+    segment_id: Optional[int] = None
+    section: Optional[str] = None  # summary key, e.g. "key_points"
+    start_time: Optional[float] = None
+    end_time: Optional[float] = None
+    content: str
+    score: float
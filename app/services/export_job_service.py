@@ -1,8 +1,13 @@
 from app.utils.database import supabase
+from app.utils import signed_urls
 from app import schemas
-from typing import List, Optional
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
 from datetime import datetime, timedelta
 import os
+import shutil
+import tempfile
+
+STREAM_CHUNK_SIZE = 64 * 1024
 
 
 class ExportJobService:
@@ -24,6 +29,20 @@ class ExportJobService:
             .execute()
         return response.data
 
+    @staticmethod
+    def get_exports_with_download_urls(recording_id: str) -> List[schemas.ExportJobDetail]:
+        """Export jobs of a recording; finished ones carry a download URL, all signed in one storage call."""
+        jobs = [schemas.ExportJob(**row) for row in ExportJobService.get_exports_by_recording_id(recording_id)]
+        paths = [job.file_path for job in jobs if job.status == 'DONE' and job.file_path]
+        urls = signed_urls.get_signed_urls("exports", paths) if paths else {}
+        return [
+            schemas.ExportJobDetail(
+                **job.model_dump(),
+                download_url=urls.get(job.file_path) if job.status == 'DONE' else None
+            )
+            for job in jobs
+        ]
+
     @staticmethod
     def get_export_job_by_id(export_id: str) -> Optional[schemas.ExportJob]:
         response = supabase.table("export_jobs") \
@@ -75,76 +94,278 @@ class ExportJobService:
         """
         Generate a signed URL for downloading the export file.
         expires_in: seconds until URL expires (default 1 hour)
+        The URL is cached and reused until shortly before it expires.
         """
-        try:
-            response = supabase.storage.from_("exports").create_signed_url(
-                file_path,
-                expires_in=expires_in
-            )
-            return response.get('signedURL')
-        except Exception as e:
-            print(f"Error generating signed URL: {e}")
-            return None
+        return signed_urls.get_signed_url("exports", file_path, expires_in)
 
     @staticmethod
     def delete_export_file(file_path: str) -> None:
         """Delete export file from storage"""
         try:
             supabase.storage.from_("exports").remove([file_path])
+            signed_urls.evict("exports", file_path)
         except Exception as e:
             print(f"Error deleting file from storage: {e}")
             raise
 
     @staticmethod
-    def process_export_job(export_id: str) -> None:
+    def find_artifact_job(recording_id: str, export_type: str, file_path: str) -> Optional[schemas.ExportJob]:
+        """A finished job whose file is the given artifact, if any."""
+        response = supabase.table("export_jobs") \
+            .select("*") \
+            .eq("recording_id", recording_id) \
+            .eq("export_type", export_type) \
+            .eq("status", "DONE") \
+            .eq("file_path", file_path) \
+            .limit(1) \
+            .execute()
+        if response.data:
+            return schemas.ExportJob(**response.data[0])
+        return None
+
+    @staticmethod
+    def start_export(user_id: str, recording_id: str, export_type: str, options: Optional[dict] = None) -> schemas.ExportJob:
         """
-        Background task to process export job.
-        This would typically be handled by a separate worker/edge function.
+        Create an export job. If an earlier export with the same inputs (see
+        ExportProcessor.artifact_path) already produced a file, the job completes immediately
+        with that file; otherwise it is queued for the worker.
         """
         from app.utils.export_processor import ExportProcessor
 
+        job = ExportJobService.create_export_job(user_id, recording_id, export_type)
         try:
-            print(f"!!! STARTING EXPORT JOB {export_id} !!!")
-            # Update status to PROCESSING
-            ExportJobService.update_export_job(
-                export_id,
-                schemas.ExportJobUpdate(status=schemas.ExportStatus.PROCESSING)
+            file_path = ExportProcessor(job.model_dump(), options).artifact_path()
+        except ValueError:
+            # Missing recording data: let the worker fail the job as before
+            file_path = None
+
+        if file_path and ExportJobService.find_artifact_job(recording_id, export_type, file_path):
+            return ExportJobService.complete_export_job(job.export_id, file_path)
+
+        ExportJobService.enqueue_export_job(job.export_id, options)
+        return job
+
+    @staticmethod
+    def complete_export_job(export_id: str, file_path: str) -> Optional[schemas.ExportJob]:
+        return ExportJobService.update_export_job(
+            export_id,
+            schemas.ExportJobUpdate(
+                status=schemas.ExportStatus.DONE,
+                file_path=file_path,
+                completed_at=datetime.utcnow()
             )
-            print(f"!!! STATUS UPDATED TO PROCESSING {export_id} !!!")
+        )
 
-            # Get job details
-            job = ExportJobService.get_export_job_by_id(export_id)
-            if not job:
-                print(f"!!! JOB NOT FOUND {export_id} !!!")
+    @staticmethod
+    def collect_stale_artifacts(recording_id: str, source: Optional[str] = None) -> None:
+        """
+        Remove cached export files of a recording once their inputs changed: `source`
+        "TRANSCRIPT" or "SUMMARY" when a newer version became latest or was edited, None when
+        recording metadata changed. Jobs that pointed at a removed file keep their row but
+        lose the file_path. Failures are logged only; the next export simply renders again.
+        """
+        from app.utils.export_processor import ARTIFACT_DIR, depends_on
+
+        try:
+            response = supabase.table("export_jobs") \
+                .select("export_type, file_path") \
+                .eq("recording_id", recording_id) \
+                .eq("status", "DONE") \
+                .like("file_path", f"{recording_id}/{ARTIFACT_DIR}/*") \
+                .execute()
+            stale = sorted({
+                row['file_path'] for row in response.data
+                if source is None or depends_on(row['export_type'], source)
+            })
+            if not stale:
                 return
 
-            # Process export based on type
-            print(f"!!! INITIALIZING PROCESSOR FOR {export_id} !!!")
-            processor = ExportProcessor(job)
-            print(f"!!! PROCESSING START {export_id} !!!")
+            supabase.storage.from_("exports").remove(stale)
+            for file_path in stale:
+                signed_urls.evict("exports", file_path)
+            supabase.table("export_jobs") \
+                .update({"file_path": None}) \
+                .eq("recording_id", recording_id) \
+                .in_("file_path", stale) \
+                .execute()
+        except Exception as e:
+            print(f"Error collecting stale export artifacts for recording {recording_id}: {e}")
+
+    @staticmethod
+    def release_export_file(export_id: str, file_path: str) -> None:
+        """Delete an export's file unless another job still shares the same artifact."""
+        others = supabase.table("export_jobs") \
+            .select("export_id") \
+            .eq("file_path", file_path) \
+            .neq("export_id", export_id) \
+            .limit(1) \
+            .execute()
+        if not others.data:
+            ExportJobService.delete_export_file(file_path)
+
+    @staticmethod
+    def enqueue_export_job(export_id: str, options: Optional[dict] = None) -> int:
+        """Queue the export for the background worker. The job row stays PENDING until a worker picks it up."""
+        from app.utils import job_queue
+
+        payload = {"export_id": export_id}
+        if options:
+            payload["options"] = options
+        return job_queue.enqueue(job_queue.JOB_EXPORT, payload)
+
+    @staticmethod
+    def run_export_job(export_id: str, options: Optional[dict] = None) -> None:
+        """
+        Render and upload the export, moving the job PROCESSING -> DONE.
+        Raises on failure so the job queue can retry it.
+        """
+        from app.utils.export_processor import ExportProcessor
+
+        job = ExportJobService.get_export_job_by_id(export_id)
+        if not job:
+            print(f"Export job {export_id} not found, skipping")
+            return
+
+        ExportJobService.update_export_job(
+            export_id,
+            schemas.ExportJobUpdate(status=schemas.ExportStatus.PROCESSING)
+        )
+
+        processor = ExportProcessor(job.model_dump(), options)
+        file_path = processor.artifact_path()
+        # Another job with the same inputs may have finished since this one was queued
+        if not ExportJobService.find_artifact_job(job.recording_id, job.export_type, file_path):
             file_path = processor.process()
-            print(f"!!! PROCESSING COMPLETE. FILE: {file_path} !!!")
-
-            # Update job with result
-            ExportJobService.update_export_job(
-                export_id,
-                schemas.ExportJobUpdate(
-                    status=schemas.ExportStatus.DONE,
-                    file_path=file_path,
-                    completed_at=datetime.utcnow()
-                )
+
+        ExportJobService.complete_export_job(export_id, file_path)
+
+    @staticmethod
+    def stream_export(
+        user_id: str, recording_id: str, export_type: str, options: Optional[dict] = None, cache: bool = False
+    ) -> Tuple[Iterator[bytes], str, str, Callable[[], None]]:
+        """
+        Render an export for direct download instead of the job/upload/signed URL round trip.
+        Returns (chunks, content type, file name, finish); finish must run after the response
+        (it stores the file when cache=True and removes the temp files).
+
+        SRT/VTT/JSONL are streamed while segments are fetched. PDF, DOCX and ZIP can only be
+        written whole, so they are rendered to a temp file first and streamed from disk.
+        With cache=True the file is also uploaded as the export's artifact and recorded as a
+        finished job, unless an identical artifact exists already.
+        """
+        from app.utils.export_processor import ExportProcessor
+        from app.utils.export_renderers import SEGMENT_FORMATS
+
+        processor = ExportProcessor({"export_id": None, "recording_id": recording_id, "export_type": export_type}, options)
+        content_type = processor.content_type()
+        file_name = processor.file_name()
+
+        work_dir = tempfile.mkdtemp(prefix="export-stream-")
+        state = {"complete": False}
+        try:
+            if export_type in SEGMENT_FORMATS:
+                local_path = os.path.join(work_dir, "export")
+                chunks = ExportJobService._encode_lines(processor.iter_segment_format(), local_path if cache else None)
+            else:
+                local_path = processor.render(work_dir)
+                chunks = ExportJobService._read_chunks(local_path)
+        except Exception:
+            shutil.rmtree(work_dir, ignore_errors=True)
+            raise
+
+        def stream() -> Iterator[bytes]:
+            try:
+                yield from chunks
+                state["complete"] = True
+            finally:
+                if not state["complete"]:
+                    # Client went away (or rendering failed): finish will not run
+                    shutil.rmtree(work_dir, ignore_errors=True)
+
+        def finish() -> None:
+            try:
+                if cache and state["complete"]:
+                    ExportJobService._cache_streamed_export(user_id, processor, local_path)
+            finally:
+                shutil.rmtree(work_dir, ignore_errors=True)
+
+        return stream(), content_type, file_name, finish
+
+    @staticmethod
+    def _encode_lines(lines: Iterable[str], tee_path: Optional[str]) -> Iterator[bytes]:
+        """Groups generated lines into chunks of about STREAM_CHUNK_SIZE, copying them to tee_path"""
+        tee = open(tee_path, "wb") if tee_path else None
+        try:
+            buffer, size = [], 0
+            for line in lines:
+                data = line.encode("utf-8")
+                buffer.append(data)
+                size += len(data)
+                if size >= STREAM_CHUNK_SIZE:
+                    chunk = b"".join(buffer)
+                    if tee:
+                        tee.write(chunk)
+                    yield chunk
+                    buffer, size = [], 0
+            chunk = b"".join(buffer)
+            if tee:
+                tee.write(chunk)
+            if chunk:
+                yield chunk
+        finally:
+            if tee:
+                tee.close()
+
+    @staticmethod
+    def _read_chunks(local_path: str) -> Iterator[bytes]:
+        with open(local_path, "rb") as f:
+            while True:
+                chunk = f.read(STREAM_CHUNK_SIZE)
+                if not chunk:
+                    return
+                yield chunk
+
+    @staticmethod
+    def _cache_streamed_export(user_id: str, processor, local_path: str) -> None:
+        try:
+            file_path = processor.artifact_path()
+            if ExportJobService.find_artifact_job(processor.recording_id, processor.export_type, file_path):
+                return
+            processor.upload(local_path)
+            job = ExportJobService.create_export_job(user_id, processor.recording_id, processor.export_type)
+            ExportJobService.complete_export_job(job.export_id, file_path)
+        except Exception as e:
+            # The download already succeeded; the next export simply renders again
+            print(f"Error caching streamed export of recording {processor.recording_id}: {e}")
+
+    @staticmethod
+    def mark_export_pending(export_id: str) -> None:
+        """Called when a failed attempt has been scheduled for retry."""
+        ExportJobService.update_export_job(
+            export_id,
+            schemas.ExportJobUpdate(status=schemas.ExportStatus.PENDING)
+        )
+
+    @staticmethod
+    def mark_export_failed(export_id: str) -> None:
+        ExportJobService.update_export_job(
+            export_id,
+            schemas.ExportJobUpdate(
+                status=schemas.ExportStatus.FAILED,
+                completed_at=datetime.utcnow()
             )
-            print(f"!!! JOB DONE {export_id} !!!")
+        )
 
+    @staticmethod
+    def process_export_job(export_id: str) -> None:
+        """
+        Process an export job synchronously in the calling thread, without retries.
+        API requests should use enqueue_export_job instead.
+        """
+        try:
+            ExportJobService.run_export_job(export_id)
         except Exception as e:
-            print(f"!!! EXPORT ERROR {export_id}: {e} !!!")
+            print(f"Export error {export_id}: {e}")
             import traceback
             traceback.print_exc()
-            # Update status to FAILED
-            ExportJobService.update_export_job(
-                export_id,
-                schemas.ExportJobUpdate(
-                    status=schemas.ExportStatus.FAILED,
-                    completed_at=datetime.utcnow()
-                )
-            )
\ No newline at end of file
+            ExportJobService.mark_export_failed(export_id)
@@ -1,6 +1,8 @@
 from app.utils.database import supabase
 from app import schemas
-from typing import List, Optional
+from app.services.transcript_segment_service import TranscriptSegmentService
+from typing import List, Optional, Dict, Any
+from fastapi import HTTPException
 
 class MarkerService:
     @staticmethod
@@ -18,6 +20,24 @@ class MarkerService:
             .execute()
         return response.data
 
+    @staticmethod
+    def get_marker_segments(recording_id: str, transcript_id: Optional[str] = None, context: int = 2) -> List[Dict[str, Any]]:
+        """
+        For each marker of the recording, the transcript segment at the marker with `context`
+        segments before and after it, from the active transcript unless transcript_id is given.
+        """
+        query = supabase.table("transcripts").select("transcript_id").eq("recording_id", recording_id)
+        query = query.eq("transcript_id", transcript_id) if transcript_id else query.eq("is_active", True)
+        transcript = query.execute()
+        if not transcript.data:
+            raise HTTPException(status_code=404, detail="Transcript not found")
+
+        index = TranscriptSegmentService.get_time_index(transcript.data[0]['transcript_id'])
+        return [
+            {"marker": marker, "segments": index.around(marker['time_seconds'], context)}
+            for marker in MarkerService.get_markers_by_recording_id(recording_id)
+        ]
+
     @staticmethod
     def get_marker_by_id(marker_id: str) -> Optional[schemas.Marker]:
         response = supabase.table("markers").select("*").eq("marker_id", marker_id).execute()
@@ -26,13 +46,15 @@ class MarkerService:
         return None
 
     @staticmethod
-    def create_marker(recording_id: str, marker_data: schemas.MarkerCreate) -> schemas.Marker:
-        # Check recording duration
-        recording_res = supabase.table("recordings").select("duration_seconds").eq("recording_id", recording_id).single().execute()
-        if not recording_res.data:
-            raise ValueError("Recording not found")
-        
-        duration = recording_res.data['duration_seconds'] or 0
+    def create_marker(recording_id: str, marker_data: schemas.MarkerCreate, duration_seconds: Optional[float] = None) -> schemas.Marker:
+        # Check recording duration (callers that already fetched it pass duration_seconds)
+        if duration_seconds is None:
+            recording_res = supabase.table("recordings").select("duration_seconds").eq("recording_id", recording_id).single().execute()
+            if not recording_res.data:
+                raise ValueError("Recording not found")
+            duration_seconds = recording_res.data['duration_seconds']
+
+        duration = duration_seconds or 0
         if marker_data.time_seconds > duration:
             raise ValueError(f"Marker time {marker_data.time_seconds} exceeds recording duration {duration}")
 
@@ -1,14 +1,28 @@
-from app.utils.database import supabase
+from app.utils.database import supabase, get_async_supabase
 from app import schemas
-from app.utils import transcriber
+from app.utils import chunked_transcriber, transcription_cache, signed_urls, versioning, bulk_writer
+from app.utils.pagination import encode_cursor, decode_cursor, quote_filter_value
+from app.utils.ttl_cache import TTLCache
 from typing import List, Optional, Dict, Any
 import json
 import os
 from datetime import datetime
 from fastapi import HTTPException
 from app.utils.audit import create_audit_log
+from app.services.user_service import UserService
+from app.services.tier_service import TierService
+from app.services.export_job_service import ExportJobService
+from app.services.search_service import SearchService
 from postgrest.exceptions import APIError
 
+# Listing totals, keyed by user: {(folder_id, is_trashed, search, tag, count mode): total}.
+# Dropped whenever the user's recordings change in a way that can move a total.
+recording_count_cache = TTLCache(
+    "recording_counts",
+    maxsize=int(os.getenv("RECORDING_COUNT_CACHE_MAXSIZE", "10000")),
+    ttl=float(os.getenv("RECORDING_COUNT_CACHE_TTL_SECONDS", "60"))
+)
+
 class RecordingService:
     @staticmethod
     def get_all_recordings() -> List[schemas.Recording]:
@@ -16,23 +30,27 @@ class RecordingService:
         return response.data
 
     @staticmethod
-    def get_filtered_recordings(
+    def _filtered_recordings_query(
+        client,
         user_id: str,
-        folder_id: Optional[str] = None,
-        is_trashed: Optional[bool] = False,
-        search_query: Optional[str] = None,
-        tag: Optional[str] = None,
-        page: int = 1,
-        page_size: int = 10
-    ) -> Dict[str, Any]:
+        folder_id: Optional[str],
+        is_trashed: Optional[bool],
+        search_query: Optional[str],
+        tag: Optional[str],
+        page: int,
+        page_size: int,
+        cursor: Optional[str] = None,
+        pagination: str = "offset",
+        count: Optional[str] = None
+    ):
         # Base query
         if tag:
             # Inner join to filter by tag
             tag = tag.strip().lower()
-            query = supabase.table("recordings").select("*, recording_tags!inner(tag)", count="exact")
+            query = client.table("recordings").select("*, recording_tags!inner(tag)", count=count)
             query = query.eq("recording_tags.tag", tag)
         else:
-            query = supabase.table("recordings").select("*", count="exact")
+            query = client.table("recordings").select("*", count=count)
 
         # Filters
         query = query.eq("user_id", user_id)
@@ -45,19 +63,102 @@ class RecordingService:
             
         if search_query:
             query = query.ilike("title", f"%{search_query}%")
-            
+
+        # Order; recording_id breaks ties so every row has a unique position
+        query = query.order("created_at", desc=True).order("recording_id", desc=True)
+
+        if pagination == "cursor":
+            # Keyset: rows strictly after the cursor row, one extra to know if there is a next page
+            if cursor:
+                created_at, recording_id = decode_cursor(cursor, 2)
+                created_at, recording_id = quote_filter_value(created_at), quote_filter_value(recording_id)
+                query = query.or_(
+                    f"created_at.lt.{created_at},and(created_at.eq.{created_at},recording_id.lt.{recording_id})"
+                )
+            return query.limit(page_size + 1)
+
         # Pagination
         start = (page - 1) * page_size
         end = start + page_size - 1
-        
-        # Order and execute
-        query = query.range(start, end).order("created_at", desc=True)
-        response = query.execute()
-        
-        return {
-            "data": response.data,
-            "total": response.count
-        }
+        return query.range(start, end)
+
+    @staticmethod
+    def _cached_count(user_id: str, filter_key: tuple) -> Optional[int]:
+        counts = recording_count_cache.get(user_id)
+        return counts.get(filter_key) if counts else None
+
+    @staticmethod
+    def _page_result(response, user_id: str, filter_key: tuple, total: Optional[int], pagination: str, page_size: int) -> Dict[str, Any]:
+        rows = response.data
+        next_cursor = None
+        if pagination == "cursor" and len(rows) > page_size:
+            rows = rows[:page_size]
+            next_cursor = encode_cursor([rows[-1]['created_at'], rows[-1]['recording_id']])
+
+        if total is None and response.count is not None:
+            total = response.count
+            counts = dict(recording_count_cache.get(user_id) or {})
+            counts[filter_key] = total
+            recording_count_cache.set(user_id, counts)
+
+        return {"data": rows, "total": total, "next_cursor": next_cursor}
+
+    @staticmethod
+    def invalidate_recording_counts(user_id: str) -> None:
+        """Call when a user's recordings are added, removed, trashed, restored, moved, renamed or retagged"""
+        recording_count_cache.invalidate(user_id)
+
+    @staticmethod
+    def get_filtered_recordings(
+        user_id: str,
+        folder_id: Optional[str] = None,
+        is_trashed: Optional[bool] = False,
+        search_query: Optional[str] = None,
+        tag: Optional[str] = None,
+        page: int = 1,
+        page_size: int = 10,
+        cursor: Optional[str] = None,
+        pagination: str = "offset",
+        count: str = "exact"
+    ) -> Dict[str, Any]:
+        """
+        One page of the user's recordings, newest first.
+
+        pagination "offset" uses page; "cursor" uses the opaque cursor from the previous
+        page's next_cursor (None for the first page). count "exact" / "estimated" returns the
+        total with PostgREST's counting mode, cached per user and filter; "none" skips it.
+
+        Raises:
+            ValueError: malformed cursor
+        """
+        filter_key = (folder_id, is_trashed, search_query, tag, count)
+        total = RecordingService._cached_count(user_id, filter_key) if count != "none" else None
+        response = RecordingService._filtered_recordings_query(
+            supabase, user_id, folder_id, is_trashed, search_query, tag, page, page_size,
+            cursor, pagination, count if count != "none" and total is None else None
+        ).execute()
+        return RecordingService._page_result(response, user_id, filter_key, total, pagination, page_size)
+
+    @staticmethod
+    async def get_filtered_recordings_async(
+        user_id: str,
+        folder_id: Optional[str] = None,
+        is_trashed: Optional[bool] = False,
+        search_query: Optional[str] = None,
+        tag: Optional[str] = None,
+        page: int = 1,
+        page_size: int = 10,
+        cursor: Optional[str] = None,
+        pagination: str = "offset",
+        count: str = "exact"
+    ) -> Dict[str, Any]:
+        filter_key = (folder_id, is_trashed, search_query, tag, count)
+        total = RecordingService._cached_count(user_id, filter_key) if count != "none" else None
+        response = await RecordingService._filtered_recordings_query(
+            get_async_supabase(), user_id, folder_id, is_trashed, search_query, tag, page, page_size,
+            cursor, pagination, count if count != "none" and total is None else None
+        ).execute()
+        return RecordingService._page_result(response, user_id, filter_key, total, pagination, page_size)
 
     @staticmethod
     def get_recordings_by_user_id(user_id: str) -> List[schemas.Recording]:
@@ -72,9 +173,47 @@ class RecordingService:
         return None
 
     @staticmethod
-    def get_recording_details(user_id: str, recording_id: str) -> Optional[schemas.RecordingDetail]:
-        # 1. Fetch recording
-        response = supabase.table("recordings").select("*").eq("recording_id", recording_id).execute()
+    def check_recording_access(user_id: str, recording_id: str, columns: str = "recording_id, user_id") -> Optional[Dict[str, Any]]:
+        """
+        Lightweight ownership check: one select of only the needed columns, no counts or signed URL.
+
+        Returns:
+            The selected columns as a dict, or None if the recording does not exist
+
+        Raises:
+            HTTPException 403 if the recording belongs to another user
+        """
+        response = RecordingService._access_query(supabase, recording_id, columns).execute()
+        return RecordingService._checked_owner(response.data, user_id)
+
+    @staticmethod
+    async def check_recording_access_async(user_id: str, recording_id: str, columns: str = "recording_id, user_id") -> Optional[Dict[str, Any]]:
+        response = await RecordingService._access_query(get_async_supabase(), recording_id, columns).execute()
+        return RecordingService._checked_owner(response.data, user_id)
+
+    @staticmethod
+    def _access_query(client, recording_id: str, columns: str):
+        if "user_id" not in columns:
+            columns = f"{columns}, user_id"
+        return client.table("recordings").select(columns).eq("recording_id", recording_id)
+
+    @staticmethod
+    def _checked_owner(rows: List[Dict[str, Any]], user_id: str) -> Optional[Dict[str, Any]]:
+        if not rows:
+            return None
+
+        recording = rows[0]
+        if recording['user_id'] != user_id:
+            raise HTTPException(status_code=403, detail="Not authorized to access this recording")
+        return recording
+
+    @staticmethod
+    def get_recording_details(user_id: str, recording_id: str, include_audio_url: bool = False) -> Optional[schemas.RecordingDetail]:
+        # 1. Fetch recording with transcript/summary counts in the same request
+        response = supabase.table("recordings") \
+            .select("*, transcripts(count), summaries(count)") \
+            .eq("recording_id", recording_id) \
+            .execute()
         if not response.data:
             return None
         
@@ -84,37 +223,18 @@ class RecordingService:
         if recording['user_id'] != user_id:
             raise HTTPException(status_code=403, detail="Not authorized to access this recording")
 
-        # 3. Generate Signed URL
+        transcripts = recording.pop('transcripts', None) or [{}]
+        summaries = recording.pop('summaries', None) or [{}]
+        transcript_count = transcripts[0].get('count') or 0
+        summary_count = summaries[0].get('count') or 0
+
+        # 3. Generate Signed URL (only when the client asks for playback)
         audio_url = None
-        if recording.get('file_path'):
-            try:
-                # Assuming bucket name is 'recordings' as seen in transcribe_recording
-                signed_url_response = supabase.storage.from_("recordings").create_signed_url(recording['file_path'], 60 * 60) # 1 hour
-                if signed_url_response:
-                    # Supabase python client returns a string or a dict usually? 
-                    # create_signed_url usually returns a dict with 'signedURL' or string in some versions.
-                    # Commonly it returns a string in some implementations or {'signedURL': '...'} in others.
-                    # Looking at supabase-py storage-py logic: it returns dictionary usually if not raw.
-                    # Actually storage-py returns the URL string in newer versions or a dict.
-                    # Let's handle generic case or check context. 
-                    # The transcribe method used download(). 
-                    # Let's assume it returns a dict or check usage.
-                    # If create_signed_url returns a dict:
-                    if isinstance(signed_url_response, dict) and 'signedURL' in signed_url_response:
-                         audio_url = signed_url_response['signedURL']
-                    elif isinstance(signed_url_response, str):
-                         audio_url = signed_url_response
-            except Exception as e:
-                print(f"Error generating signed URL: {e}")
-
-        # 4. Get counts
-        transcript_count_res = supabase.table("transcripts").select("transcript_id", count="exact").eq("recording_id", recording_id).execute()
-        transcript_count = transcript_count_res.count or 0
-
-        summary_count_res = supabase.table("summaries").select("summary_id", count="exact").eq("recording_id", recording_id).execute()
-        summary_count = summary_count_res.count or 0
-
-        # 5. Construct response
+        if include_audio_url and recording.get('file_path'):
+            # Cached per path; re-signed shortly before the 1 hour URL expires
+            audio_url = signed_urls.get_signed_url("recordings", recording['file_path'], 60 * 60)
+
+        # 4. Construct response
         # schemas.RecordingDetail expects fields from Recording + extra
         return schemas.RecordingDetail(
             **recording,
@@ -123,11 +243,11 @@ class RecordingService:
             summary_count=summary_count
         )
 
-
     @staticmethod
     def create_recording(recording: schemas.RecordingCreate) -> schemas.Recording:
         data = recording.model_dump(mode='json', exclude_unset=True)
         response = supabase.table("recordings").insert(data).execute()
+        RecordingService.invalidate_recording_counts(response.data[0]['user_id'])
         return response.data[0]
 
     @staticmethod
@@ -135,6 +255,11 @@ class RecordingService:
         data = recording.model_dump(mode='json', exclude_unset=True)
         response = supabase.table("recordings").update(data).eq("recording_id", recording_id).execute()
         if response.data:
+            # Title and duration are printed in exports; cached export files are stale now
+            if {"title", "duration_seconds"} & data.keys():
+                ExportJobService.collect_stale_artifacts(recording_id)
+            if {"title", "folder_id", "is_trashed"} & data.keys():
+                RecordingService.invalidate_recording_counts(response.data[0]['user_id'])
             return response.data[0]
         return None
 
@@ -162,12 +287,18 @@ class RecordingService:
         changes = []
         if 'title' in data and data['title'] != recording['title']:
              changes.append(f"Title: {recording['title']} -> {data['title']}")
+             # Exports print the title; cached export files are stale now
+             ExportJobService.collect_stale_artifacts(recording_id)
         
         if 'folder_id' in data and data['folder_id'] != recording['folder_id']:
              old_f = recording.get('folder_id') or 'Root'
              new_f = data.get('folder_id') or 'Root'
              changes.append(f"Folder: {old_f} -> {new_f}")
 
+        if 'title' in data or 'folder_id' in data:
+             # Search and folder totals may have moved
+             RecordingService.invalidate_recording_counts(user_id)
+
         if 'is_pinned' in data and data['is_pinned'] != recording['is_pinned']:
              changes.append(f"Pinned: {data['is_pinned']}")
 
@@ -198,6 +329,7 @@ class RecordingService:
             "is_trashed": True, 
             "deleted_at": datetime.now().isoformat()
         }).eq("recording_id", recording_id).execute()
+        RecordingService.invalidate_recording_counts(user_id)
 
         # 3. Audit Log
         create_audit_log(
@@ -232,6 +364,7 @@ class RecordingService:
         }).eq("recording_id", recording_id).execute()
         
         restored_recording = update_response.data[0]
+        RecordingService.invalidate_recording_counts(user_id)
 
         # 3. Audit Log
         create_audit_log(
@@ -259,11 +392,14 @@ class RecordingService:
         if recording.get('file_path'):
              try:
                  supabase.storage.from_("recordings").remove([recording['file_path']])
+                 signed_urls.evict("recordings", recording['file_path'])
              except Exception as e:
                  print(f"Error removing file from storage: {e}")
 
         # 3. Delete RECORDING (Cascades to other tables)
         supabase.table("recordings").delete().eq("recording_id", recording_id).execute()
+        RecordingService.invalidate_recording_counts(user_id)
+        SearchService.remove_recording(recording_id)
 
         # 5. Update User Storage
         # We need to subtract file_size_mb from user's storage_used_mb
@@ -278,6 +414,7 @@ class RecordingService:
                      current_storage = user_res.data['storage_used_mb'] or 0
                      new_storage = max(0, current_storage - file_size_mb)
                      supabase.table("users").update({"storage_used_mb": new_storage}).eq("user_id", user_id).execute()
+                     UserService.invalidate_user(user_id)
              except APIError as e:
                  # Check if it's a stack depth error
                  error_str = str(e)
@@ -306,16 +443,49 @@ class RecordingService:
         )
 
     @staticmethod
-    def transcribe_recording(recording_id: str) -> Optional[schemas.Transcript]:
-        # 1. Fetch recording
+    def _fetch_transcribable(recording_id: str) -> Optional[Dict[str, Any]]:
         recording_response = supabase.table("recordings").select("*").eq("recording_id", recording_id).execute()
         if not recording_response.data:
             return None
         recording = recording_response.data[0]
-
-        # 2. Check status
         if recording['status'] != 'PROCESSED':
             raise ValueError("Recording is not processed yet.")
+        return recording
+
+    @staticmethod
+    def start_streaming_transcription(recording_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Creates the new transcript version up front (status PROCESSING, progress 0) so clients
+        can follow it on GET /recordings/{id}/transcribe/stream while the worker fills it in
+        with transcribe_recording(recording_id, transcript_id). The previous version stays
+        active (exports, summaries and search keep using it) until the new one is COMPLETED.
+        """
+        if not RecordingService._fetch_transcribable(recording_id):
+            return None
+        return versioning.create_version("transcripts", recording_id, {
+            "type": "AI_ORIGINAL",
+            "language": "vi",
+            "status": schemas.TranscriptStatus.PROCESSING.value,
+            "progress": 0
+        }, activate=False)
+
+    @staticmethod
+    def mark_transcript_failed(transcript_id: str) -> None:
+        # Never activated, so the previous version is still the active one
+        supabase.table("transcripts").update({"status": schemas.TranscriptStatus.FAILED.value}).eq("transcript_id", transcript_id).execute()
+
+    @staticmethod
+    def transcribe_recording(recording_id: str, transcript_id: Optional[str] = None) -> Optional[schemas.Transcript]:
+        """
+        Transcribes the recording into a new transcript version.
+        With transcript_id (created by start_streaming_transcription) the segments of each
+        audio window are saved as soon as that window and all earlier ones are done, and the
+        transcript's progress is updated after each window.
+        """
+        # 1-2. Fetch recording, check status
+        recording = RecordingService._fetch_transcribable(recording_id)
+        if not recording:
+            return None
 
         # 3. Read audio file
         file_path = recording['file_path']
@@ -326,72 +496,131 @@ class RecordingService:
         
         file_extension = file_path.split('.')[-1]
 
+        if transcript_id:
+            return RecordingService._transcribe_streaming(recording, transcript_id, audio_bytes, file_extension)
+
         # 4. Call transcriber
+        # Long recordings are split into overlapping windows and transcribed concurrently
         try:
-            transcript_json_str = transcriber.transcribe(audio_bytes, file_extension)
-            transcript_data = json.loads(transcript_json_str)
+            duration_seconds = recording.get('duration_seconds')
+            if chunked_transcriber.should_chunk(duration_seconds, file_extension):
+                transcript_data = chunked_transcriber.transcribe_in_windows(
+                    audio_bytes, file_extension, duration_seconds, transcription_cache.transcribe
+                )
+            else:
+                transcript_json_str = transcription_cache.transcribe(audio_bytes, file_extension)
+                transcript_data = json.loads(transcript_json_str)
         except Exception as e:
             raise RuntimeError(f"Transcription failed: {str(e)}")
 
-        # 5. Determine version_no
-        # Get max version_no for this recording
-        transcripts_response = supabase.table("transcripts").select("version_no").eq("recording_id", recording_id).order("version_no", desc=True).limit(1).execute()
-        current_version = 0
-        if transcripts_response.data:
-            current_version = transcripts_response.data[0]['version_no']
-        new_version = current_version + 1
-
-        # 6. Insert into TRANSCRIPTS
-        supabase.table("transcripts").update({"is_active": False}).eq("recording_id", recording_id).execute()
-
+        # 5-6. Insert into TRANSCRIPTS as the next version, PROCESSING and not yet active
+        # version_no allocation and the insert are one atomic call, so concurrent transcriptions
+        # of the same recording cannot collide
         new_transcript_data = {
-            "recording_id": recording_id,
-            "version_no": new_version,
             "type": "AI_ORIGINAL",
             "language": "vi", # Default or detect? The prompt implies it handles it, but schema needs it. Let's assume 'vi' or 'en' or null.
-            "is_active": True
+            "status": schemas.TranscriptStatus.PROCESSING.value,
+            "progress": 0
         }
-        transcript_insert_response = supabase.table("transcripts").insert(new_transcript_data).execute()
-        new_transcript = transcript_insert_response.data[0]
+        new_transcript = versioning.create_version("transcripts", recording_id, new_transcript_data, activate=False)
         transcript_id = new_transcript['transcript_id']
 
-        # 7. Insert into TRANSCRIPT_SEGMENTS
-        segments_to_insert = []
-        speakers_set = set()
-        
-        for idx, segment in enumerate(transcript_data):
-            segments_to_insert.append({
-                "transcript_id": transcript_id,
-                "sequence": idx + 1,
-                "start_time": segment['start_time'],
-                "end_time": segment['end_time'],
-                "content": segment['content'],
-                "speaker_label": segment['speaker_label'],
-                "confidence": 1.0 # Gemini doesn't return confidence per segment in this prompt yet
-            })
-            speakers_set.add(segment['speaker_label'])
-
-        if segments_to_insert:
-            supabase.table("transcript_segments").insert(segments_to_insert).execute()
-
-        # 8. Insert into RECORDING_SPEAKERS
-        # Check existing speakers for this recording
-        existing_speakers_response = supabase.table("recording_speakers").select("speaker_label").eq("recording_id", recording_id).execute()
-        existing_labels = {s['speaker_label'] for s in existing_speakers_response.data}
-        
-        new_speakers = []
-        for label in speakers_set:
-            if label not in existing_labels:
-                new_speakers.append({
-                    "recording_id": recording_id,
-                    "speaker_label": label,
-                    "display_name": label # Initial display name same as label
-                })
-        
-        if new_speakers:
-            supabase.table("recording_speakers").insert(new_speakers).execute()
+        try:
+            # 7. Insert into TRANSCRIPT_SEGMENTS
+            # Batched and parallel: a multi-hour transcript is too large for a single request body
+            segments_to_insert = RecordingService._segment_rows(transcript_id, transcript_data)
+            inserted_segments = bulk_writer.upsert_rows("transcript_segments", segments_to_insert, on_conflict="transcript_id,sequence")
+
+            # 8. Insert into RECORDING_SPEAKERS
+            RecordingService._save_speakers(recording_id, {segment['speaker_label'] for segment in transcript_data})
+        except Exception:
+            RecordingService.mark_transcript_failed(transcript_id)
+            raise
+
+        # 9. COMPLETED and active, then search index, stale exports, AI usage log
+        new_transcript = RecordingService._complete_transcript(recording_id, transcript_id)
+        RecordingService._finish_transcription(recording, transcript_id, inserted_segments)
+        return new_transcript
+
+    @staticmethod
+    def _transcribe_streaming(recording: Dict[str, Any], transcript_id: str, audio_bytes: bytes, file_extension: str) -> Dict[str, Any]:
+        recording_id = recording['recording_id']
+        duration_seconds = recording.get('duration_seconds')
+        if chunked_transcriber.should_chunk(duration_seconds, file_extension):
+            windows = chunked_transcriber.stream_windows(
+                audio_bytes, file_extension, duration_seconds, transcription_cache.transcribe
+            )
+        else:
+            def whole_file():
+                yield None, 1, json.loads(transcription_cache.transcribe(audio_bytes, file_extension))
+            windows = whole_file()
+
+        inserted_segments: List[Dict[str, Any]] = []
+        speakers: set = set()
+        try:
+            for done, (_, window_count, segments) in enumerate(windows, start=1):
+                # Sequences continue across windows; a retried job rewrites the same rows
+                rows = RecordingService._segment_rows(transcript_id, segments, first_sequence=len(inserted_segments) + 1)
+                inserted_segments.extend(
+                    bulk_writer.upsert_rows("transcript_segments", rows, on_conflict="transcript_id,sequence")
+                )
+                new_speakers = {segment['speaker_label'] for segment in segments} - speakers
+                if new_speakers:
+                    RecordingService._save_speakers(recording_id, new_speakers)
+                    speakers |= new_speakers
+                if done < window_count:
+                    supabase.table("transcripts").update({"progress": round(done / window_count, 4)}).eq("transcript_id", transcript_id).execute()
+        except Exception as e:
+            raise RuntimeError(f"Transcription failed: {str(e)}")
+
+        # An earlier attempt of this job may have produced more segments than this one
+        supabase.table("transcript_segments").delete().eq("transcript_id", transcript_id).gt("sequence", len(inserted_segments)).execute()
+        transcript = RecordingService._complete_transcript(recording_id, transcript_id)
+
+        RecordingService._finish_transcription(recording, transcript_id, inserted_segments)
+        return transcript
+
+    @staticmethod
+    def _complete_transcript(recording_id: str, transcript_id: str) -> Optional[Dict[str, Any]]:
+        # Only a transcript with all of its segments written replaces the active version
+        supabase.table("transcripts").update({
+            "status": schemas.TranscriptStatus.COMPLETED.value,
+            "progress": 1
+        }).eq("transcript_id", transcript_id).execute()
+        return versioning.activate_version("transcripts", recording_id, transcript_id)
+
+    @staticmethod
+    def _segment_rows(transcript_id: str, segments: List[Dict[str, Any]], first_sequence: int = 1) -> List[Dict[str, Any]]:
+        return [{
+            "transcript_id": transcript_id,
+            "sequence": first_sequence + idx,
+            "start_time": segment['start_time'],
+            "end_time": segment['end_time'],
+            "content": segment['content'],
+            "speaker_label": segment['speaker_label'],
+            "confidence": 1.0 # Gemini doesn't return confidence per segment in this prompt yet
+        } for idx, segment in enumerate(segments)]
+
+    @staticmethod
+    def _save_speakers(recording_id: str, labels: set) -> None:
+        # Speakers that already exist keep their display names (ignore_duplicates)
+        new_speakers = [{
+            "recording_id": recording_id,
+            "speaker_label": label,
+            "display_name": label # Initial display name same as label
+        } for label in sorted(labels)]
+        bulk_writer.upsert_rows("recording_speakers", new_speakers, on_conflict="recording_id,speaker_label", ignore_duplicates=True)
+
+    @staticmethod
+    def _finish_transcription(recording: Dict[str, Any], transcript_id: str, inserted_segments: List[Dict[str, Any]]) -> None:
+        recording_id = recording['recording_id']
+
+        # The new version replaces the previous one in search
+        SearchService.index_transcript(recording['user_id'], recording_id, transcript_id, inserted_segments)
+
+        # Exports rendered from the previous transcript version are stale now
+        ExportJobService.collect_stale_artifacts(recording_id, "TRANSCRIPT")
 
-        # 9. Insert into AI_USAGE_LOGS
         try:
             ai_usage_log = {
                 "user_id": recording['user_id'],
@@ -404,20 +633,20 @@ class RecordingService:
             # This can happen due to RLS policy recursion or stack depth limits
             print(f"Error creating AI usage log: {e}")
 
-        return new_transcript
-
     @staticmethod
     def create_recording_metadata(user_id: str, request: schemas.RecordingInitRequest) -> dict:
-        # 1. Get User and Tier info
+        # 1. Get User and Tier info (cached; the exact storage check happens at upload complete)
         # Handle stack depth errors from recursive RLS policies
         tier_id = None
         current_storage = 0.0
         try:
-            user_response = supabase.table("users").select("tier_id, storage_used_mb").eq("user_id", user_id).single().execute()
-            if user_response.data:
-                user_data = user_response.data
-                tier_id = user_data.get('tier_id')
-                current_storage = user_data.get('storage_used_mb') or 0.0
+            user = UserService.get_user_by_id(user_id)
+            if not user:
+                raise HTTPException(status_code=404, detail="User not found")
+            tier_id = user.tier_id
+            current_storage = user.storage_used_mb or 0.0
+        except HTTPException:
+            raise
         except APIError as e:
             # Check if it's a stack depth error
             error_str = str(e)
@@ -440,8 +669,8 @@ class RecordingService:
         tier_data = None
         if tier_id:
             try:
-                tier_response = supabase.table("tiers").select("*").eq("tier_id", tier_id).single().execute()
-                tier_data = tier_response.data
+                tier = TierService.get_tier_by_id(tier_id)
+                tier_data = tier.model_dump() if tier else None
             except Exception:
                 # If tier query fails, continue without tier data
                 tier_data = None
@@ -488,6 +717,7 @@ class RecordingService:
             if "foreign key constraint" in str(e).lower():
                  raise HTTPException(status_code=404, detail="Referenced record not found (check folder_id)")
             raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+        RecordingService.invalidate_recording_counts(user_id)
 
         # 5. Create Audit Log
         create_audit_log(
@@ -548,8 +778,8 @@ class RecordingService:
         tier_data = None
         if tier_id:
             try:
-                tier_response = supabase.table("tiers").select("*").eq("tier_id", tier_id).single().execute()
-                tier_data = tier_response.data
+                tier = TierService.get_tier_by_id(tier_id)
+                tier_data = tier.model_dump() if tier else None
             except Exception:
                 # If tier query fails, continue without tier data
                 tier_data = None
@@ -579,6 +809,7 @@ class RecordingService:
         # Handle stack depth errors when updating storage
         try:
             supabase.table("users").update({"storage_used_mb": new_storage}).eq("user_id", user_id).execute()
+            UserService.invalidate_user(user_id)
         except APIError as e:
             # Check if it's a stack depth error
             error_str = str(e)
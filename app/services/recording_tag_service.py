@@ -1,4 +1,5 @@
 from app.utils.database import supabase
+from app.utils import bulk_writer
 from app import schemas
 from typing import List, Optional
 
@@ -29,29 +30,11 @@ class RecordingTagService:
     def add_tags_to_recording(recording_id: str, tags: List[str]) -> List[schemas.RecordingTag]:
         """
         Add multiple tags to a recording.
-        Handles duplicates by checking existing tags first.
+        Tags the recording already has are skipped by the UNIQUE(recording_id, tag) upsert.
         Returns list of created tags.
         """
-        # Get existing tags for this recording
-        existing_response = supabase.table("recording_tags") \
-            .select("tag") \
-            .eq("recording_id", recording_id) \
-            .execute()
-
-        existing_tags = {item['tag'] for item in existing_response.data}
-
-        # Filter out duplicates
-        new_tags = [tag for tag in tags if tag not in existing_tags]
-
-        if not new_tags:
-            return []
-
-        # Prepare data for insertion
-        tags_data = [{"recording_id": recording_id, "tag": tag} for tag in new_tags]
-
-        # Insert new tags
-        response = supabase.table("recording_tags").insert(tags_data).execute()
-        return response.data
+        tags_data = [{"recording_id": recording_id, "tag": tag} for tag in dict.fromkeys(tags)]
+        return bulk_writer.upsert_rows("recording_tags", tags_data, on_conflict="recording_id,tag", ignore_duplicates=True)
 
     @staticmethod
     def create_recording_tag(tag: schemas.RecordingTagCreate) -> schemas.RecordingTag:
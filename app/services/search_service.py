@@ -0,0 +1,102 @@
+from app.utils.database import supabase
+from app.utils import search_index
+from typing import List, Optional, Dict, Any, Iterable
+
+
+class SearchService:
+    """
+    Keeps the local search index in step with transcript and summary writes.
+    Index failures are logged and never fail the write that triggered them;
+    POST /search/reindex rebuilds a user's entries from the database.
+    """
+
+    @staticmethod
+    def index_transcript(user_id: str, recording_id: str, transcript_id: str, segments: Iterable[Dict[str, Any]]) -> None:
+        try:
+            search_index.get_index().index_transcript(user_id, recording_id, transcript_id, segments)
+        except Exception as e:
+            print(f"Error indexing transcript {transcript_id}: {e}")
+
+    @staticmethod
+    def index_summary(recording_id: str, content_structure: Optional[Dict[str, Any]], user_id: Optional[str] = None) -> None:
+        try:
+            index = search_index.get_index()
+            if user_id is None:
+                owner = index.owner(recording_id)
+                if owner:
+                    user_id = owner['user_id']
+                else:
+                    recording = supabase.table("recordings").select("user_id").eq("recording_id", recording_id).execute()
+                    if not recording.data:
+                        return
+                    user_id = recording.data[0]['user_id']
+            index.index_summary(user_id, recording_id, content_structure)
+        except Exception as e:
+            print(f"Error indexing summary of recording {recording_id}: {e}")
+
+    @staticmethod
+    def upsert_segment(transcript_id: str, segment: Dict[str, Any]) -> None:
+        try:
+            search_index.get_index().upsert_segment(transcript_id, segment)
+        except Exception as e:
+            print(f"Error indexing segment {segment.get('segment_id')}: {e}")
+
+    @staticmethod
+    def upsert_segments(transcript_id: str, segments: List[Dict[str, Any]]) -> None:
+        if not segments:
+            return
+        try:
+            search_index.get_index().upsert_segments(transcript_id, segments)
+        except Exception as e:
+            print(f"Error indexing {len(segments)} segments of transcript {transcript_id}: {e}")
+
+    @staticmethod
+    def remove_segment(segment_id: int) -> None:
+        try:
+            search_index.get_index().remove_segment(segment_id)
+        except Exception as e:
+            print(f"Error removing segment {segment_id} from search index: {e}")
+
+    @staticmethod
+    def remove_recording(recording_id: str) -> None:
+        try:
+            search_index.get_index().remove_recording(recording_id)
+        except Exception as e:
+            print(f"Error removing recording {recording_id} from search index: {e}")
+
+    @staticmethod
+    def reindex_recording(user_id: str, recording_id: str) -> None:
+        """Index the active transcript and latest summary of one recording"""
+        from app.services.transcript_segment_service import TranscriptSegmentService
+
+        transcripts = supabase.table("transcripts").select("transcript_id").eq("recording_id", recording_id).eq("is_active", True).execute()
+        if transcripts.data:
+            transcript_id = transcripts.data[0]['transcript_id']
+            search_index.get_index().index_transcript(
+                user_id, recording_id, transcript_id, TranscriptSegmentService.iter_segments(transcript_id)
+            )
+        summaries = supabase.table("summaries").select("content_structure").eq("recording_id", recording_id).eq("is_latest", True).execute()
+        if summaries.data:
+            search_index.get_index().index_summary(user_id, recording_id, summaries.data[0]['content_structure'])
+
+    @staticmethod
+    def reindex_user(user_id: str) -> int:
+        """Rebuild the index entries of every recording the user owns; returns the recording count"""
+        recordings = supabase.table("recordings").select("recording_id").eq("user_id", user_id).execute()
+        for recording in recordings.data:
+            SearchService.reindex_recording(user_id, recording['recording_id'])
+        return len(recordings.data)
+
+    @staticmethod
+    def search(user_id: str, query: str, limit: int = 20, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Ranked hits with their recording's title. Hits in trashed or deleted recordings are dropped.
+        """
+        hits = search_index.get_index().search(user_id, query, limit=limit, kind=kind)
+        if not hits:
+            return []
+
+        recording_ids = list({hit['recording_id'] for hit in hits})
+        response = supabase.table("recordings").select("recording_id, title, is_trashed").in_("recording_id", recording_ids).eq("user_id", user_id).execute()
+        titles = {r['recording_id']: r['title'] for r in response.data if not r.get('is_trashed')}
+        return [{**hit, "recording_title": titles[hit['recording_id']]} for hit in hits if hit['recording_id'] in titles]
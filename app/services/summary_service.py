@@ -2,6 +2,9 @@ from app.utils.database import supabase
 from app import schemas
 from typing import List, Optional
 from app.utils.audit import create_audit_log
+from app.services.export_job_service import ExportJobService
+from app.services.search_service import SearchService
+from app.utils import versioning
 
 class SummaryService:
     @staticmethod
@@ -54,6 +57,11 @@ class SummaryService:
         # 4. Update
         response = supabase.table("summaries").update(data).eq("summary_id", summary_id).execute()
         if response.data:
+            # A different latest version, or edited content, makes cached summary exports stale
+            if summary.is_latest or "content_structure" in data:
+                ExportJobService.collect_stale_artifacts(recording_id, "SUMMARY")
+                if response.data[0].get('is_latest'):
+                    SearchService.index_summary(recording_id, response.data[0].get('content_structure'))
             return response.data[0]
         return None
 
@@ -65,7 +73,7 @@ class SummaryService:
     def generate_summary(recording_id: str, summary_style: str = "MEETING") -> schemas.Summary:
         from app.services.transcript_service import TranscriptService
         from app.utils.transcript_utils import clean_transcript_for_summary
-        from app.utils.summarizer import generate_summary_gemini
+        from app.utils.summarizer import summarize_transcript
         
         # 1. Get active transcript
         active_transcripts = TranscriptService.get_transcripts_by_recording_id(recording_id, latest=True)
@@ -76,41 +84,28 @@ class SummaryService:
 
 
         
-        # 2. Get transcript details (with segments)
-        transcript_detail = TranscriptService.get_transcript_by_id(active_transcript['transcript_id'])
-        if not transcript_detail:
-             raise ValueError("Failed to retrieve transcript details.")
+        # 2. Get the segments (columnar: no dict or model per segment)
+        transcript = TranscriptService.get_compact_transcript(active_transcript['transcript_id'])
 
         # 3. Prepare text for AI
-        cleaned_text = clean_transcript_for_summary(transcript_detail.segments)
+        cleaned_text = clean_transcript_for_summary(transcript)
         
-        # 4. Call Gemini
-        summary_content = generate_summary_gemini(cleaned_text, summary_style)
-        
-        # 5. Handle Versioning
-        # Get current max version
-        res = supabase.table("summaries").select("version_no").eq("recording_id", recording_id).order("version_no", desc=True).limit(1).execute()
-        current_version = 0
-        if res.data:
-            current_version = res.data[0]['version_no']
-        
-        new_version = current_version + 1
-        
-        # Set old summaries to is_latest=False
-        supabase.table("summaries").update({"is_latest": False}).eq("recording_id", recording_id).execute()
+        # 4. Call Gemini (map-reduce when the transcript exceeds the model context)
+        try:
+            summary_content = summarize_transcript(cleaned_text, summary_style)
+        except Exception as e:
+            raise RuntimeError(f"Summary generation failed: {str(e)}")
         
-        # 6. Insert new summary
+        # 5-6. Insert new summary as the latest version
+        # version_no allocation, clearing is_latest and the insert are one atomic call
         new_summary_data = {
-            "recording_id": recording_id,
-            "version_no": new_version,
             "type": "AI_GENERATED",
             "summary_style": summary_style,
             "content_structure": summary_content,
-            "is_latest": True,          
         }
-        
-        response = supabase.table("summaries").insert(new_summary_data).execute()
-        new_summary = response.data[0]
+        new_summary = versioning.create_version("summaries", recording_id, new_summary_data)
+        ExportJobService.collect_stale_artifacts(recording_id, "SUMMARY")
+        SearchService.index_summary(recording_id, summary_content)
 
         # 7. Log AI Usage
         try:
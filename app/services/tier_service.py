@@ -1,8 +1,17 @@
+import os
 from app.utils.database import supabase
+from app.utils.ttl_cache import TTLCache
 from app import schemas
 from typing import List, Optional
 from app.utils.audit import create_audit_log
 
+# Tiers change only through admin endpoints, which invalidate below
+tier_cache = TTLCache(
+    "tiers",
+    maxsize=int(os.getenv("TIER_CACHE_MAXSIZE", "256")),
+    ttl=float(os.getenv("TIER_CACHE_TTL_SECONDS", "600"))
+)
+
 class TierService:
     @staticmethod
     def get_all_tiers() -> List[schemas.Tier]:
@@ -11,6 +20,10 @@ class TierService:
 
     @staticmethod
     def get_tier_by_id(tier_id: int) -> Optional[schemas.Tier]:
+        return tier_cache.get_or_load(int(tier_id), lambda: TierService._fetch_tier(tier_id))
+
+    @staticmethod
+    def _fetch_tier(tier_id: int) -> Optional[schemas.Tier]:
         response = supabase.table("tiers").select("*").eq("tier_id", tier_id).execute()
         if response.data:
             return schemas.Tier(**response.data[0])
@@ -26,6 +39,7 @@ class TierService:
     def update_tier(tier_id: int, tier: schemas.TierUpdate) -> Optional[schemas.Tier]:
         data = tier.model_dump(mode='json', exclude_unset=True)
         response = supabase.table("tiers").update(data).eq("tier_id", tier_id).execute()
+        tier_cache.invalidate(int(tier_id))
         if response.data:
             # Audit Log
             # Audit Log
@@ -48,3 +62,4 @@ class TierService:
     @staticmethod
     def delete_tier(tier_id: int) -> None:
         supabase.table("tiers").delete().eq("tier_id", tier_id).execute()
+        tier_cache.invalidate(int(tier_id))
@@ -1,7 +1,24 @@
 from app.utils.database import supabase
 from app import schemas
-from typing import List, Optional
+import os
+import re
+from typing import List, Optional, Iterator, Dict, Any
+from fastapi import HTTPException
 from app.utils.audit import create_audit_log
+from app.utils.segment_index import SegmentTimeIndex
+from app.utils.ttl_cache import TTLCache
+from app.services.export_job_service import ExportJobService
+from app.services.search_service import SearchService
+
+# Time indexes of recently queried transcripts, keyed by transcript_id (one per version).
+# Dropped on segment edits in this process; the TTL bounds staleness for edits made elsewhere.
+segment_index_cache = TTLCache(
+    "segment_time_index",
+    maxsize=int(os.getenv("SEGMENT_INDEX_CACHE_MAXSIZE", "64")),
+    ttl=float(os.getenv("SEGMENT_INDEX_CACHE_TTL_SECONDS", "300"))
+)
+# A transcript that is still being filled in (streaming transcription) gains segments every window
+SEGMENT_INDEX_PROCESSING_TTL_SECONDS = float(os.getenv("SEGMENT_INDEX_PROCESSING_TTL_SECONDS", "2"))
 
 class TranscriptSegmentService:
     @staticmethod
@@ -9,11 +26,103 @@ class TranscriptSegmentService:
         response = supabase.table("transcript_segments").select("*").eq("transcript_id", transcript_id).order("start_time").execute()
         return response.data
 
+    @staticmethod
+    def iter_segments(
+        transcript_id: str,
+        page_size: int = 1000,
+        start_sequence: Optional[int] = None,
+        end_sequence: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yields segments in sequence order, fetching one page at a time (keyset on sequence).
+        Used by exports so a multi-hour transcript is never loaded as a single response.
+        start_sequence / end_sequence limit it to an inclusive range.
+        """
+        last_sequence = None
+        while True:
+            query = supabase.table("transcript_segments").select("*").eq("transcript_id", transcript_id)
+            if last_sequence is not None:
+                query = query.gt("sequence", last_sequence)
+            elif start_sequence is not None:
+                query = query.gte("sequence", start_sequence)
+            if end_sequence is not None:
+                query = query.lte("sequence", end_sequence)
+            rows = query.order("sequence").limit(page_size).execute().data
+            yield from rows
+            if len(rows) < page_size:
+                return
+            last_sequence = rows[-1]["sequence"]
+
+    @staticmethod
+    def get_time_index(transcript_id: str) -> SegmentTimeIndex:
+        """
+        The transcript's SegmentTimeIndex, built from one paged read of its segments and cached.
+
+        Raises:
+            HTTPException 404 if the transcript does not exist
+        """
+        index = segment_index_cache.get(transcript_id)
+        if index is not None:
+            segment_index_cache.record(hit=True)
+            return index
+        segment_index_cache.record(hit=False)
+
+        transcript = supabase.table("transcripts").select("status").eq("transcript_id", transcript_id).execute()
+        if not transcript.data:
+            raise HTTPException(status_code=404, detail="Transcript not found")
+        index = SegmentTimeIndex(TranscriptSegmentService.iter_segments(transcript_id))
+        processing = transcript.data[0].get('status') == schemas.TranscriptStatus.PROCESSING.value
+        segment_index_cache.set(transcript_id, index, ttl=SEGMENT_INDEX_PROCESSING_TTL_SECONDS if processing else None)
+        return index
+
+    @staticmethod
+    def invalidate_time_index(transcript_id: str) -> None:
+        segment_index_cache.invalidate(transcript_id)
+
+    @staticmethod
+    def get_segments_in_window(transcript_id: str, start: float, end: float, offset: int = 0, limit: int = 100) -> Dict[str, Any]:
+        """Segments overlapping [start, end] in start_time order: {"data": page, "total": all matches}"""
+        if end < start:
+            raise ValueError("end must not be before start")
+        index = TranscriptSegmentService.get_time_index(transcript_id)
+        return {
+            "data": index.overlapping(start, end, offset, limit),
+            "total": index.count_overlapping(start, end)
+        }
+
+    @staticmethod
+    def get_segment_at(transcript_id: str, time_seconds: float) -> Optional[Dict[str, Any]]:
+        return TranscriptSegmentService.get_time_index(transcript_id).at(time_seconds)
+
+    @staticmethod
+    def segments_fingerprint(transcript_id: str) -> List[Any]:
+        """
+        [segment count, highest segment_id] of a transcript. Adding or deleting a segment changes
+        it without a new transcript version, so it is part of the export artifact inputs.
+        """
+        response = supabase.table("transcript_segments") \
+            .select("segment_id", count="exact") \
+            .eq("transcript_id", transcript_id) \
+            .order("segment_id", desc=True) \
+            .limit(1) \
+            .execute()
+        return [response.count or 0, response.data[0]['segment_id'] if response.data else None]
+
+    @staticmethod
+    def _collect_stale_exports(transcript_id: str) -> None:
+        # Segment changes alter exported content without a new transcript version
+        transcript = supabase.table("transcripts").select("recording_id").eq("transcript_id", transcript_id).execute()
+        if transcript.data:
+            ExportJobService.collect_stale_artifacts(transcript.data[0]['recording_id'], "TRANSCRIPT")
+
     @staticmethod
     def create_transcript_segment(transcript_id: str, segment: schemas.TranscriptSegmentCreate) -> schemas.TranscriptSegment:
         data = segment.model_dump(mode='json', exclude_unset=True)
         data["transcript_id"] = transcript_id
         response = supabase.table("transcript_segments").insert(data).execute()
+        TranscriptSegmentService.invalidate_time_index(transcript_id)
+        TranscriptSegmentService._collect_stale_exports(transcript_id)
+        SearchService.upsert_segment(transcript_id, response.data[0])
         return schemas.TranscriptSegment(**response.data[0])
 
     @staticmethod
@@ -21,6 +130,11 @@ class TranscriptSegmentService:
         data = segment.model_dump(mode='json', exclude_unset=True)
         response = supabase.table("transcript_segments").update(data).eq("transcript_id", transcript_id).eq("segment_id", segment_id).execute()
         if response.data:
+            TranscriptSegmentService.invalidate_time_index(transcript_id)
+            TranscriptSegmentService._collect_stale_exports(transcript_id)
+            if "content" in data:
+                SearchService.upsert_segment(transcript_id, response.data[0])
+
             # Create audit log
             # Create audit log
             # Note: We don't have user_id here, so it will be None.
@@ -36,6 +150,83 @@ class TranscriptSegmentService:
             return schemas.TranscriptSegment(**response.data[0])
         return None
 
+    @staticmethod
+    def bulk_edit_segments(transcript_id: str, edit: schemas.TranscriptSegmentBulkEdit, user_id: Optional[str] = None) -> List[schemas.TranscriptSegment]:
+        """
+        Applies a batch of edits with one read of the affected segments, one upsert and one
+        audit entry, however many segments change. Returns the changed segments.
+        """
+        # 1. Load the affected segments
+        rows: Dict[int, Dict[str, Any]] = {}
+        for op in (edit.relabel, edit.find_replace):
+            if op:
+                for row in TranscriptSegmentService.iter_segments(transcript_id, start_sequence=op.start_sequence, end_sequence=op.end_sequence):
+                    rows[row['segment_id']] = row
+        missing = [p.segment_id for p in edit.segments if p.segment_id not in rows]
+        for i in range(0, len(missing), 500):
+            # Chunked so the id list stays within URL length limits
+            response = supabase.table("transcript_segments").select("*").eq("transcript_id", transcript_id).in_("segment_id", missing[i:i + 500]).execute()
+            for row in response.data:
+                rows[row['segment_id']] = row
+        not_found = sorted({p.segment_id for p in edit.segments} - rows.keys())
+        if not_found:
+            raise HTTPException(status_code=404, detail=f"Segments not found in this transcript: {not_found[:20]}")
+
+        # 2. Apply the edits in memory
+        originals = {segment_id: dict(row) for segment_id, row in rows.items()}
+        if edit.relabel:
+            for row in rows.values():
+                if row['speaker_label'] == edit.relabel.from_label and TranscriptSegmentService._in_range(row, edit.relabel):
+                    row['speaker_label'] = edit.relabel.to_label
+        if edit.find_replace:
+            fr = edit.find_replace
+            pattern = re.compile(re.escape(fr.find), 0 if fr.match_case else re.IGNORECASE)
+            for row in rows.values():
+                if row['content'] and TranscriptSegmentService._in_range(row, fr):
+                    row['content'] = pattern.sub(lambda _: fr.replace, row['content'])
+        for patch in edit.segments:
+            rows[patch.segment_id].update(patch.model_dump(exclude_unset=True, exclude={"segment_id"}))
+
+        changed = [row for segment_id, row in rows.items() if row != originals[segment_id]]
+        if not changed:
+            return []
+        for row in changed:
+            row['is_user_edited'] = True
+
+        # 3. One write for the whole batch
+        response = supabase.table("transcript_segments").upsert(changed, on_conflict="segment_id").execute()
+        TranscriptSegmentService.invalidate_time_index(transcript_id)
+
+        TranscriptSegmentService._collect_stale_exports(transcript_id)
+        SearchService.upsert_segments(transcript_id, [row for row in changed if row['content'] != originals[row['segment_id']]['content']])
+
+        # 4. One audit entry for the batch
+        details = [f"{len(changed)} segments"]
+        if edit.relabel:
+            details.append(f"relabel {edit.relabel.from_label} -> {edit.relabel.to_label}")
+        if edit.find_replace:
+            details.append(f"replace '{edit.find_replace.find}' -> '{edit.find_replace.replace}'")
+        if edit.segments:
+            details.append(f"{len(edit.segments)} patches")
+        create_audit_log(
+            user_id=user_id,
+            action_type="BULK_UPDATE_TRANSCRIPT_SEGMENTS",
+            resource_type="TRANSCRIPT",
+            resource_id=transcript_id,
+            status="SUCCESS",
+            details=f"Bulk edit in transcript {transcript_id}: " + ", ".join(details)
+        )
+
+        return [schemas.TranscriptSegment(**row) for row in response.data]
+
+    @staticmethod
+    def _in_range(row: Dict[str, Any], op) -> bool:
+        return ((op.start_sequence is None or row['sequence'] >= op.start_sequence)
+                and (op.end_sequence is None or row['sequence'] <= op.end_sequence))
+
     @staticmethod
     def delete_transcript_segment(transcript_id: str, segment_id: int) -> None:
         supabase.table("transcript_segments").delete().eq("transcript_id", transcript_id).eq("segment_id", segment_id).execute()
+        TranscriptSegmentService.invalidate_time_index(transcript_id)
+        TranscriptSegmentService._collect_stale_exports(transcript_id)
+        SearchService.remove_segment(segment_id)
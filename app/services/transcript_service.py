@@ -1,8 +1,20 @@
-from app.utils.database import supabase
+import asyncio
+import os
+import time
+from app.utils.database import supabase, get_async_supabase
 from app import schemas
-from typing import List, Optional
+from app.services.export_job_service import ExportJobService
+from app.services.search_service import SearchService
+from app.services.transcript_segment_service import TranscriptSegmentService
+from app.utils.compact_transcript import CompactTranscript
+from typing import List, Optional, AsyncIterator, Tuple, Any, Dict
 from fastapi import HTTPException
 
+# GET /recordings/{id}/transcribe/stream polls the transcript this often while it is PROCESSING
+STREAM_POLL_SECONDS = float(os.getenv("TRANSCRIPT_STREAM_POLL_SECONDS", "1"))
+STREAM_KEEPALIVE_SECONDS = float(os.getenv("TRANSCRIPT_STREAM_KEEPALIVE_SECONDS", "15"))
+STREAM_PAGE_SIZE = 500
+
 class TranscriptService:
     @staticmethod
     def get_all_transcripts() -> List[schemas.Transcript]:
@@ -19,9 +31,40 @@ class TranscriptService:
         
         # Fetch segments
         segments_response = supabase.table("transcript_segments").select("*").eq("transcript_id", transcript_id).order("sequence").execute()
-        segments_data = segments_response.data
-        
-        return schemas.TranscriptDetail(**transcript_data, segments=segments_data)
+        return TranscriptService._detail(transcript_data, segments_response.data)
+
+    @staticmethod
+    async def get_transcript_by_id_async(transcript_id: str, user_id: Optional[str] = None) -> Optional[schemas.TranscriptDetail]:
+        """
+        With user_id, the owner of the transcript's recording is checked before any segment is
+        read (HTTPException 403 if it is another user or the recording is gone).
+        """
+        client = get_async_supabase()
+        response = await client.table("transcripts").select("*").eq("transcript_id", transcript_id).execute()
+        if not response.data:
+            return None
+
+        transcript_data = response.data[0]
+        if user_id is not None:
+            from app.services.recording_service import RecordingService
+            if not await RecordingService.check_recording_access_async(user_id, transcript_data['recording_id']):
+                raise HTTPException(status_code=403, detail="Access denied")
+
+        segments_response = await client.table("transcript_segments").select("*").eq("transcript_id", transcript_id).order("sequence").execute()
+        return TranscriptService._detail(transcript_data, segments_response.data)
+
+    @staticmethod
+    def _detail(transcript_data: Dict[str, Any], segment_rows: List[Dict[str, Any]]) -> schemas.TranscriptDetail:
+        # Segment rows come straight from the table; validating thousands of them one model at a
+        # time is most of the cost of this read, so they are constructed without it
+        detail = schemas.TranscriptDetail(**transcript_data)
+        detail.segments = [schemas.TranscriptSegment.model_construct(**row) for row in segment_rows]
+        return detail
+
+    @staticmethod
+    def get_compact_transcript(transcript_id: str) -> CompactTranscript:
+        """All segments of a transcript in sequence order, read page by page into columnar form"""
+        return CompactTranscript.from_rows(TranscriptSegmentService.iter_segments(transcript_id), transcript_id)
 
     @staticmethod
     def create_transcript(transcript: schemas.TranscriptCreate) -> schemas.Transcript:
@@ -39,6 +82,7 @@ class TranscriptService:
                 recording_id = res.data[0]['recording_id']
                 # Deactivate all transcripts for this recording
                 supabase.table("transcripts").update({"is_active": False}).eq("recording_id", recording_id).execute()
+                ExportJobService.collect_stale_artifacts(recording_id, "TRANSCRIPT")
             else:
                 return None  # Transcript not found
 
@@ -54,6 +98,11 @@ class TranscriptService:
                 status="SUCCESS",
                 details=f"Updated usage/content"
             )
+            if transcript.is_active is True:
+                # Search follows the active version
+                SearchService.index_transcript(
+                    user_id, recording_id, transcript_id, TranscriptSegmentService.iter_segments(transcript_id)
+                )
             return response.data[0]
         return None
 
@@ -64,14 +113,7 @@ class TranscriptService:
     @staticmethod
     def get_transcripts_by_recording_id(recording_id: str, latest: bool = False) -> List[schemas.Transcript]:
         try:
-            query = supabase.table("transcripts").select("*").eq("recording_id", recording_id)
-            if latest:
-                query = query.eq("is_active", True)
-            
-            # Order by version_no descending to show latest first (optional but good UX)
-            query = query.order("version_no", desc=True)
-            
-            response = query.execute()
+            response = TranscriptService._recording_transcripts_query(supabase, recording_id, latest).execute()
             return response.data
         except Exception as e:
             # Log the error and return empty list instead of crashing
@@ -80,3 +122,68 @@ class TranscriptService:
                 status_code=503,
                 detail=f"Database connection error: {str(e)}"
             )
+
+    @staticmethod
+    async def get_transcripts_by_recording_id_async(recording_id: str, latest: bool = False) -> List[schemas.Transcript]:
+        try:
+            response = await TranscriptService._recording_transcripts_query(get_async_supabase(), recording_id, latest).execute()
+            return response.data
+        except Exception as e:
+            print(f"Error fetching transcripts for recording {recording_id}: {e}")
+            raise HTTPException(
+                status_code=503,
+                detail=f"Database connection error: {str(e)}"
+            )
+
+    @staticmethod
+    def _recording_transcripts_query(client, recording_id: str, latest: bool):
+        query = client.table("transcripts").select("*").eq("recording_id", recording_id)
+        if latest:
+            query = query.eq("is_active", True)
+        
+        # Order by version_no descending to show latest first (optional but good UX)
+        return query.order("version_no", desc=True)
+
+    @staticmethod
+    async def stream_transcript(
+        transcript_id: str,
+        after_sequence: int = 0,
+        poll_interval: float = STREAM_POLL_SECONDS
+    ) -> AsyncIterator[Tuple[str, Any, Optional[int]]]:
+        """
+        Follows a transcript that is being filled in. Yields (event, data, last sequence):
+        "segments" with the segments after after_sequence as they are saved, "status" when
+        status or progress change, "keepalive" when nothing happened for a while, and a final
+        "done" once the transcript is no longer PROCESSING and every segment was sent.
+        """
+        client = get_async_supabase()
+        last_status = None
+        last_event = time.monotonic()
+        while True:
+            # Status first: once it reads COMPLETED, every segment is already saved
+            response = await client.table("transcripts").select("status, progress").eq("transcript_id", transcript_id).execute()
+            if not response.data:
+                raise HTTPException(status_code=404, detail="Transcript not found")
+            current = response.data[0]
+
+            segments = (await client.table("transcript_segments").select("*")
+                        .eq("transcript_id", transcript_id).gt("sequence", after_sequence)
+                        .order("sequence").limit(STREAM_PAGE_SIZE).execute()).data
+            if segments:
+                after_sequence = segments[-1]['sequence']
+                last_event = time.monotonic()
+                yield "segments", segments, after_sequence
+            if (current['status'], current['progress']) != last_status:
+                last_status = (current['status'], current['progress'])
+                last_event = time.monotonic()
+                yield "status", {"transcript_id": transcript_id, **current}, None
+
+            if len(segments) == STREAM_PAGE_SIZE:
+                continue
+            if current['status'] != schemas.TranscriptStatus.PROCESSING.value:
+                yield "done", {"transcript_id": transcript_id, "status": current['status']}, after_sequence
+                return
+            if time.monotonic() - last_event >= STREAM_KEEPALIVE_SECONDS:
+                last_event = time.monotonic()
+                yield "keepalive", None, None
+            await asyncio.sleep(poll_interval)
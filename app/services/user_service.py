@@ -1,7 +1,16 @@
-from app.utils.database import supabase
+import os
+from app.utils.database import supabase, get_async_supabase
+from app.utils.ttl_cache import TTLCache
 from app import schemas
 from typing import List, Optional
 
+# Profiles are read on every authenticated request; writes through UserService invalidate them
+user_cache = TTLCache(
+    "users",
+    maxsize=int(os.getenv("USER_CACHE_MAXSIZE", "10000")),
+    ttl=float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+)
+
 class UserService:
     @staticmethod
     def get_all_users(
@@ -23,11 +32,30 @@ class UserService:
 
     @staticmethod
     def get_user_by_id(user_id: str) -> Optional[schemas.User]:
+        return user_cache.get_or_load(user_id, lambda: UserService._fetch_user(user_id))
+
+    @staticmethod
+    def _fetch_user(user_id: str) -> Optional[schemas.User]:
         response = supabase.table("users").select("*").eq("user_id", user_id).execute()
         if response.data:
             return schemas.User(**response.data[0])
         return None
 
+    @staticmethod
+    async def get_user_by_id_async(user_id: str) -> Optional[schemas.User]:
+        return await user_cache.aget_or_load(user_id, lambda: UserService._fetch_user_async(user_id))
+
+    @staticmethod
+    async def _fetch_user_async(user_id: str) -> Optional[schemas.User]:
+        response = await get_async_supabase().table("users").select("*").eq("user_id", user_id).execute()
+        if response.data:
+            return schemas.User(**response.data[0])
+        return None
+
+    @staticmethod
+    def invalidate_user(user_id: str) -> None:
+        user_cache.invalidate(user_id)
+
     @staticmethod
     def create_user(user: schemas.UserCreate) -> schemas.User:
         data = user.model_dump(mode='json', exclude_unset=True)
@@ -38,6 +66,7 @@ class UserService:
     def update_user(user_id: str, user: schemas.UserUpdate) -> Optional[schemas.User]:
         data = user.model_dump(mode='json', exclude_unset=True)
         response = supabase.table("users").update(data).eq("user_id", user_id).execute()
+        user_cache.invalidate(user_id)
         if response.data:
             return response.data[0]
         return None
@@ -45,3 +74,4 @@ class UserService:
     @staticmethod
     def delete_user(user_id: str) -> None:
         supabase.table("users").delete().eq("user_id", user_id).execute()
+        user_cache.invalidate(user_id)
@@ -1,6 +1,249 @@
+import os
+import json
+import atexit
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from typing import Optional, List, Dict, Any
+
+from app.utils.bulk_writer import is_retryable_error
 from app.utils.database import supabase
-from typing import Optional
-from postgrest.exceptions import APIError
+
+# Audit events are buffered in memory and written in bulk by a background thread,
+# so mutating requests no longer wait for an audit_logs round trip.
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "100"))
+AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", "2"))
+AUDIT_MAX_BUFFER = int(os.getenv("AUDIT_MAX_BUFFER", "10000"))
+# What to do when the buffer is full: "spill" (append to the spill file), "drop_oldest" or "drop_newest"
+AUDIT_OVERFLOW_POLICY = os.getenv("AUDIT_OVERFLOW_POLICY", "spill")
+AUDIT_SPILL_FILE = os.getenv("AUDIT_SPILL_FILE", ".cache/audit_spill.jsonl")
+# Rows the database rejects outright (constraint, type errors) are set aside here instead of retried
+AUDIT_REJECTED_FILE = os.getenv("AUDIT_REJECTED_FILE", ".cache/audit_rejected.jsonl")
+
+_STACK_DEPTH_KEYWORDS = ("stack depth", "54001", "max_stack_depth")
+
+
+def _is_stack_depth_error(error: Exception) -> bool:
+    error_str = str(error).lower()
+    return any(keyword in error_str for keyword in _STACK_DEPTH_KEYWORDS)
+
+
+class AuditWriter:
+    """
+    Bounded in-memory queue of audit rows with a background flusher.
+
+    A batch is written when AUDIT_BATCH_SIZE rows are waiting or AUDIT_FLUSH_INTERVAL seconds
+    have passed. If the database cannot be reached the batch is appended to a local JSONL spill
+    file, which is replayed ahead of new rows once the database accepts writes again. A batch
+    the database rejects is split until the offending rows are found; those go to the rejected
+    file and the rest is written.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = AUDIT_BATCH_SIZE,
+        flush_interval: float = AUDIT_FLUSH_INTERVAL,
+        max_buffer: int = AUDIT_MAX_BUFFER,
+        overflow_policy: str = AUDIT_OVERFLOW_POLICY,
+        spill_path: str = AUDIT_SPILL_FILE,
+        rejected_path: str = AUDIT_REJECTED_FILE
+    ):
+        if overflow_policy not in ("spill", "drop_oldest", "drop_newest"):
+            raise ValueError(f"Unknown audit overflow policy: {overflow_policy}")
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_buffer = max(1, max_buffer)
+        self.overflow_policy = overflow_policy
+        self.spill_path = spill_path
+        self.rejected_path = rejected_path
+
+        self._buffer: deque = deque()
+        self._cond = threading.Condition()
+        self._spill_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+        self.written = 0
+        self.dropped = 0
+        self.spilled = 0
+        self.rejected = 0
+        self.failed_flushes = 0
+
+    def enqueue(self, row: Dict[str, Any]) -> None:
+        overflow = None
+        with self._cond:
+            if len(self._buffer) >= self.max_buffer:
+                if self.overflow_policy == "drop_oldest":
+                    self._buffer.popleft()
+                    self.dropped += 1
+                elif self.overflow_policy == "drop_newest":
+                    self.dropped += 1
+                    return
+                else:
+                    overflow = row
+            if overflow is None:
+                self._buffer.append(row)
+                if len(self._buffer) >= self.batch_size:
+                    self._cond.notify()
+            self._ensure_started()
+
+        if overflow is not None:
+            self._spill([overflow])
+
+    def _ensure_started(self) -> None:
+        # Called with self._cond held
+        if self._thread is None and not self._stopping:
+            self._thread = threading.Thread(target=self._run, name="audit-flusher", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self._stopping and len(self._buffer) < self.batch_size:
+                    self._cond.wait(self.flush_interval)
+                if self._stopping:
+                    return
+            self.flush()
+
+    def _take_batch(self) -> List[Dict[str, Any]]:
+        with self._cond:
+            count = min(self.batch_size, len(self._buffer))
+            return [self._buffer.popleft() for _ in range(count)]
+
+    def flush(self) -> None:
+        """Writes spilled rows first, then everything currently buffered."""
+        with self._flush_lock:
+            if not self._replay_spill():
+                # Database still unavailable: keep new rows behind the spilled ones
+                self._spill(self._take_all())
+                return
+            while True:
+                batch = self._take_batch()
+                if not batch:
+                    return
+                unwritten = self._insert(batch)
+                if unwritten:
+                    self._spill(unwritten + self._take_all())
+                    return
+
+    def _take_all(self) -> List[Dict[str, Any]]:
+        with self._cond:
+            rows = list(self._buffer)
+            self._buffer.clear()
+            return rows
+
+    def _insert(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Writes rows; returns the ones left unwritten because the database is unavailable."""
+        try:
+            supabase.table("audit_logs").insert(rows).execute()
+            self.written += len(rows)
+            return []
+        except Exception as e:
+            if _is_stack_depth_error(e):
+                # Retrying would hit the same limit; audit failures must not break the app
+                print(f"Warning: Could not write {len(rows)} audit logs due to stack depth error")
+                self.dropped += len(rows)
+                return []
+            if is_retryable_error(e):
+                print(f"Failed to write {len(rows)} audit logs, spilling to {self.spill_path}: {e}")
+                self.failed_flushes += 1
+                return rows
+            if len(rows) == 1:
+                print(f"Audit log rejected by the database, moving it to {self.rejected_path}: {e}")
+                self._append(self.rejected_path, [dict(rows[0], rejected_error=str(e))])
+                self.rejected += 1
+                return []
+            # Rejected batch: write the halves separately so one bad row does not hold back the rest
+            middle = len(rows) // 2
+            unwritten = self._insert(rows[:middle])
+            if unwritten:
+                return unwritten + rows[middle:]
+            return self._insert(rows[middle:])
+
+    def _spill(self, rows: List[Dict[str, Any]]) -> None:
+        if self._append(self.spill_path, rows):
+            self.spilled += len(rows)
+
+    def _append(self, path: str, rows: List[Dict[str, Any]]) -> bool:
+        if not rows:
+            return False
+        with self._spill_lock:
+            try:
+                directory = os.path.dirname(path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                with open(path, "a", encoding="utf-8") as f:
+                    for row in rows:
+                        f.write(json.dumps(row, ensure_ascii=False) + "\n")
+                return True
+            except OSError as e:
+                print(f"Failed to write {len(rows)} audit logs to {path}: {e}")
+                self.dropped += len(rows)
+                return False
+
+    def _replay_spill(self) -> bool:
+        """Re-inserts spilled rows in batches; returns False if the database is still failing."""
+        replay_path = f"{self.spill_path}.replay"
+        while True:
+            with self._spill_lock:
+                if not os.path.exists(replay_path):
+                    if not os.path.exists(self.spill_path):
+                        return True
+                    # Rows spilled while this file is replayed go to a fresh spill file
+                    os.replace(self.spill_path, replay_path)
+            with open(replay_path, encoding="utf-8") as f:
+                rows = [json.loads(line) for line in f if line.strip()]
+
+            for start in range(0, len(rows), self.batch_size):
+                end = start + self.batch_size
+                unwritten = self._insert(rows[start:end])
+                if unwritten:
+                    # Keep only the unwritten rows so nothing is lost or written twice
+                    with self._spill_lock:
+                        with open(replay_path, "w", encoding="utf-8") as f:
+                            for row in unwritten + rows[end:]:
+                                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+                    return False
+            os.remove(replay_path)
+
+    def shutdown(self, timeout: float = 10) -> None:
+        """Stops the flusher and writes whatever is still buffered."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        self.flush()
+        with self._cond:
+            self._thread = None
+            self._stopping = False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            buffered = len(self._buffer)
+        return {
+            "buffered": buffered,
+            "written": self.written,
+            "spilled": self.spilled,
+            "rejected": self.rejected,
+            "dropped": self.dropped,
+            "failed_flushes": self.failed_flushes
+        }
+
+
+_writer = AuditWriter()
+atexit.register(_writer.shutdown)
+
+
+def get_audit_writer() -> AuditWriter:
+    return _writer
+
+
+def shutdown_audit_writer() -> None:
+    _writer.shutdown()
+
 
 def create_audit_log(
     user_id: Optional[str],
@@ -13,8 +256,8 @@ def create_audit_log(
     ip_address: Optional[str] = None
 ) -> None:
     """
-    Creates an entry in the AUDIT_LOGS table.
-    Handles stack depth errors gracefully to prevent audit logging failures from crashing requests.
+    Queues an entry for the AUDIT_LOGS table; the background writer inserts it in bulk.
+    Audit logging failures never propagate to the calling request.
     """
     data = {
         "user_id": user_id,
@@ -24,27 +267,12 @@ def create_audit_log(
         "status": status,
         "details": details,
         "error_code": error_code,
-        "ip_address": ip_address
+        "ip_address": ip_address,
+        # Stamped here rather than by the database so batching and spilling keep the event time
+        "created_at": datetime.now(timezone.utc).isoformat()
     }
-    
+
     try:
-        supabase.table("audit_logs").insert(data).execute()
-    except APIError as e:
-        # Check if it's a stack depth error
-        error_str = str(e)
-        if any(keyword in error_str.lower() for keyword in ["stack depth", "54001", "max_stack_depth"]):
-            # Log warning but don't crash - audit logging failure shouldn't break main operations
-            print(f"Warning: Could not create audit log due to stack depth error. Action: {action_type}, Resource: {resource_type}")
-        else:
-            # Re-raise if it's a different API error
-            print(f"Failed to create audit log: {e}")
+        _writer.enqueue(data)
     except Exception as e:
-        # Check if it's a stack depth error in the exception message
-        error_str = str(e)
-        if any(keyword in error_str.lower() for keyword in ["stack depth", "54001", "max_stack_depth"]):
-            # Log warning but don't crash
-            print(f"Warning: Could not create audit log due to stack depth error. Action: {action_type}, Resource: {resource_type}")
-        else:
-            # We generally don't want audit logging failure to crash the main request,
-            # but we should log it to stderr/stdout
-            print(f"Failed to create audit log: {e}")
+        print(f"Failed to queue audit log: {e}")
@@ -0,0 +1,82 @@
+import os
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
+
+from postgrest.exceptions import APIError
+
+from app.utils.database import supabase
+
+# Large inserts (e.g. the segments of a multi-hour transcript) are split so no single request
+# body exceeds the gateway limit or times out as a unit
+BATCH_ROWS = int(os.getenv("BULK_WRITE_BATCH_ROWS", "1000"))
+BATCH_BYTES = int(os.getenv("BULK_WRITE_BATCH_BYTES", str(1024 * 1024)))
+WORKERS = int(os.getenv("BULK_WRITE_WORKERS", "4"))
+RETRIES = int(os.getenv("BULK_WRITE_RETRIES", "3"))
+RETRY_DELAY = float(os.getenv("BULK_WRITE_RETRY_DELAY", "0.5"))
+
+
+def split_batches(rows: List[Dict[str, Any]], max_rows: int = BATCH_ROWS, max_bytes: int = BATCH_BYTES) -> List[List[Dict[str, Any]]]:
+    """Consecutive batches of at most max_rows rows and (roughly) max_bytes of JSON each"""
+    batches: List[List[Dict[str, Any]]] = []
+    current: List[Dict[str, Any]] = []
+    size = 0
+    for row in rows:
+        row_bytes = len(json.dumps(row, ensure_ascii=False, default=str).encode("utf-8")) + 1
+        if current and (len(current) >= max_rows or size + row_bytes > max_bytes):
+            batches.append(current)
+            current, size = [], 0
+        current.append(row)
+        size += row_bytes
+    if current:
+        batches.append(current)
+    return batches
+
+
+def is_retryable_error(e: Exception) -> bool:
+    # Postgres errors (constraint, type, permission: APIError with a SQLSTATE code) fail the same
+    # way every time; network errors, timeouts and gateway errors without a code may not
+    if isinstance(e, APIError):
+        return not e.code
+    return True
+
+
+def upsert_rows(
+    table: str,
+    rows: List[Dict[str, Any]],
+    on_conflict: str,
+    ignore_duplicates: bool = False,
+    max_rows: int = BATCH_ROWS,
+    max_bytes: int = BATCH_BYTES,
+    workers: int = WORKERS,
+    retries: int = RETRIES
+) -> List[Dict[str, Any]]:
+    """
+    Writes rows in size-bounded batches, up to `workers` batches at a time, and returns the
+    written rows in input order.
+
+    Batches are upserts on the natural key `on_conflict`, so a batch that is retried after the
+    server already committed it (e.g. the response was lost) does not create duplicates.
+    With ignore_duplicates, rows that already exist are left alone and not returned.
+    """
+    if not rows:
+        return []
+    batches = split_batches(rows, max_rows, max_bytes)
+
+    def write(batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        for attempt in range(retries + 1):
+            try:
+                return supabase.table(table).upsert(batch, on_conflict=on_conflict, ignore_duplicates=ignore_duplicates).execute().data
+            except Exception as e:
+                if attempt == retries or not is_retryable_error(e):
+                    raise
+                print(f"Bulk write to {table} failed ({e}); retrying batch of {len(batch)} rows")
+                time.sleep(RETRY_DELAY * (2 ** attempt))
+
+    if len(batches) == 1 or workers <= 1:
+        results = [write(batch) for batch in batches]
+    else:
+        with ThreadPoolExecutor(max_workers=min(workers, len(batches)), thread_name_prefix=f"bulk-{table}") as pool:
+            results = list(pool.map(write, batches))
+    return [row for result in results for row in result]
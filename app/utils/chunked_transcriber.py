@@ -0,0 +1,320 @@
+import io
+import os
+import json
+import shutil
+import subprocess
+import tempfile
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, List, Dict, Any, NamedTuple, Optional, Tuple
+
+# Long recordings are split into overlapping windows that are transcribed in parallel.
+CHUNK_SECONDS = float(os.getenv("TRANSCRIBE_CHUNK_SECONDS", "300"))
+CHUNK_OVERLAP_SECONDS = float(os.getenv("TRANSCRIBE_CHUNK_OVERLAP_SECONDS", "5"))
+MAX_WORKERS = int(os.getenv("TRANSCRIBE_MAX_WORKERS", "4"))
+
+# Formats ffmpeg can cut without re-encoding into a file of the same container
+FFMPEG_FORMATS = {"mp3", "m4a", "mp4", "aac", "ogg", "oga", "opus", "webm", "flac", "wav"}
+
+
+class AudioSlicingError(Exception):
+    pass
+
+
+class AudioWindow(NamedTuple):
+    index: int
+    start: float        # window start in the original audio (seconds)
+    end: float          # window end in the original audio (seconds)
+    keep_start: float   # segments whose midpoint falls in [keep_start, keep_end) belong to this window
+    keep_end: float
+
+
+def plan_windows(
+    duration_seconds: float,
+    chunk_seconds: float = CHUNK_SECONDS,
+    overlap_seconds: float = CHUNK_OVERLAP_SECONDS
+) -> List[AudioWindow]:
+    """
+    Splits [0, duration_seconds] into windows of chunk_seconds overlapping by overlap_seconds.
+    Each overlap is owned half by the left window and half by the right one, so every
+    instant of the recording is owned by exactly one window.
+    """
+    if chunk_seconds <= overlap_seconds:
+        raise ValueError("chunk_seconds must be greater than overlap_seconds")
+
+    if duration_seconds <= chunk_seconds:
+        return [AudioWindow(0, 0.0, float(duration_seconds), 0.0, float("inf"))]
+
+    step = chunk_seconds - overlap_seconds
+    starts = []
+    start = 0.0
+    while True:
+        starts.append(start)
+        if start + chunk_seconds >= duration_seconds:
+            break
+        start += step
+
+    windows = []
+    for idx, start in enumerate(starts):
+        end = min(start + chunk_seconds, float(duration_seconds))
+        keep_start = 0.0 if idx == 0 else (start + (starts[idx - 1] + chunk_seconds)) / 2
+        keep_end = float("inf") if idx == len(starts) - 1 else (starts[idx + 1] + end) / 2
+        windows.append(AudioWindow(idx, start, end, keep_start, keep_end))
+    return windows
+
+
+def can_slice(file_extension: str) -> bool:
+    ext = file_extension.lower()
+    if ext == "wav":
+        return True
+    return ext in FFMPEG_FORMATS and shutil.which("ffmpeg") is not None
+
+
+class AudioSlicer:
+    """
+    Cuts time ranges out of an audio file.
+    WAV is sliced in memory with the stdlib; other containers go through ffmpeg (stream copy).
+    """
+
+    def __init__(self, audio_bytes: bytes, file_extension: str):
+        self.audio_bytes = audio_bytes
+        self.file_extension = file_extension.lower()
+        self._tmp_dir: Optional[str] = None
+        self._source_path: Optional[str] = None
+
+    def __enter__(self):
+        if self.file_extension != "wav":
+            if not can_slice(self.file_extension):
+                raise AudioSlicingError(f"Cannot slice .{self.file_extension} audio (ffmpeg not available)")
+            self._tmp_dir = tempfile.mkdtemp(prefix="chunks_")
+            self._source_path = os.path.join(self._tmp_dir, f"source.{self.file_extension}")
+            with open(self._source_path, "wb") as f:
+                f.write(self.audio_bytes)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._tmp_dir:
+            shutil.rmtree(self._tmp_dir, ignore_errors=True)
+            self._tmp_dir = None
+
+    def slice(self, start: float, end: float) -> bytes:
+        if self.file_extension == "wav":
+            return self._slice_wav(start, end)
+        return self._slice_ffmpeg(start, end)
+
+    def _slice_wav(self, start: float, end: float) -> bytes:
+        with wave.open(io.BytesIO(self.audio_bytes), "rb") as src:
+            rate = src.getframerate()
+            first = int(start * rate)
+            count = max(0, int(end * rate) - first)
+            src.setpos(min(first, src.getnframes()))
+            frames = src.readframes(count)
+            params = src.getparams()
+
+        out = io.BytesIO()
+        with wave.open(out, "wb") as dst:
+            dst.setparams(params)
+            dst.writeframes(frames)
+        return out.getvalue()
+
+    def _slice_ffmpeg(self, start: float, end: float) -> bytes:
+        out_path = os.path.join(self._tmp_dir, f"chunk_{start:.3f}.{self.file_extension}")
+        cmd = [
+            "ffmpeg", "-v", "error", "-y",
+            "-ss", f"{start:.3f}", "-t", f"{end - start:.3f}",
+            "-i", self._source_path,
+            "-c", "copy", out_path
+        ]
+        result = subprocess.run(cmd, capture_output=True)
+        if result.returncode != 0:
+            raise AudioSlicingError(f"ffmpeg failed: {result.stderr.decode(errors='ignore')}")
+        try:
+            with open(out_path, "rb") as f:
+                return f.read()
+        finally:
+            os.remove(out_path)
+
+
+def _normalize(text: str) -> str:
+    return " ".join((text or "").lower().split())
+
+
+class WindowMerger:
+    """
+    Incremental form of merge_window_segments: windows are added in index order and each call
+    returns only that window's segments, with absolute times and overlap duplicates removed.
+
+    The model labels speakers per window, so each window's labels are mapped onto the labels
+    already in use: a label is matched to the previous window's speaker it shares the most
+    overlap-region speech with, and a label with no match gets a label not used so far.
+    """
+
+    def __init__(self):
+        self._last: Optional[Dict[str, Any]] = None
+        # Previous window's segments as (start, end, merged label), and where that window ends
+        self._previous: List[Tuple[float, float, Optional[str]]] = []
+        self._previous_end: Optional[float] = None
+        self._labels: set = set()
+
+    def add(self, window: AudioWindow, segments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        placed = [
+            (float(segment["start_time"]) + window.start, float(segment["end_time"]) + window.start, segment)
+            for segment in segments
+        ]
+        speakers = self._match_speakers(window, placed)
+        self._previous = [(start, end, speakers.get(segment.get("speaker_label"), segment.get("speaker_label"))) for start, end, segment in placed]
+        self._previous_end = window.end
+
+        kept = []
+        for start, end, segment in placed:
+            midpoint = (start + end) / 2
+            if not (window.keep_start <= midpoint < window.keep_end):
+                continue
+            kept.append({**segment, "start_time": round(start, 2), "end_time": round(end, 2),
+                         "speaker_label": speakers.get(segment.get("speaker_label"), segment.get("speaker_label"))})
+
+        # A segment spanning the cut can still be reported by both neighbours with slightly
+        # different timestamps; drop the second copy when text matches and times overlap.
+        if self._last and kept:
+            first = kept[0]
+            if _normalize(self._last["content"]) == _normalize(first["content"]) and first["start_time"] < self._last["end_time"]:
+                kept = kept[1:]
+
+        if kept:
+            self._last = kept[-1]
+        return kept
+
+    def _match_speakers(self, window: AudioWindow, placed: List[Tuple[float, float, Dict[str, Any]]]) -> Dict[Optional[str], Optional[str]]:
+        """Maps this window's speaker labels to merged labels"""
+        labels = list(dict.fromkeys(segment.get("speaker_label") for _, _, segment in placed if segment.get("speaker_label")))
+        speakers: Dict[Optional[str], Optional[str]] = {None: None}
+        if self._previous_end is None:
+            speakers.update((label, label) for label in labels)
+            self._labels.update(labels)
+            return speakers
+
+        # Seconds of overlap-region speech each (new label, previous label) pair have in common
+        region_start, region_end = window.start, self._previous_end
+        shared: Dict[Tuple[str, str], float] = {}
+        for start, end, segment in placed:
+            label = segment.get("speaker_label")
+            start, end = max(start, region_start), min(end, region_end)
+            if not label or start >= end:
+                continue
+            for prev_start, prev_end, prev_label in self._previous:
+                common = min(end, prev_end) - max(start, prev_start)
+                if prev_label and common > 0:
+                    shared[(label, prev_label)] = shared.get((label, prev_label), 0.0) + common
+
+        taken = set()
+        for (label, prev_label), _ in sorted(shared.items(), key=lambda item: -item[1]):
+            if label not in speakers and prev_label not in taken:
+                speakers[label] = prev_label
+                taken.add(prev_label)
+        for label in labels:
+            if label not in speakers:
+                speakers[label] = self._new_label()
+        return speakers
+
+    def _new_label(self) -> str:
+        number = 1
+        while f"SPEAKER_{number:02d}" in self._labels:
+            number += 1
+        label = f"SPEAKER_{number:02d}"
+        self._labels.add(label)
+        return label
+
+
+def merge_window_segments(results: List[tuple]) -> List[Dict[str, Any]]:
+    """
+    Merges per-window transcription results into one ordered segment list.
+
+    Args:
+        results: List of (AudioWindow, segments) where segment times are relative to the window
+
+    Returns:
+        Segments with absolute times, overlap duplicates removed, ordered by start_time
+    """
+    merger = WindowMerger()
+    merged: List[Dict[str, Any]] = []
+    for window, segments in sorted(results, key=lambda r: r[0].index):
+        merged.extend(merger.add(window, segments))
+
+    merged.sort(key=lambda s: (s["start_time"], s["end_time"]))
+    return merged
+
+
+def stream_windows(
+    audio_bytes: bytes,
+    file_extension: str,
+    duration_seconds: float,
+    transcribe_fn: Callable[[bytes, str], str],
+    chunk_seconds: float = CHUNK_SECONDS,
+    overlap_seconds: float = CHUNK_OVERLAP_SECONDS,
+    max_workers: int = MAX_WORKERS
+) -> Iterator[Tuple[AudioWindow, int, List[Dict[str, Any]]]]:
+    """
+    Like transcribe_in_windows, but yields (window, window_count, merged segments) for each
+    window as soon as it and every window before it are transcribed. Windows still run
+    concurrently; only the hand-off is in order, so callers can persist a growing prefix of
+    the transcript. Closing the generator early cancels windows that have not started.
+    """
+    windows = plan_windows(duration_seconds, chunk_seconds, overlap_seconds)
+    merger = WindowMerger()
+
+    with AudioSlicer(audio_bytes, file_extension) as slicer:
+        def run(window: AudioWindow):
+            chunk = audio_bytes if len(windows) == 1 else slicer.slice(window.start, window.end)
+            return json.loads(transcribe_fn(chunk, file_extension))
+
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+            futures = [pool.submit(run, window) for window in windows]
+            try:
+                for window, future in zip(windows, futures):
+                    kept = merger.add(window, future.result())
+                    kept.sort(key=lambda s: (s["start_time"], s["end_time"]))
+                    yield window, len(windows), kept
+            finally:
+                for future in futures:
+                    future.cancel()
+
+
+def transcribe_in_windows(
+    audio_bytes: bytes,
+    file_extension: str,
+    duration_seconds: float,
+    transcribe_fn: Callable[[bytes, str], str],
+    chunk_seconds: float = CHUNK_SECONDS,
+    overlap_seconds: float = CHUNK_OVERLAP_SECONDS,
+    max_workers: int = MAX_WORKERS
+) -> List[Dict[str, Any]]:
+    """
+    Transcribes long audio by splitting it into overlapping windows and sending them
+    to transcribe_fn concurrently with a bounded worker pool.
+
+    Args:
+        audio_bytes: The full audio file
+        file_extension: Audio container extension (e.g. "wav", "mp3")
+        duration_seconds: Duration of the audio in seconds
+        transcribe_fn: Function with the signature of transcriber.transcribe, returns a JSON array string
+        chunk_seconds: Length of each window
+        overlap_seconds: Overlap between consecutive windows
+        max_workers: Maximum number of windows transcribed at the same time
+
+    Returns:
+        Ordered list of segment dicts (speaker_label, start_time, end_time, content), with
+        speaker labels carried across windows through the speech in their overlaps
+    """
+    merged = [
+        segment
+        for _, _, segments in stream_windows(
+            audio_bytes, file_extension, duration_seconds, transcribe_fn, chunk_seconds, overlap_seconds, max_workers
+        )
+        for segment in segments
+    ]
+    merged.sort(key=lambda s: (s["start_time"], s["end_time"]))
+    return merged
+
+
+def should_chunk(duration_seconds: Optional[float], file_extension: str, chunk_seconds: float = CHUNK_SECONDS) -> bool:
+    return bool(duration_seconds) and duration_seconds > chunk_seconds and can_slice(file_extension)
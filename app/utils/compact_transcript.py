@@ -0,0 +1,121 @@
+import math
+import pickle
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+_NO_ID = -1
+
+
+class CompactTranscript:
+    """
+    Column-oriented copy of a transcript's segments, for code that walks a whole transcript
+    (summarization, exports) without holding one dict or model per segment.
+
+    Times, confidences, ids and sequences are parallel typed arrays; speaker labels are
+    interned and stored as small integer codes; all segment texts share one UTF-8 buffer, cut
+    by an offsets array. A 10k-segment transcript is a few dozen objects instead of ~100k.
+    Rows go in with from_rows and come back out as dicts (iteration, indexing) or as
+    TranscriptSegment models (to_segments) in the same shape as transcript_segments rows.
+    """
+
+    __slots__ = ("transcript_id", "segment_ids", "sequences", "starts", "ends", "confidences",
+                 "speakers", "speaker_codes", "edited", "content", "offsets")
+
+    def __init__(self, transcript_id: Optional[str] = None):
+        self.transcript_id = transcript_id
+        self.segment_ids = array("q")
+        self.sequences = array("q")
+        self.starts = array("d")
+        self.ends = array("d")
+        self.confidences = array("d")       # NaN = no confidence
+        self.speakers: List[Optional[str]] = []
+        self.speaker_codes = array("H")     # index into speakers
+        self.edited = bytearray()
+        self.content = bytearray()          # UTF-8
+        self.offsets = array("Q", [0])      # segment i is content[offsets[i]:offsets[i + 1]]
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Any], transcript_id: Optional[str] = None) -> "CompactTranscript":
+        """Builds from transcript_segments rows (dicts or TranscriptSegment models), kept in the given order"""
+        compact = cls(transcript_id)
+        codes: Dict[Optional[str], int] = {}
+        for row in rows:
+            if not isinstance(row, dict):
+                row = row.__dict__
+            if compact.transcript_id is None:
+                compact.transcript_id = row.get('transcript_id')
+            segment_id = row.get('segment_id')
+            compact.segment_ids.append(_NO_ID if segment_id is None else segment_id)
+            compact.sequences.append(row['sequence'])
+            compact.starts.append(float(row['start_time']))
+            compact.ends.append(float(row['end_time']))
+            confidence = row.get('confidence')
+            compact.confidences.append(math.nan if confidence is None else float(confidence))
+            speaker = row.get('speaker_label')
+            code = codes.get(speaker)
+            if code is None:
+                code = codes[speaker] = len(compact.speakers)
+                compact.speakers.append(speaker)
+            compact.speaker_codes.append(code)
+            compact.edited.append(1 if row.get('is_user_edited') else 0)
+            compact.content += (row.get('content') or "").encode("utf-8")
+            compact.offsets.append(len(compact.content))
+        return compact
+
+    def __len__(self) -> int:
+        return len(self.sequences)
+
+    def text(self, i: int) -> str:
+        return self.content[self.offsets[i]:self.offsets[i + 1]].decode("utf-8")
+
+    def speaker(self, i: int) -> Optional[str]:
+        return self.speakers[self.speaker_codes[i]]
+
+    def __getitem__(self, i: int) -> Dict[str, Any]:
+        if i < 0:
+            i += len(self)
+        segment_id = self.segment_ids[i]
+        confidence = self.confidences[i]
+        return {
+            "segment_id": None if segment_id == _NO_ID else segment_id,
+            "transcript_id": self.transcript_id,
+            "sequence": self.sequences[i],
+            "start_time": self.starts[i],
+            "end_time": self.ends[i],
+            "content": self.text(i),
+            "speaker_label": self.speaker(i),
+            "confidence": None if math.isnan(confidence) else confidence,
+            "is_user_edited": bool(self.edited[i]),
+        }
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """One row dict at a time; nothing is kept after the caller moves on"""
+        for i in range(len(self)):
+            yield self[i]
+
+    def to_segments(self) -> List["schemas.TranscriptSegment"]:
+        """API models without re-validation: the columns already hold checked, typed values"""
+        from app import schemas
+        return [schemas.TranscriptSegment.model_construct(**row) for row in self]
+
+    def dialogue_lines(self) -> Iterator[str]:
+        """"SPEAKER: text" per segment, the form the summarizer reads"""
+        labels = [speaker or "Unknown" for speaker in self.speakers]
+        content, offsets, codes = self.content, self.offsets, self.speaker_codes
+        for i in range(len(self)):
+            yield f"{labels[codes[i]]}: {content[offsets[i]:offsets[i + 1]].decode('utf-8')}"
+
+    def dump(self, path: str) -> None:
+        """Writes the columns to a file, e.g. for a render worker in another process"""
+        with open(path, "wb") as f:
+            pickle.dump({name: getattr(self, name) for name in self.__slots__}, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path: str) -> "CompactTranscript":
+        """Reads a file written by dump (only files this app wrote itself: it is a pickle)"""
+        with open(path, "rb") as f:
+            state = pickle.load(f)
+        compact = cls.__new__(cls)
+        for name in cls.__slots__:
+            setattr(compact, name, state[name])
+        return compact
@@ -1,6 +1,11 @@
 import os
+import asyncio
+import threading
+from typing import Dict, Tuple
+
+import httpx
 from dotenv import load_dotenv
-from supabase import create_client, Client
+from supabase import create_client, Client, AsyncClient, ClientOptions, AsyncClientOptions
 
 load_dotenv()
 
@@ -10,4 +15,59 @@ supabase_anon_key = os.getenv("SUPABASE_ANON_KEY")
 if not supabase_url or not supabase_anon_key:
     raise ValueError("Missing Supabase URL or Anon Key")
 
-supabase: Client = create_client(supabase_url, supabase_anon_key)
+# Connection pool shared by the PostgREST, Storage and Auth sub-clients
+POOL_MAX_CONNECTIONS = int(os.getenv("SUPABASE_POOL_MAX_CONNECTIONS", "100"))
+POOL_MAX_KEEPALIVE = int(os.getenv("SUPABASE_POOL_MAX_KEEPALIVE", "100"))
+POOL_KEEPALIVE_EXPIRY = float(os.getenv("SUPABASE_POOL_KEEPALIVE_EXPIRY", "30"))
+HTTP_TIMEOUT = float(os.getenv("SUPABASE_HTTP_TIMEOUT", "120"))
+# Serve GET /recordings/, /recordings/{id}/transcripts, /transcripts/{id} and authentication
+# with async handlers on the async client. Off by default: on the load test the threadpool
+# handlers have served more req/s (benchmarks/load_test.py --async-endpoints to compare).
+ASYNC_ENDPOINTS = os.getenv("ASYNC_ENDPOINTS", "false").lower() == "true"
+
+
+def _pool_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=POOL_MAX_CONNECTIONS,
+        max_keepalive_connections=POOL_MAX_KEEPALIVE,
+        keepalive_expiry=POOL_KEEPALIVE_EXPIRY
+    )
+
+
+# Sync client: background jobs, scripts and the remaining `def` endpoints
+supabase: Client = create_client(
+    supabase_url,
+    supabase_anon_key,
+    ClientOptions(httpx_client=httpx.Client(limits=_pool_limits(), timeout=HTTP_TIMEOUT, follow_redirects=True))
+)
+
+# One async client per event loop: its connection pool belongs to the loop it was opened on
+_async_clients: Dict[asyncio.AbstractEventLoop, Tuple[AsyncClient, httpx.AsyncClient]] = {}
+_async_lock = threading.Lock()
+
+
+def get_async_supabase() -> AsyncClient:
+    """
+    Async client for `async def` endpoints. Created lazily for each running event loop
+    (e.g. a test client brings its own); the pool is closed by close_async_supabase.
+    """
+    loop = asyncio.get_running_loop()
+    entry = _async_clients.get(loop)
+    if entry is None:
+        with _async_lock:
+            # A closed loop's pool can no longer be closed from here; dropping it lets its sockets go
+            for closed in [other for other in _async_clients if other.is_closed()]:
+                del _async_clients[closed]
+            http = httpx.AsyncClient(limits=_pool_limits(), timeout=HTTP_TIMEOUT, follow_redirects=True)
+            entry = _async_clients[loop] = (
+                AsyncClient(supabase_url, supabase_anon_key, AsyncClientOptions(httpx_client=http)), http
+            )
+    return entry[0]
+
+
+async def close_async_supabase() -> None:
+    """Closes the pooled connections of the running loop's client; called on application shutdown."""
+    with _async_lock:
+        entry = _async_clients.pop(asyncio.get_running_loop(), None)
+    if entry is not None:
+        await entry[1].aclose()
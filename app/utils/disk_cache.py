@@ -0,0 +1,171 @@
+import os
+import threading
+from abc import ABC, abstractmethod
+import tempfile
+from collections import OrderedDict
+from typing import Optional, Dict, Any
+
+
+class CacheBackend(ABC):
+    """
+    Byte-oriented key/value store used by the result caches (transcriptions, partial summaries).
+    Implementations must be thread-safe.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: bytes) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    def size_bytes(self) -> int:
+        ...
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "size_bytes": self.size_bytes()
+        }
+
+
+class MemoryCacheBackend(CacheBackend):
+    """In-process LRU bounded by total value size."""
+
+    def __init__(self, max_bytes: int):
+        super().__init__()
+        self.max_bytes = max_bytes
+        self._items: "OrderedDict[str, bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            value = self._items.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: bytes) -> None:
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._items[key] = value
+            self._size += len(value)
+            while self._size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self._size -= len(evicted)
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+
+    def size_bytes(self) -> int:
+        return self._size
+
+
+class DiskCacheBackend(CacheBackend):
+    """
+    Local directory store, one file per key, with size-bounded LRU eviction.
+    Recency is tracked in memory and seeded from file mtimes, so the cache survives restarts.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        super().__init__()
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, int]" = OrderedDict()  # key -> size, oldest first
+        self._size = 0
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def _load_index(self) -> None:
+        files = []
+        for name in os.listdir(self.directory):
+            path = self._path(name)
+            if name.startswith(".") or not os.path.isfile(path):
+                continue
+            st = os.stat(path)
+            files.append((st.st_mtime, name, st.st_size))
+        for _, name, size in sorted(files):
+            self._entries[name] = size
+            self._size += size
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            try:
+                with open(self._path(key), "rb") as f:
+                    value = f.read()
+            except FileNotFoundError:
+                self._size -= self._entries.pop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            os.utime(self._path(key))
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: bytes) -> None:
+        if len(value) > self.max_bytes:
+            return
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp_")
+        with os.fdopen(fd, "wb") as f:
+            f.write(value)
+
+        with self._lock:
+            os.replace(tmp_path, self._path(key))
+            if key in self._entries:
+                self._size -= self._entries.pop(key)
+            self._entries[key] = len(value)
+            self._size += len(value)
+            while self._size > self.max_bytes and self._entries:
+                old_key, old_size = self._entries.popitem(last=False)
+                self._size -= old_size
+                self.evictions += 1
+                try:
+                    os.remove(self._path(old_key))
+                except FileNotFoundError:
+                    pass
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._size -= self._entries.pop(key)
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    def size_bytes(self) -> int:
+        return self._size
@@ -1,64 +1,125 @@
-from typing import Dict, Any
-from datetime import datetime
+from typing import Dict, Any, Iterator, List, Optional
+import os
 import json
-import io
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak
-from reportlab.lib.enums import TA_LEFT, TA_CENTER
-from docx import Document
-from docx.shared import Pt, Inches
-from docx.enum.text import WD_ALIGN_PARAGRAPH
+import hashlib
+import tempfile
+import threading
 import zipfile
 
 from app.utils.database import supabase
 from app.services.recording_service import RecordingService
 from app.services.transcript_service import TranscriptService
 from app.services.summary_service import SummaryService
+from app.services.transcript_segment_service import TranscriptSegmentService
+from app.services.user_service import UserService
+from app.utils import export_templates
+from app.utils import render_pool
+from app.utils.compact_transcript import CompactTranscript
+from app.utils.export_renderers import DOCX_CONTENT_TYPE, SEGMENT_FORMATS
+
+# Bump whenever rendered output changes so cached artifacts from the old renderers are not reused
+RENDERER_VERSION = "3"
+ARTIFACT_DIR = "artifacts"
+EXTENSIONS = {
+    "TRANSCRIPT_PDF": ".pdf",
+    "TRANSCRIPT_DOCX": ".docx",
+    "SUMMARY_PDF": ".pdf",
+    "SUMMARY_DOCX": ".docx",
+    "FULL_ZIP": ".zip",
+    "TRANSCRIPT_SRT": ".srt",
+    "TRANSCRIPT_VTT": ".vtt",
+    "TRANSCRIPT_JSONL": ".jsonl",
+}
+# Single-document export type -> (rendered part, content type)
+EXPORT_PARTS = {
+    "TRANSCRIPT_PDF": ("transcript.pdf", "application/pdf"),
+    "TRANSCRIPT_DOCX": ("transcript.docx", DOCX_CONTENT_TYPE),
+    "SUMMARY_PDF": ("summary.pdf", "application/pdf"),
+    "SUMMARY_DOCX": ("summary.docx", DOCX_CONTENT_TYPE),
+}
+# Extra FULL_ZIP parts selectable with options={"bundle_formats": [...]}
+BUNDLE_FORMATS = {
+    "docx": ["transcript.docx", "summary.docx"],
+    "json": ["transcript.json", "summary.json"],
+    "srt": ["transcript.srt"],
+}
+
+
+def depends_on(export_type: str, source: str) -> bool:
+    """Whether an export renders the transcript ("TRANSCRIPT") or the summary ("SUMMARY")"""
+    return export_type.startswith(source) or export_type == "FULL_ZIP"
 
 
 class ExportProcessor:
-    def __init__(self, job: Dict[str, Any]):
+    def __init__(self, job: Dict[str, Any], options: Optional[Dict[str, Any]] = None):
         self.job = job
         self.recording_id = job['recording_id']
         self.export_type = job['export_type']
         self.export_id = job['export_id']
+        self.options = options or {}
+        self._cache: Dict[str, Any] = {}
+        self._cache_lock = threading.Lock()
 
     def process(self) -> str:
         """Process export and return file_path in storage"""
-
-        if self.export_type == "TRANSCRIPT_PDF":
-            return self._export_transcript_pdf()
-        elif self.export_type == "TRANSCRIPT_DOCX":
-            return self._export_transcript_docx()
-        elif self.export_type == "SUMMARY_PDF":
-            return self._export_summary_pdf()
-        elif self.export_type == "SUMMARY_DOCX":
-            return self._export_summary_docx()
-        elif self.export_type == "FULL_ZIP":
-            return self._export_full_zip()
-        else:
-            raise ValueError(f"Unsupported export type: {self.export_type}")
+        with tempfile.TemporaryDirectory(prefix="export-") as tmp_dir:
+            return self.upload(self.render(tmp_dir))
+
+    def content_type(self) -> str:
+        if self.export_type == "FULL_ZIP":
+            return "application/zip"
+        if self.export_type in SEGMENT_FORMATS:
+            return SEGMENT_FORMATS[self.export_type][1]
+        if self.export_type in EXPORT_PARTS:
+            return EXPORT_PARTS[self.export_type][1]
+        raise ValueError(f"Unsupported export type: {self.export_type}")
+
+    def file_name(self) -> str:
+        """Download name, e.g. "Weekly sync - transcript.pdf" """
+        title = self._get_recording_data()['title'] or self.recording_id
+        kind = self.export_type.split("_")[0].lower()
+        return f"{title} - {kind}{EXTENSIONS[self.export_type]}"
+
+    def render(self, work_dir: str) -> str:
+        """Render the export into work_dir and return the local file path"""
+        self.content_type()  # rejects unsupported types before any data is fetched
+        if self.export_type == "FULL_ZIP":
+            return self._render_full_zip(work_dir)
+        if self.export_type in SEGMENT_FORMATS:
+            return self._render_segment_format(work_dir)
+
+        part, _ = EXPORT_PARTS[self.export_type]
+        payload = self.build_payload(work_dir, [part])
+        return render_pool.submit(payload, part, os.path.join(work_dir, part)).result()
+
+    def upload(self, local_path: str) -> str:
+        """Upload a rendered export to its artifact path and return that path"""
+        return self._upload_file(local_path, self.artifact_path(), self.content_type())
+
+    def _cached(self, key: str, load):
+        # FULL_ZIP renders several parts from the same rows; read each row only once
+        with self._cache_lock:
+            if key not in self._cache:
+                self._cache[key] = load()
+            return self._cache[key]
 
     def _get_transcript_data(self):
-        """Get transcript with segments"""
-        transcripts = TranscriptService.get_transcripts_by_recording_id(
+        """Get latest transcript (segments are streamed with TranscriptSegmentService.iter_segments)"""
+        transcripts = self._cached("transcript", lambda: TranscriptService.get_transcripts_by_recording_id(
             self.recording_id,
             latest=True
-        )
+        ))
         if not transcripts:
             raise ValueError("No transcript found")
 
-        transcript = TranscriptService.get_transcript_by_id(transcripts[0]['transcript_id'])
-        return transcript
+        return transcripts[0]
 
     def _get_summary_data(self):
         """Get latest summary"""
-        summaries = SummaryService.get_summaries_by_recording_id(
+        summaries = self._cached("summary", lambda: SummaryService.get_summaries_by_recording_id(
             self.recording_id,
             latest=True
-        )
+        ))
         if not summaries:
             raise ValueError("No summary found")
 
@@ -66,313 +127,130 @@ class ExportProcessor:
 
     def _get_recording_data(self):
         """Get recording details"""
-        recording = RecordingService.get_recording_by_id(self.recording_id)
+        recording = self._cached("recording", lambda: RecordingService.get_recording_by_id(self.recording_id))
         if not recording:
             raise ValueError("Recording not found")
-        return recording
-
-    def _export_transcript_pdf(self) -> str:
-        """Generate PDF from transcript"""
-        transcript = self._get_transcript_data()
+        # Renderers index the row like a dict and parse created_at from its ISO string
+        return recording.model_dump(mode='json')
+
+    def _get_template(self) -> str:
+        """Branding template of the recording owner's tier"""
+        # Resolved outside _cached: the loader must not re-enter _cache_lock
+        user_id = self._get_recording_data()['user_id']
+
+        def load():
+            user = UserService.get_user_by_id(user_id)
+            return export_templates.template_for_tier(user.tier_id if user else None)
+        return self._cached("template", load)
+
+    def _version_of(self, load, id_field: str):
+        row = self._optional(load)
+        return [row[id_field], row['version_no']] if row else None
+
+    def artifact_path(self) -> str:
+        """
+        Storage path derived from everything the rendered file depends on: recording metadata,
+        the latest transcript and/or summary version (plus the transcript's segment count and
+        highest segment id), bundle options and RENDERER_VERSION.
+        Repeat exports with unchanged inputs map to the same object and can reuse it.
+        """
         recording = self._get_recording_data()
-
-        # Create PDF in memory
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=A4,
-                                rightMargin=72, leftMargin=72,
-                                topMargin=72, bottomMargin=18)
-
-        # Container for the 'Flowable' objects
-        elements = []
-
-        # Define styles
-        styles = getSampleStyleSheet()
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=24,
-            textColor='#1a1a1a',
-            spaceAfter=30,
-            alignment=TA_CENTER
-        )
-
-        heading_style = ParagraphStyle(
-            'CustomHeading',
-            parent=styles['Heading2'],
-            fontSize=14,
-            textColor='#333333',
-            spaceAfter=12
-        )
-
-        normal_style = ParagraphStyle(
-            'CustomNormal',
-            parent=styles['Normal'],
-            fontSize=11,
-            leading=16,
-            spaceAfter=10
-        )
-
-        # Add title
-        elements.append(Paragraph(f"Transcript: {recording['title']}", title_style))
-        elements.append(Spacer(1, 0.2 * inch))
-
-        # Add metadata
-        created_date = datetime.fromisoformat(recording['created_at'].replace('Z', '+00:00'))
-        elements.append(Paragraph(f"<b>Created:</b> {created_date.strftime('%Y-%m-%d %H:%M')}", normal_style))
-        elements.append(Paragraph(f"<b>Duration:</b> {recording['duration_seconds']:.2f} seconds", normal_style))
-        elements.append(Paragraph(f"<b>Version:</b> {transcript.version_no}", normal_style))
-        elements.append(Spacer(1, 0.3 * inch))
-
-        # Add segments
-        elements.append(Paragraph("Transcript Content", heading_style))
-        elements.append(Spacer(1, 0.1 * inch))
-
-        for segment in transcript.segments:
-            time_str = f"[{self._format_time(segment['start_time'])} - {self._format_time(segment['end_time'])}]"
-            speaker = segment.get('speaker_label', 'Unknown')
-            content = segment['content']
-
-            text = f"<b>{speaker}</b> {time_str}<br/>{content}"
-            elements.append(Paragraph(text, normal_style))
-            elements.append(Spacer(1, 0.1 * inch))
-
-        # Build PDF
-        doc.build(elements)
-
-        # Upload to storage
-        buffer.seek(0)
-        filename = f"{self.export_id}_transcript.pdf"
-        file_path = f"{self.recording_id}/{filename}"
-
-        supabase.storage.from_("exports").upload(
-            file_path,
-            buffer.getvalue(),
-            file_options={"content-type": "application/pdf"}
-        )
-
-        return file_path
-
-    def _export_transcript_docx(self) -> str:
-        """Generate DOCX from transcript"""
+        inputs = {
+            "renderer": RENDERER_VERSION,
+            "export_type": self.export_type,
+            "recording": [recording['title'], recording['created_at'], recording['duration_seconds']],
+            "branding": dict(export_templates.get_branding(self._get_template())),
+        }
+        if depends_on(self.export_type, "TRANSCRIPT"):
+            inputs["transcript"] = self._version_of(self._get_transcript_data, 'transcript_id')
+            if inputs["transcript"]:
+                inputs["transcript"].append(TranscriptSegmentService.segments_fingerprint(inputs["transcript"][0]))
+        if depends_on(self.export_type, "SUMMARY"):
+            inputs["summary"] = self._version_of(self._get_summary_data, 'summary_id')
+        if self.export_type == "FULL_ZIP":
+            inputs["bundle_formats"] = sorted(self.options.get("bundle_formats") or [])
+
+        digest = hashlib.sha256(json.dumps(inputs, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:32]
+        return f"{self.recording_id}/{ARTIFACT_DIR}/{self.export_type.lower()}-{digest}{EXTENSIONS[self.export_type]}"
+
+    def _optional(self, load) -> Optional[Dict[str, Any]]:
+        try:
+            return load()
+        except ValueError:
+            return None
+
+    def build_payload(self, work_dir: str, parts: List[str]) -> Dict[str, Any]:
+        """
+        Everything the renderers need, fetched once in this process. Segments are written to a
+        CompactTranscript file in work_dir so the payload stays small when it is pickled to a
+        render worker.
+        Missing rows are left as None; the renderer that needs them raises ValueError.
+        """
+        payload = {"recording": self._get_recording_data(), "transcript": None, "summary": None,
+                   "segments_path": None, "template": self._get_template()}
+        if any(part.startswith("summary") for part in parts):
+            payload["summary"] = self._optional(self._get_summary_data)
+        if any(part.startswith("transcript") for part in parts):
+            transcript = self._optional(self._get_transcript_data)
+            if transcript:
+                payload["transcript"] = transcript
+                payload["segments_path"] = os.path.join(work_dir, "segments.bin")
+                CompactTranscript.from_rows(
+                    TranscriptSegmentService.iter_segments(transcript['transcript_id']), transcript['transcript_id']
+                ).dump(payload["segments_path"])
+        return payload
+
+    def iter_segment_format(self) -> Iterator[str]:
+        """
+        SRT / WebVTT / JSONL text of the latest transcript, generated lazily while segments
+        are fetched page by page.
+        """
+        lines, _ = SEGMENT_FORMATS[self.export_type]
         transcript = self._get_transcript_data()
-        recording = self._get_recording_data()
-
-        # Create document
-        doc = Document()
-
-        # Add title
-        title = doc.add_heading(f"Transcript: {recording['title']}", 0)
-        title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-
-        # Add metadata
-        doc.add_paragraph(f"Created: {recording['created_at']}")
-        doc.add_paragraph(f"Duration: {recording['duration_seconds']:.2f} seconds")
-        doc.add_paragraph(f"Version: {transcript.version_no}")
-        doc.add_paragraph()
-
-        # Add segments
-        doc.add_heading("Transcript Content", level=1)
-
-        for segment in transcript.segments:
-            time_str = f"[{self._format_time(segment['start_time'])} - {self._format_time(segment['end_time'])}]"
-            speaker = segment.get('speaker_label', 'Unknown')
-
-            p = doc.add_paragraph()
-            p.add_run(f"{speaker} {time_str}\n").bold = True
-            p.add_run(segment['content'])
-            p.add_run("\n")
-
-        # Save to buffer
-        buffer = io.BytesIO()
-        doc.save(buffer)
-        buffer.seek(0)
-
-        # Upload to storage
-        filename = f"{self.export_id}_transcript.docx"
-        file_path = f"{self.recording_id}/{filename}"
-
-        supabase.storage.from_("exports").upload(
-            file_path,
-            buffer.getvalue(),
-            file_options={"content-type": "application/vnd.openxmlformats-officedocument.wordprocessingml.document"}
-        )
-
-        return file_path
-
-    def _export_summary_pdf(self) -> str:
-        """Generate PDF from summary"""
-        summary = self._get_summary_data()
-        recording = self._get_recording_data()
-
-        # Create PDF
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=A4,
-                                rightMargin=72, leftMargin=72,
-                                topMargin=72, bottomMargin=18)
-
-        elements = []
-        styles = getSampleStyleSheet()
-
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=24,
-            textColor='#1a1a1a',
-            spaceAfter=30,
-            alignment=TA_CENTER
-        )
-
-        heading_style = ParagraphStyle(
-            'CustomHeading',
-            parent=styles['Heading2'],
-            fontSize=14,
-            textColor='#333333',
-            spaceAfter=12
-        )
-
-        normal_style = ParagraphStyle(
-            'CustomNormal',
-            parent=styles['Normal'],
-            fontSize=11,
-            leading=16,
-            spaceAfter=10
-        )
-
-        # Add title
-        elements.append(Paragraph(f"Summary: {recording['title']}", title_style))
-        elements.append(Spacer(1, 0.2 * inch))
-
-        # Add metadata
-        elements.append(Paragraph(f"<b>Created:</b> {summary['created_at']}", normal_style))
-        elements.append(Paragraph(f"<b>Style:</b> {summary.get('summary_style', 'N/A')}", normal_style))
-        elements.append(Spacer(1, 0.3 * inch))
-
-        # Parse and add summary content
-        content = summary.get('content_structure', {})
-
-        # Overview
-        if 'overview' in content:
-            elements.append(Paragraph("Overview", heading_style))
-            elements.append(Paragraph(content['overview'], normal_style))
-            elements.append(Spacer(1, 0.2 * inch))
-
-        # Key Points
-        if 'key_points' in content:
-            elements.append(Paragraph("Key Points", heading_style))
-            for point in content['key_points']:
-                elements.append(Paragraph(f"• {point}", normal_style))
-            elements.append(Spacer(1, 0.2 * inch))
-
-        # Action Items
-        if 'action_items' in content:
-            elements.append(Paragraph("Action Items", heading_style))
-            for item in content['action_items']:
-                elements.append(Paragraph(f"• {item}", normal_style))
-
-        doc.build(elements)
-
-        # Upload to storage
-        buffer.seek(0)
-        filename = f"{self.export_id}_summary.pdf"
-        file_path = f"{self.recording_id}/{filename}"
-
-        supabase.storage.from_("exports").upload(
-            file_path,
-            buffer.getvalue(),
-            file_options={"content-type": "application/pdf"}
-        )
-
-        return file_path
-
-    def _export_summary_docx(self) -> str:
-        """Generate DOCX from summary"""
-        summary = self._get_summary_data()
-        recording = self._get_recording_data()
-
-        doc = Document()
-
-        # Add title
-        title = doc.add_heading(f"Summary: {recording['title']}", 0)
-        title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-
-        # Add metadata
-        doc.add_paragraph(f"Created: {summary['created_at']}")
-        doc.add_paragraph(f"Style: {summary.get('summary_style', 'N/A')}")
-        doc.add_paragraph()
-
-        # Parse and add content
-        content = summary.get('content_structure', {})
-
-        if 'overview' in content:
-            doc.add_heading("Overview", level=1)
-            doc.add_paragraph(content['overview'])
-
-        if 'key_points' in content:
-            doc.add_heading("Key Points", level=1)
-            for point in content['key_points']:
-                doc.add_paragraph(f"• {point}")
-
-        if 'action_items' in content:
-            doc.add_heading("Action Items", level=1)
-            for item in content['action_items']:
-                doc.add_paragraph(f"• {item}")
-
-        # Save to buffer
-        buffer = io.BytesIO()
-        doc.save(buffer)
-        buffer.seek(0)
-
-        # Upload
-        filename = f"{self.export_id}_summary.docx"
-        file_path = f"{self.recording_id}/{filename}"
-
-        supabase.storage.from_("exports").upload(
-            file_path,
-            buffer.getvalue(),
-            file_options={"content-type": "application/vnd.openxmlformats-officedocument.wordprocessingml.document"}
-        )
-
-        return file_path
-
-    def _export_full_zip(self) -> str:
-        """Generate ZIP with transcript and summary"""
-        # Create ZIP in memory
-        buffer = io.BytesIO()
-
-        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            # Add transcript PDF
-            try:
-                transcript_path = self._export_transcript_pdf()
-                transcript_data = supabase.storage.from_("exports").download(transcript_path)
-                zipf.writestr("transcript.pdf", transcript_data)
-            except Exception as e:
-                print(f"Error adding transcript to ZIP: {e}")
-
-            # Add summary PDF
-            try:
-                summary_path = self._export_summary_pdf()
-                summary_data = supabase.storage.from_("exports").download(summary_path)
-                zipf.writestr("summary.pdf", summary_data)
-            except Exception as e:
-                print(f"Error adding summary to ZIP: {e}")
-
-        buffer.seek(0)
-
-        # Upload ZIP
-        filename = f"{self.export_id}_full.zip"
-        file_path = f"{self.recording_id}/{filename}"
-
-        supabase.storage.from_("exports").upload(
-            file_path,
-            buffer.getvalue(),
-            file_options={"content-type": "application/zip"}
-        )
+        return lines(TranscriptSegmentService.iter_segments(transcript['transcript_id']))
+
+    def _render_segment_format(self, work_dir: str) -> str:
+        local_path = os.path.join(work_dir, "transcript" + EXTENSIONS[self.export_type])
+        with open(local_path, "w", encoding="utf-8") as f:
+            f.writelines(self.iter_segment_format())
+        return local_path
+
+    def _upload_file(self, local_path: str, file_path: str, content_type: str) -> str:
+        """Upload a rendered file; the request body is streamed from disk rather than held as bytes"""
+        with open(local_path, "rb") as f:
+            # upsert: a concurrent job with the same inputs may have written this artifact already
+            supabase.storage.from_("exports").upload(
+                file_path,
+                f,
+                file_options={"content-type": content_type, "upsert": "true"}
+            )
 
         return file_path
 
-    @staticmethod
-    def _format_time(seconds: float) -> str:
-        """Format seconds to MM:SS"""
-        minutes = int(seconds // 60)
-        secs = int(seconds % 60)
-        return f"{minutes:02d}:{secs:02d}"
\ No newline at end of file
+    def _render_full_zip(self, work_dir: str) -> str:
+        """
+        Bundle transcript and summary. Parts are rendered concurrently by the render pool into
+        work_dir and added to the archive straight from disk; parts are never uploaded on their own.
+        """
+        parts = ["transcript.pdf", "summary.pdf"]
+        for fmt in self.options.get("bundle_formats") or []:
+            if fmt not in BUNDLE_FORMATS:
+                raise ValueError(f"Unsupported bundle format: {fmt}")
+            parts.extend(part for part in BUNDLE_FORMATS[fmt] if part not in parts)
+
+        payload = self.build_payload(work_dir, parts)
+        parts_dir = os.path.join(work_dir, "parts")
+        os.mkdir(parts_dir)
+        futures = {part: render_pool.submit(payload, part, os.path.join(parts_dir, part)) for part in parts}
+
+        local_path = os.path.join(work_dir, "full.zip")
+        with zipfile.ZipFile(local_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+            for name, future in futures.items():
+                try:
+                    future.result()
+                except Exception as e:
+                    # A recording without a summary (or transcript) still gets the other parts
+                    print(f"Error adding {name} to ZIP: {e}")
+                    continue
+                zipf.write(os.path.join(parts_dir, name), name)
+        return local_path
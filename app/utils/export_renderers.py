@@ -0,0 +1,335 @@
+from typing import Dict, Any, Iterable, Iterator, Optional
+from datetime import datetime
+from xml.sax.saxutils import escape
+import json
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import inch
+from reportlab.pdfbase import pdfmetrics
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+
+from app.utils import export_templates
+from app.utils.compact_transcript import CompactTranscript
+from app.utils.export_templates import DEFAULT_TEMPLATE, docx_heading, docx_paragraph
+
+# Pure rendering: everything here works from a payload of already-fetched rows and never
+# touches Supabase, so it can run in a separate process (see app/utils/render_pool.py).
+
+DOCX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+
+class _FlowableStream(list):
+    """
+    Flowable list for `doc.build` that is refilled from a generator as reportlab consumes it.
+    build() checks len() before every flowable, so only a small window of Paragraphs exists
+    at any time instead of one per segment.
+    """
+
+    def __init__(self, flowables: Iterable, window: int = 64):
+        super().__init__()
+        self._source = iter(flowables)
+        self._window = window
+
+    def __len__(self) -> int:
+        size = super().__len__()
+        if self._source is not None and size < self._window:
+            for flowable in self._source:
+                self.append(flowable)
+                size += 1
+                if size >= 2 * self._window:
+                    break
+            else:
+                self._source = None
+        return size
+
+
+class ExportRenderer:
+    """
+    Renders export documents to local files.
+
+    payload keys: recording (row dict), transcript / summary (latest row or None),
+    segments_path (CompactTranscript file with the transcript segments in order, or None) and
+    template (branding key from export_templates, default "default").
+    """
+
+    def __init__(self, payload: Dict[str, Any]):
+        self.recording = payload['recording']
+        self.transcript = payload.get('transcript')
+        self.summary = payload.get('summary')
+        self.segments_path = payload.get('segments_path')
+        self.template = payload.get('template') or DEFAULT_TEMPLATE
+
+    def _get_transcript(self) -> Dict[str, Any]:
+        if not self.transcript:
+            raise ValueError("No transcript found")
+        return self.transcript
+
+    def _get_summary(self) -> Dict[str, Any]:
+        if not self.summary:
+            raise ValueError("No summary found")
+        return self.summary
+
+    def iter_segments(self) -> Iterator[Dict[str, Any]]:
+        """Segment rows, one dict at a time, from the columnar copy of the transcript"""
+        self._get_transcript()
+        if not self.segments_path:
+            return
+        yield from CompactTranscript.load(self.segments_path)
+
+    def transcript_pdf(self, local_path: str) -> None:
+        """Render the transcript PDF, streaming segments page by page"""
+        transcript = self._get_transcript()
+        recording = self.recording
+
+        doc = SimpleDocTemplate(local_path, pagesize=A4,
+                                rightMargin=72, leftMargin=72,
+                                topMargin=72, bottomMargin=18)
+
+        title_style, heading_style, normal_style = export_templates.get_pdf_styles(self.template)
+
+        def elements() -> Iterator:
+            # Add title
+            yield Paragraph(f"Transcript: {recording['title']}", title_style)
+            yield Spacer(1, 0.2 * inch)
+
+            # Add metadata
+            created_date = datetime.fromisoformat(recording['created_at'].replace('Z', '+00:00'))
+            yield Paragraph(f"<b>Created:</b> {created_date.strftime('%Y-%m-%d %H:%M')}", normal_style)
+            yield Paragraph(f"<b>Duration:</b> {recording['duration_seconds']:.2f} seconds", normal_style)
+            yield Paragraph(f"<b>Version:</b> {transcript['version_no']}", normal_style)
+            yield Spacer(1, 0.3 * inch)
+
+            # Add segments
+            yield Paragraph("Transcript Content", heading_style)
+            yield Spacer(1, 0.1 * inch)
+
+            for segment in self.iter_segments():
+                time_str = f"[{format_time(segment['start_time'])} - {format_time(segment['end_time'])}]"
+                speaker = segment.get('speaker_label', 'Unknown')
+                content = segment['content']
+
+                text = f"<b>{speaker}</b> {time_str}<br/>{content}"
+                yield Paragraph(text, normal_style)
+                yield Spacer(1, 0.1 * inch)
+
+        # Build PDF; finished pages are kept compressed by reportlab and written out on save
+        doc.build(_FlowableStream(elements()))
+
+    def transcript_docx(self, local_path: str) -> None:
+        """
+        Render the transcript DOCX from the cached base template; segment paragraphs are
+        streamed straight into word/document.xml inside the zip.
+        """
+        transcript = self._get_transcript()
+        recording = self.recording
+
+        def paragraphs() -> Iterator[str]:
+            # Add title
+            yield docx_heading(f"Transcript: {recording['title']}", 0)
+
+            # Add metadata
+            yield docx_paragraph(f"Created: {recording['created_at']}")
+            yield docx_paragraph(f"Duration: {recording['duration_seconds']:.2f} seconds")
+            yield docx_paragraph(f"Version: {transcript['version_no']}")
+            yield docx_paragraph()
+
+            # Add segments
+            yield docx_heading("Transcript Content", 1)
+            for segment in self.iter_segments():
+                yield _docx_segment_xml(segment)
+
+        export_templates.get_docx_template(self.template).write(local_path, paragraphs())
+
+    def summary_pdf(self, local_path: str) -> None:
+        summary = self._get_summary()
+        recording = self.recording
+
+        # Create PDF
+        doc = SimpleDocTemplate(local_path, pagesize=A4,
+                                rightMargin=72, leftMargin=72,
+                                topMargin=72, bottomMargin=18)
+
+        elements = []
+        title_style, heading_style, normal_style = export_templates.get_pdf_styles(self.template)
+
+        # Add title
+        elements.append(Paragraph(f"Summary: {recording['title']}", title_style))
+        elements.append(Spacer(1, 0.2 * inch))
+
+        # Add metadata
+        elements.append(Paragraph(f"<b>Created:</b> {summary['created_at']}", normal_style))
+        elements.append(Paragraph(f"<b>Style:</b> {summary.get('summary_style', 'N/A')}", normal_style))
+        elements.append(Spacer(1, 0.3 * inch))
+
+        # Parse and add summary content
+        content = summary.get('content_structure', {})
+
+        # Overview
+        if 'overview' in content:
+            elements.append(Paragraph("Overview", heading_style))
+            elements.append(Paragraph(content['overview'], normal_style))
+            elements.append(Spacer(1, 0.2 * inch))
+
+        # Key Points
+        if 'key_points' in content:
+            elements.append(Paragraph("Key Points", heading_style))
+            for point in content['key_points']:
+                elements.append(Paragraph(f"• {point}", normal_style))
+            elements.append(Spacer(1, 0.2 * inch))
+
+        # Action Items
+        if 'action_items' in content:
+            elements.append(Paragraph("Action Items", heading_style))
+            for item in content['action_items']:
+                elements.append(Paragraph(f"• {item}", normal_style))
+
+        doc.build(elements)
+
+    def summary_docx(self, local_path: str) -> None:
+        summary = self._get_summary()
+        recording = self.recording
+
+        def paragraphs() -> Iterator[str]:
+            # Add title
+            yield docx_heading(f"Summary: {recording['title']}", 0)
+
+            # Add metadata
+            yield docx_paragraph(f"Created: {summary['created_at']}")
+            yield docx_paragraph(f"Style: {summary.get('summary_style', 'N/A')}")
+            yield docx_paragraph()
+
+            # Parse and add content
+            content = summary.get('content_structure', {})
+
+            if 'overview' in content:
+                yield docx_heading("Overview", 1)
+                yield docx_paragraph(content['overview'])
+
+            if 'key_points' in content:
+                yield docx_heading("Key Points", 1)
+                for point in content['key_points']:
+                    yield docx_paragraph(f"• {point}")
+
+            if 'action_items' in content:
+                yield docx_heading("Action Items", 1)
+                for item in content['action_items']:
+                    yield docx_paragraph(f"• {item}")
+
+        export_templates.get_docx_template(self.template).write(local_path, paragraphs())
+
+    def transcript_json(self, local_path: str) -> None:
+        """Transcript metadata and segments as JSON, written segment by segment"""
+        transcript = self._get_transcript()
+        with open(local_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"transcript": transcript}, ensure_ascii=False, default=str)[:-1])
+            f.write(', "segments": [')
+            for i, segment in enumerate(self.iter_segments()):
+                if i:
+                    f.write(", ")
+                f.write(json.dumps(segment, ensure_ascii=False, default=str))
+            f.write("]}")
+
+    def summary_json(self, local_path: str) -> None:
+        summary = self._get_summary()
+        with open(local_path, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, default=str)
+
+    def transcript_srt(self, local_path: str) -> None:
+        """SubRip subtitles, one cue per segment"""
+        with open(local_path, "w", encoding="utf-8") as f:
+            f.writelines(srt_lines(self.iter_segments()))
+
+
+def srt_lines(segments: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """SubRip cues, one per segment, produced as the segments are read"""
+    for i, segment in enumerate(segments, start=1):
+        start = format_timestamp(segment['start_time'], ",")
+        end = format_timestamp(segment['end_time'], ",")
+        speaker = segment.get('speaker_label')
+        text = f"{speaker}: {segment['content']}" if speaker else segment['content']
+        yield f"{i}\n{start} --> {end}\n{text}\n\n"
+
+
+def vtt_lines(segments: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """WebVTT captions; the speaker goes in a voice tag so players can style or hide it"""
+    yield "WEBVTT\n\n"
+    for i, segment in enumerate(segments, start=1):
+        start = format_timestamp(segment['start_time'], ".")
+        end = format_timestamp(segment['end_time'], ".")
+        # Cue text must not contain a blank line or "-->" (escaping ">" takes care of the latter)
+        text = escape(" ".join(segment['content'].split()))
+        speaker = segment.get('speaker_label')
+        if speaker:
+            text = f"<v {escape(speaker)}>{text}"
+        yield f"{i}\n{start} --> {end}\n{text}\n\n"
+
+
+def jsonl_lines(segments: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """One transcript_segments row per line"""
+    for segment in segments:
+        yield json.dumps(segment, ensure_ascii=False, default=str) + "\n"
+
+
+# Text exports generated straight from the segment stream: export type -> (lines, content type).
+# They need no document model, so they skip the render pool and never hold the document.
+SEGMENT_FORMATS = {
+    "TRANSCRIPT_SRT": (srt_lines, "application/x-subrip"),
+    "TRANSCRIPT_VTT": (vtt_lines, "text/vtt"),
+    "TRANSCRIPT_JSONL": (jsonl_lines, "application/x-ndjson"),
+}
+
+
+# File name inside a bundle -> ExportRenderer method
+PARTS = {
+    "transcript.pdf": "transcript_pdf",
+    "transcript.docx": "transcript_docx",
+    "transcript.json": "transcript_json",
+    "transcript.srt": "transcript_srt",
+    "summary.pdf": "summary_pdf",
+    "summary.docx": "summary_docx",
+    "summary.json": "summary_json",
+}
+
+
+def render_part(payload: Dict[str, Any], part: str, local_path: str) -> str:
+    """Entry point for the render pool: render one part of an export to local_path."""
+    getattr(ExportRenderer(payload), PARTS[part])(local_path)
+    return local_path
+
+
+def warm_up() -> None:
+    """
+    Process-pool initializer: load fonts and build the PDF style sets and DOCX templates once
+    per worker instead of on the first export it renders.
+    """
+    for font in ("Helvetica", "Helvetica-Bold", "Helvetica-Oblique", "Times-Roman"):
+        pdfmetrics.getFont(font)
+    export_templates.warm_up()
+
+
+def _docx_segment_xml(segment: Dict[str, Any]) -> str:
+    """Same paragraph python-docx produces for a bold "speaker [time]" run and a content run"""
+    time_str = f"[{format_time(segment['start_time'])} - {format_time(segment['end_time'])}]"
+    speaker = segment.get('speaker_label', 'Unknown')
+    return (
+        '<w:p>'
+        f'<w:r><w:rPr><w:b/></w:rPr><w:t xml:space="preserve">{escape(f"{speaker} {time_str}")}</w:t><w:br/></w:r>'
+        f'<w:r><w:t xml:space="preserve">{escape(segment["content"])}</w:t></w:r>'
+        '<w:r><w:br/></w:r>'
+        '</w:p>'
+    )
+
+
+def format_time(seconds: float) -> str:
+    """Format seconds to MM:SS"""
+    minutes = int(seconds // 60)
+    secs = int(seconds % 60)
+    return f"{minutes:02d}:{secs:02d}"
+
+
+def format_timestamp(seconds: float, separator: str) -> str:
+    """Format seconds to HH:MM:SS,mmm (SRT) / HH:MM:SS.mmm (VTT)"""
+    millis = int(round(seconds * 1000))
+    hours, millis = divmod(millis, 3_600_000)
+    minutes, millis = divmod(millis, 60_000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{millis:03d}"
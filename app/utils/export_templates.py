@@ -0,0 +1,184 @@
+import io
+import json
+import os
+import threading
+import zipfile
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Iterable, Mapping, NamedTuple, Optional
+from xml.sax.saxutils import escape
+
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from docx import Document
+from docx.shared import RGBColor
+
+# Per-tier branding, e.g. {"2": {"title_color": "#0b5394", "docx_template": "branding/pro.docx"}}.
+# Keys are tier ids; tiers without an entry (and users without a tier) use DEFAULT_TEMPLATE.
+EXPORT_TEMPLATES_FILE = os.getenv("EXPORT_TEMPLATES_FILE", "export_templates.json")
+DEFAULT_TEMPLATE = "default"
+
+DEFAULT_BRANDING = MappingProxyType({
+    "title_color": "#1a1a1a",
+    "heading_color": "#333333",
+    "font_name": "Helvetica",
+    # .docx whose styles (and any letterhead content) DOCX exports start from
+    "docx_template": None,
+})
+
+# Placeholder paragraph marking where generated content goes in the template's document.xml
+_BODY_PLACEHOLDER = "__EXPORT_BODY__"
+_DOCUMENT_XML = "word/document.xml"
+
+
+@lru_cache(maxsize=1)
+def _brandings() -> Mapping[str, Mapping]:
+    brandings = {DEFAULT_TEMPLATE: DEFAULT_BRANDING}
+    if os.path.exists(EXPORT_TEMPLATES_FILE):
+        with open(EXPORT_TEMPLATES_FILE, encoding="utf-8") as f:
+            for key, overrides in json.load(f).items():
+                unknown = set(overrides) - set(DEFAULT_BRANDING)
+                if unknown:
+                    raise ValueError(f"Unknown export template settings for {key}: {sorted(unknown)}")
+                brandings[str(key)] = MappingProxyType({**DEFAULT_BRANDING, **overrides})
+    return MappingProxyType(brandings)
+
+
+def template_for_tier(tier_id: Optional[int]) -> str:
+    """Template key used for exports of a user on tier_id"""
+    key = str(tier_id)
+    return key if tier_id is not None and key in _brandings() else DEFAULT_TEMPLATE
+
+
+def get_branding(template: str) -> Mapping:
+    return _brandings().get(template, DEFAULT_BRANDING)
+
+
+class PdfStyles(NamedTuple):
+    title: ParagraphStyle
+    heading: ParagraphStyle
+    normal: ParagraphStyle
+
+
+@lru_cache(maxsize=None)
+def get_pdf_styles(template: str = DEFAULT_TEMPLATE) -> PdfStyles:
+    """
+    Paragraph styles for PDF exports, built once per template. The styles are shared by every
+    export in the process, so renderers must not modify them.
+    """
+    branding = get_branding(template)
+    styles = getSampleStyleSheet()
+    return PdfStyles(
+        title=ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=24,
+            textColor=branding['title_color'],
+            spaceAfter=30,
+            alignment=TA_CENTER
+        ),
+        heading=ParagraphStyle(
+            'CustomHeading',
+            parent=styles['Heading2'],
+            fontSize=14,
+            textColor=branding['heading_color'],
+            spaceAfter=12
+        ),
+        normal=ParagraphStyle(
+            'CustomNormal',
+            parent=styles['Normal'],
+            fontName=branding['font_name'],
+            fontSize=11,
+            leading=16,
+            spaceAfter=10
+        ),
+    )
+
+
+class DocxTemplate:
+    """
+    Base DOCX package, loaded and branded once. Each export is a copy of its parts with a newly
+    written body, so no python-docx Document is opened or saved per job.
+    """
+
+    def __init__(self, branding: Mapping):
+        doc = Document(branding['docx_template']) if branding['docx_template'] else Document()
+        # The default colours are the PDF ones; unbranded DOCX exports keep Word's heading colours
+        for style_name, key in (("Title", "title_color"), ("Heading 1", "heading_color")):
+            if branding[key] != DEFAULT_BRANDING[key]:
+                doc.styles[style_name].font.color.rgb = RGBColor.from_string(branding[key].lstrip("#"))
+        doc.add_paragraph(_BODY_PLACEHOLDER)
+
+        package = io.BytesIO()
+        doc.save(package)
+        self._parts = []
+        with zipfile.ZipFile(package) as template:
+            for item in template.infolist():
+                data = template.read(item.filename)
+                if item.filename != _DOCUMENT_XML:
+                    self._parts.append((item.filename, item.date_time, data))
+                    continue
+                xml = data.decode("utf-8")
+                marker = xml.index(_BODY_PLACEHOLDER)
+                self._head = xml[:xml.rindex("<w:p>", 0, marker)].encode("utf-8")
+                self._tail = xml[xml.index("</w:p>", marker) + len("</w:p>"):].encode("utf-8")
+                self._date_time = item.date_time
+
+    def write(self, local_path: str, paragraphs: Iterable[str]) -> None:
+        """Write a document whose body is the given <w:p> elements (see docx_paragraph)"""
+        with zipfile.ZipFile(local_path, 'w', zipfile.ZIP_DEFLATED) as out:
+            for filename, date_time, data in self._parts:
+                out.writestr(zipfile.ZipInfo(filename, date_time), data, zipfile.ZIP_DEFLATED)
+            info = zipfile.ZipInfo(_DOCUMENT_XML, self._date_time)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            with out.open(info, 'w') as f:
+                f.write(self._head)
+                for paragraph in paragraphs:
+                    f.write(paragraph.encode("utf-8"))
+                f.write(self._tail)
+
+
+_docx_templates: Dict[str, DocxTemplate] = {}
+_docx_templates_lock = threading.Lock()
+
+
+def get_docx_template(template: str = DEFAULT_TEMPLATE) -> DocxTemplate:
+    with _docx_templates_lock:
+        if template not in _docx_templates:
+            _docx_templates[template] = DocxTemplate(get_branding(template))
+        return _docx_templates[template]
+
+
+def docx_paragraph(text: str = "", style: Optional[str] = None, center: bool = False) -> str:
+    """XML of a paragraph as python-docx's add_paragraph / add_heading would write it"""
+    props = ""
+    if style:
+        props += f'<w:pStyle w:val="{style}"/>'
+    if center:
+        props += '<w:jc w:val="center"/>'
+    xml = "<w:p>"
+    if props:
+        xml += f"<w:pPr>{props}</w:pPr>"
+    if text:
+        lines = '</w:t><w:br/><w:t xml:space="preserve">'.join(escape(line) for line in text.split("\n"))
+        xml += f'<w:r><w:t xml:space="preserve">{lines}</w:t></w:r>'
+    return xml + "</w:p>"
+
+
+def docx_heading(text: str, level: int) -> str:
+    return docx_paragraph(text, "Title" if level == 0 else f"Heading{level}", center=level == 0)
+
+
+def reload_templates() -> None:
+    """Forget loaded brandings, style sets and DOCX templates (after EXPORT_TEMPLATES_FILE changes)"""
+    _brandings.cache_clear()
+    get_pdf_styles.cache_clear()
+    with _docx_templates_lock:
+        _docx_templates.clear()
+
+
+def warm_up() -> None:
+    """Build the style sets and DOCX templates of every configured template"""
+    for template in _brandings():
+        get_pdf_styles(template)
+        get_docx_template(template)
@@ -0,0 +1,199 @@
+import os
+import json
+import time
+import sqlite3
+from contextlib import closing
+from typing import Optional, Dict, Any, List
+
+# Persistent queue for heavy background work (transcription, summarization, exports).
+# The API process only enqueues; `python -m app.worker` claims and runs the jobs.
+JOB_QUEUE_DB = os.getenv("JOB_QUEUE_DB", "jobs.sqlite3")
+DEFAULT_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+DEFAULT_VISIBILITY_TIMEOUT = float(os.getenv("JOB_VISIBILITY_TIMEOUT", "300"))
+RETRY_BASE_DELAY = float(os.getenv("JOB_RETRY_BASE_DELAY", "10"))
+RETRY_MAX_DELAY = float(os.getenv("JOB_RETRY_MAX_DELAY", "600"))
+
+JOB_TRANSCRIBE = "transcribe"
+JOB_SUMMARIZE = "summarize"
+JOB_EXPORT = "export"
+
+STATUS_QUEUED = "QUEUED"
+STATUS_RUNNING = "RUNNING"
+STATUS_DONE = "DONE"
+STATUS_FAILED = "FAILED"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_type TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'QUEUED',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    run_after REAL NOT NULL,
+    locked_by TEXT,
+    locked_until REAL,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs(status, job_type, run_after);
+"""
+
+
+class JobQueue:
+    """
+    SQLite-backed job table with leases.
+
+    A claimed job is RUNNING until locked_until; a worker that dies simply stops renewing its
+    lease and the job becomes claimable again once the visibility timeout expires, so jobs
+    are never lost. Failed attempts are retried with exponential backoff up to max_attempts.
+    """
+
+    def __init__(self, db_path: str = JOB_QUEUE_DB):
+        self.db_path = db_path
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        return job
+
+    def enqueue(self, job_type: str, payload: Dict[str, Any], max_attempts: Optional[int] = None, delay: float = 0) -> int:
+        now = time.time()
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                "INSERT INTO jobs (job_type, payload, status, attempts, max_attempts, run_after, created_at, updated_at) "
+                "VALUES (?, ?, ?, 0, ?, ?, ?, ?)",
+                (job_type, json.dumps(payload), STATUS_QUEUED, max_attempts or DEFAULT_MAX_ATTEMPTS, now + delay, now, now)
+            )
+            return cursor.lastrowid
+
+    def claim(
+        self,
+        worker_id: str,
+        concurrency: Dict[str, int],
+        visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Leases the oldest runnable job whose type still has free concurrency slots.
+
+        Args:
+            worker_id: Identifier written to locked_by
+            concurrency: Max RUNNING jobs per job type across all workers; types not listed are not claimed
+            visibility_timeout: Seconds before an un-renewed lease expires
+
+        Returns:
+            The claimed job (attempts already incremented) or None
+        """
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            running = dict(conn.execute(
+                "SELECT job_type, COUNT(*) FROM jobs WHERE status = ? AND locked_until > ? GROUP BY job_type",
+                (STATUS_RUNNING, now)
+            ).fetchall())
+            available = [t for t, limit in concurrency.items() if running.get(t, 0) < limit]
+            if not available:
+                conn.execute("COMMIT")
+                return None
+
+            placeholders = ",".join("?" for _ in available)
+            row = conn.execute(
+                f"SELECT job_id FROM jobs WHERE job_type IN ({placeholders}) AND ("
+                f"  (status = ? AND run_after <= ?) OR (status = ? AND locked_until <= ?)"
+                f") ORDER BY run_after, job_id LIMIT 1",
+                (*available, STATUS_QUEUED, now, STATUS_RUNNING, now)
+            ).fetchone()
+            if not row:
+                conn.execute("COMMIT")
+                return None
+
+            conn.execute(
+                "UPDATE jobs SET status = ?, locked_by = ?, locked_until = ?, attempts = attempts + 1, updated_at = ? "
+                "WHERE job_id = ?",
+                (STATUS_RUNNING, worker_id, now + visibility_timeout, now, row["job_id"])
+            )
+            job = conn.execute("SELECT * FROM jobs WHERE job_id = ?", (row["job_id"],)).fetchone()
+            conn.execute("COMMIT")
+            return self._to_dict(job)
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def heartbeat(self, job_id: int, worker_id: str, visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT) -> bool:
+        """Extends the lease; returns False if the job is no longer held by this worker."""
+        now = time.time()
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET locked_until = ?, updated_at = ? WHERE job_id = ? AND locked_by = ? AND status = ?",
+                (now + visibility_timeout, now, job_id, worker_id, STATUS_RUNNING)
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, job_id: int, worker_id: str) -> None:
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, locked_by = NULL, locked_until = NULL, updated_at = ? "
+                "WHERE job_id = ? AND locked_by = ?",
+                (STATUS_DONE, time.time(), job_id, worker_id)
+            )
+
+    def fail(self, job_id: int, worker_id: str, error: str) -> str:
+        """
+        Records a failed attempt. Schedules a retry with exponential backoff, or marks the job
+        FAILED once max_attempts is reached. Returns the new status.
+        """
+        now = time.time()
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT attempts, max_attempts FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            if not row:
+                return STATUS_FAILED
+            if row["attempts"] >= row["max_attempts"]:
+                status, run_after = STATUS_FAILED, now
+            else:
+                delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * (2 ** (row["attempts"] - 1)))
+                status, run_after = STATUS_QUEUED, now + delay
+            conn.execute(
+                "UPDATE jobs SET status = ?, run_after = ?, last_error = ?, locked_by = NULL, locked_until = NULL, "
+                "updated_at = ? WHERE job_id = ? AND locked_by = ?",
+                (status, run_after, error[:2000], now, job_id, worker_id)
+            )
+            return status
+
+    def get_job(self, job_id: int) -> Optional[Dict[str, Any]]:
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            return self._to_dict(row) if row else None
+
+    def counts(self) -> List[Dict[str, Any]]:
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT job_type, status, COUNT(*) AS count FROM jobs GROUP BY job_type, status"
+            ).fetchall()
+            return [dict(r) for r in rows]
+
+
+_queue: Optional[JobQueue] = None
+
+
+def get_queue() -> JobQueue:
+    global _queue
+    if _queue is None:
+        _queue = JobQueue()
+    return _queue
+
+
+def enqueue(job_type: str, payload: Dict[str, Any], max_attempts: Optional[int] = None) -> int:
+    return get_queue().enqueue(job_type, payload, max_attempts=max_attempts)
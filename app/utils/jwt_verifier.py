@@ -0,0 +1,163 @@
+import os
+import time
+import asyncio
+import threading
+from types import SimpleNamespace
+from typing import Optional, Dict, Any, Callable
+
+import httpx
+import jwt
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# "remote": every request calls supabase.auth.get_user (default, previous behaviour)
+# "local":  verify the JWT signature/expiry in-process, fall back to remote for unknown keys
+AUTH_MODE = os.getenv("AUTH_MODE", "remote").lower()
+
+SUPABASE_URL = os.getenv("SUPABASE_URL", "")
+SUPABASE_JWT_SECRET = os.getenv("SUPABASE_JWT_SECRET")  # legacy HS256 projects
+JWKS_URL = os.getenv("SUPABASE_JWKS_URL") or f"{SUPABASE_URL.rstrip('/')}/auth/v1/.well-known/jwks.json"
+JWKS_REFRESH_SECONDS = float(os.getenv("JWKS_REFRESH_SECONDS", "600"))
+JWKS_MIN_REFETCH_SECONDS = float(os.getenv("JWKS_MIN_REFETCH_SECONDS", "30"))
+JWT_AUDIENCE = os.getenv("SUPABASE_JWT_AUDIENCE", "authenticated")
+JWT_LEEWAY_SECONDS = float(os.getenv("JWT_LEEWAY_SECONDS", "5"))
+
+
+class UnknownSigningKey(Exception):
+    """The token is signed with a key we cannot verify locally; use the remote check."""
+    pass
+
+
+def _fetch_jwks(url: str) -> Dict[str, Any]:
+    response = httpx.get(url, timeout=5)
+    response.raise_for_status()
+    return response.json()
+
+
+class JWKSCache:
+    """
+    Caches the project's public signing keys.
+    Keys are refreshed every refresh_interval; an unknown kid triggers an early refetch
+    (at most once per min_refetch_interval, so forged kids cannot hammer the auth server).
+    """
+
+    def __init__(
+        self,
+        url: str = JWKS_URL,
+        refresh_interval: float = JWKS_REFRESH_SECONDS,
+        min_refetch_interval: float = JWKS_MIN_REFETCH_SECONDS,
+        fetch: Callable[[str], Dict[str, Any]] = _fetch_jwks
+    ):
+        self.url = url
+        self.refresh_interval = refresh_interval
+        self.min_refetch_interval = min_refetch_interval
+        self._fetch = fetch
+        self._keys: Dict[str, Any] = {}
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+
+    def _refresh(self) -> None:
+        try:
+            jwks = self._fetch(self.url)
+        except Exception as e:
+            print(f"Error fetching JWKS: {e}")
+            self._fetched_at = time.monotonic()
+            return
+        keys = {}
+        for data in jwks.get("keys", []):
+            try:
+                jwk = jwt.PyJWK.from_dict(data)
+            except Exception:
+                continue
+            keys[data.get("kid")] = jwk.key
+        self._keys = keys
+        self._fetched_at = time.monotonic()
+
+    def _needs_refresh(self, kid: Optional[str]) -> bool:
+        age = time.monotonic() - self._fetched_at
+        return age > self.refresh_interval or (kid not in self._keys and age > self.min_refetch_interval)
+
+    def get_key(self, kid: Optional[str]):
+        with self._lock:
+            if self._needs_refresh(kid):
+                self._refresh()
+            return self._keys.get(kid)
+
+    async def aget_key(self, kid: Optional[str]):
+        """
+        get_key for the event loop: cached keys are returned directly, a refresh (blocking HTTP
+        call under the lock) runs in a worker thread so in-flight requests are not stalled.
+        """
+        if not self._needs_refresh(kid):
+            return self._keys.get(kid)
+        return await asyncio.to_thread(self.get_key, kid)
+
+
+_jwks_cache = JWKSCache()
+
+
+def set_jwks_cache(cache: JWKSCache) -> None:
+    global _jwks_cache
+    _jwks_cache = cache
+
+
+def _signing_key(header: Dict[str, Any], jwks_key: Callable[[Optional[str]], Any]):
+    alg = header.get("alg")
+    if alg == "HS256":
+        if not SUPABASE_JWT_SECRET:
+            raise UnknownSigningKey("HS256 token but SUPABASE_JWT_SECRET is not set")
+        return SUPABASE_JWT_SECRET
+    if alg in ("RS256", "ES256", "EdDSA"):
+        key = jwks_key(header.get("kid"))
+        if key is None:
+            raise UnknownSigningKey(f"Unknown signing key {header.get('kid')}")
+        return key
+    raise jwt.InvalidAlgorithmError(f"Unsupported algorithm {alg}")
+
+
+def _decode(token: str, key, alg: str) -> Dict[str, Any]:
+    return jwt.decode(
+        token,
+        key,
+        algorithms=[alg],
+        audience=JWT_AUDIENCE,
+        leeway=JWT_LEEWAY_SECONDS,
+        options={"require": ["exp", "sub"]}
+    )
+
+
+def verify_token(token: str) -> Dict[str, Any]:
+    """
+    Verifies a Supabase access token locally and returns its claims.
+
+    Raises:
+        UnknownSigningKey: the signing key is not available locally
+        jwt.InvalidTokenError: bad signature, expired, wrong audience, malformed
+
+    Note: local verification does not see server-side session revocation; a token stays
+    valid until it expires (Supabase access tokens are short-lived).
+    """
+    header = jwt.get_unverified_header(token)
+    return _decode(token, _signing_key(header, _jwks_cache.get_key), header.get("alg"))
+
+
+async def verify_token_async(token: str) -> Dict[str, Any]:
+    """verify_token without blocking the event loop when the signing keys are refetched"""
+    header = jwt.get_unverified_header(token)
+    key = None
+    if header.get("alg") in ("RS256", "ES256", "EdDSA"):
+        key = await _jwks_cache.aget_key(header.get("kid"))
+    return _decode(token, _signing_key(header, lambda kid: key), header.get("alg"))
+
+
+def claims_to_auth_user(claims: Dict[str, Any]) -> SimpleNamespace:
+    """Shapes verified claims like the supabase auth User object used by get_current_user."""
+    user_metadata = claims.get("user_metadata") or {}
+    verified = isinstance(user_metadata, dict) and user_metadata.get("email_verified")
+    return SimpleNamespace(
+        id=claims["sub"],
+        email=claims.get("email", ""),
+        user_metadata=user_metadata,
+        email_confirmed_at=claims.get("iat") if verified else None
+    )
@@ -0,0 +1,29 @@
+import base64
+import json
+from typing import Any, List
+
+
+def encode_cursor(values: List[Any]) -> str:
+    """Opaque keyset cursor for the sort key of the last row on a page"""
+    raw = json.dumps(values, separators=(",", ":"), default=str).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """
+    Raises:
+        ValueError: the cursor is malformed or does not hold `size` values
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != size or not all(isinstance(v, str) for v in values):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def quote_filter_value(value: str) -> str:
+    """Double-quote a value inside a PostgREST or=(...) filter, where , . : ( ) are reserved"""
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
@@ -0,0 +1,49 @@
+import os
+import multiprocessing
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from app.utils.export_renderers import render_part, warm_up
+
+# Number of worker processes for export rendering. 0 renders in threads inside the API process.
+RENDER_WORKERS = int(os.getenv("EXPORT_RENDER_WORKERS", "0"))
+# Threads used for FULL_ZIP parts when rendering in-process
+ZIP_RENDER_WORKERS = int(os.getenv("EXPORT_ZIP_RENDER_WORKERS", "4"))
+
+_pool: Optional[Executor] = None
+_pool_lock = threading.Lock()
+
+
+def get_render_pool() -> Executor:
+    """
+    Shared executor for export rendering. With EXPORT_RENDER_WORKERS > 0 this is a process pool
+    whose workers are warmed up once (fonts, style sheet, DOCX template), so ReportLab and
+    python-docx no longer hold the API process's GIL while rendering.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            if RENDER_WORKERS > 0:
+                # spawn: forking a process that runs uvicorn and httpx pools is not safe
+                _pool = ProcessPoolExecutor(
+                    max_workers=RENDER_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=warm_up,
+                )
+            else:
+                _pool = ThreadPoolExecutor(max_workers=ZIP_RENDER_WORKERS, thread_name_prefix="export-render")
+        return _pool
+
+
+def submit(payload: Dict[str, Any], part: str, local_path: str) -> Future:
+    """Render one export part (see export_renderers.PARTS) into local_path"""
+    return get_render_pool().submit(render_part, payload, part, local_path)
+
+
+def shutdown_render_pool() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True)
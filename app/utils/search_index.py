@@ -0,0 +1,246 @@
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+SEARCH_INDEX_PATH = os.getenv("SEARCH_INDEX_PATH", ".cache/search_index.db")
+
+# đ/Đ have no Unicode decomposition, so NFD alone would keep them
+_FOLD_EXTRA = str.maketrans({"đ": "d", "Đ": "D"})
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    id INTEGER PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    recording_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    segment_id INTEGER,
+    section TEXT,
+    start_time REAL,
+    end_time REAL,
+    content TEXT NOT NULL,
+    folded TEXT NOT NULL,
+    owner TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_docs_recording ON docs (recording_id, kind);
+CREATE INDEX IF NOT EXISTS idx_docs_segment ON docs (segment_id);
+CREATE TABLE IF NOT EXISTS indexed_recordings (
+    recording_id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    transcript_id TEXT
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS docs_fts USING fts5(
+    content, folded, owner, content='docs', content_rowid='id', tokenize='unicode61 remove_diacritics 0'
+);
+CREATE TRIGGER IF NOT EXISTS docs_ai AFTER INSERT ON docs BEGIN
+    INSERT INTO docs_fts(rowid, content, folded, owner) VALUES (new.id, new.content, new.folded, new.owner);
+END;
+CREATE TRIGGER IF NOT EXISTS docs_ad AFTER DELETE ON docs BEGIN
+    INSERT INTO docs_fts(docs_fts, rowid, content, folded, owner) VALUES ('delete', old.id, old.content, old.folded, old.owner);
+END;
+"""
+
+
+def fold(text: str) -> str:
+    """Lowercase and strip Vietnamese diacritics: "Kế hoạch Đợt 2" -> "ke hoach dot 2" """
+    decomposed = unicodedata.normalize("NFD", text.translate(_FOLD_EXTRA))
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
+
+
+def owner_token(user_id: str) -> str:
+    """
+    The user id as a single FTS token. Matching it in the same MATCH expression lets FTS5
+    intersect posting lists instead of ranking every user's hits and filtering afterwards.
+    """
+    return "u" + re.sub(r"\W", "", user_id).lower()
+
+
+def build_match(query: str) -> Optional[str]:
+    """
+    FTS5 MATCH expression for a user query: every word must appear (the last one as a prefix).
+    Words are matched without diacritics; hits that also match the typed accents rank higher.
+    Returns None when the query has no words.
+    """
+    words = _WORD.findall(unicodedata.normalize("NFC", query).lower())
+    if not words:
+        return None
+
+    def terms(column: str, tokens: List[str]) -> str:
+        quoted = ['"' + token.replace('"', '""') + '"' for token in tokens]
+        quoted[-1] += "*"
+        return f"{column}: (" + " AND ".join(quoted) + ")"
+
+    folded = [fold(word) for word in words]
+    if folded == words:
+        return terms("folded", folded)
+    return f"{terms('folded', folded)} OR {terms('content', words)}"
+
+
+def summary_texts(content_structure: Optional[Dict[str, Any]]) -> Iterator[Tuple[str, str]]:
+    """(section, text) for every non-empty string in a summary's content_structure"""
+    def walk(section: str, value: Any):
+        if isinstance(value, str):
+            if value.strip():
+                yield section, value
+        elif isinstance(value, dict):
+            for key, item in value.items():
+                yield from walk(key if not section else section, item)
+        elif isinstance(value, list):
+            for item in value:
+                yield from walk(section, item)
+
+    yield from walk("", content_structure or {})
+
+
+class SearchIndex:
+    """
+    Per-user full-text index of the latest transcript segments and summary of each recording,
+    stored in SQLite FTS5. Thread-safe; all access goes through one connection.
+    """
+
+    def __init__(self, path: str = SEARCH_INDEX_PATH):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _write(self, statements: Iterable[Tuple[str, Any]]) -> None:
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for sql, params in statements:
+                    if isinstance(params, list):
+                        self._conn.executemany(sql, params)
+                    else:
+                        self._conn.execute(sql, params)
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def owner(self, recording_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT user_id, transcript_id FROM indexed_recordings WHERE recording_id = ?", (recording_id,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def index_transcript(self, user_id: str, recording_id: str, transcript_id: str, segments: Iterable[Dict[str, Any]]) -> None:
+        """Replace the recording's indexed transcript with these segments (dicts with segment_id)"""
+        rows = [
+            (user_id, recording_id, s['segment_id'], s.get('start_time'), s.get('end_time'), s['content'], fold(s['content']),
+             owner_token(user_id))
+            for s in segments if s.get('content')
+        ]
+        self._write([
+            ("DELETE FROM docs WHERE recording_id = ? AND kind = 'segment'", (recording_id,)),
+            ("INSERT INTO indexed_recordings (recording_id, user_id, transcript_id) VALUES (?, ?, ?) "
+             "ON CONFLICT (recording_id) DO UPDATE SET user_id = excluded.user_id, transcript_id = excluded.transcript_id",
+             (recording_id, user_id, transcript_id)),
+            ("INSERT INTO docs (user_id, recording_id, kind, segment_id, start_time, end_time, content, folded, owner) "
+             "VALUES (?, ?, 'segment', ?, ?, ?, ?, ?, ?)", rows),
+        ])
+
+    def index_summary(self, user_id: str, recording_id: str, content_structure: Optional[Dict[str, Any]]) -> None:
+        """Replace the recording's indexed summary; every string in content_structure is one hit"""
+        rows = [(user_id, recording_id, section or None, text, fold(text), owner_token(user_id))
+                for section, text in summary_texts(content_structure)]
+        self._write([
+            ("DELETE FROM docs WHERE recording_id = ? AND kind = 'summary'", (recording_id,)),
+            ("INSERT INTO indexed_recordings (recording_id, user_id) VALUES (?, ?) "
+             "ON CONFLICT (recording_id) DO UPDATE SET user_id = excluded.user_id",
+             (recording_id, user_id)),
+            ("INSERT INTO docs (user_id, recording_id, kind, section, content, folded, owner) "
+             "VALUES (?, ?, 'summary', ?, ?, ?, ?)", rows),
+        ])
+
+    def upsert_segment(self, transcript_id: str, segment: Dict[str, Any]) -> bool:
+        return self.upsert_segments(transcript_id, [segment])
+
+    def upsert_segments(self, transcript_id: str, segments: List[Dict[str, Any]]) -> bool:
+        """
+        Add or update segments of the indexed transcript in one transaction. Segments of other
+        transcript versions are ignored. Returns whether the index changed.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT recording_id, user_id FROM indexed_recordings WHERE transcript_id = ?", (transcript_id,)
+            ).fetchone()
+        if not row:
+            return False
+        self._write([
+            ("DELETE FROM docs WHERE segment_id = ? AND kind = 'segment'", [(s['segment_id'],) for s in segments]),
+            ("INSERT INTO docs (user_id, recording_id, kind, segment_id, start_time, end_time, content, folded, owner) "
+             "VALUES (?, ?, 'segment', ?, ?, ?, ?, ?, ?)",
+             [(row['user_id'], row['recording_id'], s['segment_id'], s.get('start_time'), s.get('end_time'),
+               s['content'], fold(s['content']), owner_token(row['user_id'])) for s in segments if s.get('content')]),
+        ])
+        return True
+
+    def remove_segment(self, segment_id: int) -> None:
+        self._write([("DELETE FROM docs WHERE segment_id = ? AND kind = 'segment'", (segment_id,))])
+
+    def remove_recording(self, recording_id: str) -> None:
+        self._write([
+            ("DELETE FROM docs WHERE recording_id = ?", (recording_id,)),
+            ("DELETE FROM indexed_recordings WHERE recording_id = ?", (recording_id,)),
+        ])
+
+    def search(self, user_id: str, query: str, limit: int = 20, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Best hits first; each hit is one transcript segment or one summary item"""
+        match = build_match(query)
+        if not match:
+            return []
+        sql = (
+            "SELECT d.recording_id, d.kind, d.segment_id, d.section, d.start_time, d.end_time, d.content, "
+            "bm25(docs_fts, 2.0, 1.0, 0.0) AS score "
+            "FROM docs_fts JOIN docs d ON d.id = docs_fts.rowid "
+            "WHERE docs_fts MATCH ? AND d.user_id = ?"
+        )
+        params: List[Any] = [f'owner: "{owner_token(user_id)}" AND ({match})', user_id]
+        if kind:
+            sql += " AND d.kind = ?"
+            params.append(kind)
+        sql += " ORDER BY score LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        # bm25 is lower-is-better; expose higher-is-better
+        return [{**dict(row), "score": -row['score']} for row in rows]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            docs = self._conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+            recordings = self._conn.execute("SELECT COUNT(*) FROM indexed_recordings").fetchone()[0]
+        return {"docs": docs, "recordings": recordings}
+
+
+_index: Optional[SearchIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_index() -> SearchIndex:
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = SearchIndex(SEARCH_INDEX_PATH)
+        return _index
+
+
+def set_index(index: Optional[SearchIndex]) -> None:
+    """Swap the index (e.g. SearchIndex(":memory:") in tests)."""
+    global _index
+    with _index_lock:
+        _index = index
@@ -0,0 +1,72 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+class SegmentTimeIndex:
+    """
+    Time lookups over one transcript version's segments: sorted start/end arrays searched with
+    bisect, so every lookup is O(log n) plus the size of the page it returns.
+
+    Overlap queries also keep the running maximum of end times. Segments that sit inside an
+    earlier, longer one make that maximum run ahead of the end times; only then do range
+    pages fall back to filtering the candidates one by one.
+    """
+
+    def __init__(self, segments: Iterable[Dict[str, Any]]):
+        rows = sorted(segments, key=lambda s: (float(s['start_time']), float(s['end_time']), s['sequence']))
+        self.rows: Tuple[Dict[str, Any], ...] = tuple(rows)
+        self.starts = array("d", (float(s['start_time']) for s in rows))
+        self.ends = array("d", (float(s['end_time']) for s in rows))
+        # Overlap = not (start > end_of_window or end < start_of_window); the two cases are
+        # disjoint, so counts come from the sorted starts and the sorted ends alone
+        self.sorted_ends = array("d", sorted(self.ends))
+        self.max_ends = array("d")
+        running = float("-inf")
+        for end in self.ends:
+            running = max(running, end)
+            self.max_ends.append(running)
+        self.nested = list(self.ends) != list(self.max_ends)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def count_overlapping(self, start: float, end: float) -> int:
+        """Number of segments with start_time <= end and end_time >= start"""
+        return max(0, bisect_right(self.starts, end) - bisect_left(self.sorted_ends, start))
+
+    def overlapping(self, start: float, end: float, offset: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+        """One page of the segments overlapping [start, end], ordered by start_time"""
+        first = bisect_left(self.max_ends, start)
+        last = bisect_right(self.starts, end)
+        if not self.nested:
+            return list(self.rows[first + offset:min(first + offset + limit, last)])
+        page: List[Dict[str, Any]] = []
+        skipped = 0
+        for i in range(first, last):
+            if self.ends[i] < start:
+                continue
+            if skipped < offset:
+                skipped += 1
+                continue
+            page.append(self.rows[i])
+            if len(page) == limit:
+                break
+        return page
+
+    def at(self, time_seconds: float) -> Optional[Dict[str, Any]]:
+        """The latest-starting segment playing at time_seconds, or None in a gap"""
+        i = bisect_right(self.starts, time_seconds) - 1
+        while i >= 0 and self.max_ends[i] >= time_seconds:
+            if self.ends[i] >= time_seconds:
+                return self.rows[i]
+            i -= 1
+        return None
+
+    def around(self, time_seconds: float, context: int = 2) -> List[Dict[str, Any]]:
+        """
+        The segment at or just before time_seconds with `context` segments on either side,
+        e.g. the lines around a marker
+        """
+        i = bisect_right(self.starts, time_seconds)
+        return list(self.rows[max(0, i - 1 - context):i + context])
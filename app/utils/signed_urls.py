@@ -0,0 +1,88 @@
+import os
+from typing import Dict, List, Optional
+
+from app.utils.database import supabase
+from app.utils.ttl_cache import TTLCache
+
+# A signed URL is reused until SAFETY_MARGIN seconds before it expires, so a client never
+# receives a URL that is about to stop working
+DEFAULT_EXPIRES_IN = int(os.getenv("SIGNED_URL_EXPIRES_IN", "3600"))
+SAFETY_MARGIN = int(os.getenv("SIGNED_URL_SAFETY_MARGIN", "300"))
+
+# Keyed by (bucket, path)
+_cache = TTLCache(
+    "signed_urls",
+    maxsize=int(os.getenv("SIGNED_URL_CACHE_MAXSIZE", "10000")),
+    ttl=DEFAULT_EXPIRES_IN - SAFETY_MARGIN
+)
+
+
+def _extract_url(response) -> Optional[str]:
+    if isinstance(response, dict):
+        return response.get("signedURL") or response.get("signedUrl")
+    if isinstance(response, str):
+        return response
+    return None
+
+
+def get_signed_url(bucket: str, path: str, expires_in: int = DEFAULT_EXPIRES_IN) -> Optional[str]:
+    """
+    Returns a signed download URL for bucket/path, signing it only when there is no cached
+    URL that stays valid for at least SAFETY_MARGIN more seconds. Returns None if signing fails.
+    """
+    if not path:
+        return None
+
+    def load():
+        return _extract_url(supabase.storage.from_(bucket).create_signed_url(path, expires_in))
+
+    try:
+        if expires_in <= SAFETY_MARGIN:
+            return load()
+        return _cache.get_or_load((bucket, path), load, ttl=expires_in - SAFETY_MARGIN)
+    except Exception as e:
+        print(f"Error generating signed URL: {e}")
+        return None
+
+
+def get_signed_urls(bucket: str, paths: List[str], expires_in: int = DEFAULT_EXPIRES_IN) -> Dict[str, Optional[str]]:
+    """
+    Signed URLs for many paths of one bucket: cached ones are reused and all the others are
+    signed with a single create_signed_urls call. Paths that fail to sign map to None.
+    """
+    urls: Dict[str, Optional[str]] = {}
+    missing: List[str] = []
+    for path in dict.fromkeys(p for p in paths if p):
+        url = _cache.get((bucket, path))
+        _cache.record(hit=url is not None)
+        if url is not None:
+            urls[path] = url
+        else:
+            missing.append(path)
+
+    if missing:
+        try:
+            signed = supabase.storage.from_(bucket).create_signed_urls(missing, expires_in)
+        except Exception as e:
+            print(f"Error generating signed URLs: {e}")
+            signed = []
+        for item in signed:
+            path = item.get("path")
+            url = None if item.get("error") else _extract_url(item)
+            if path is None:
+                continue
+            urls[path] = url
+            if url and expires_in > SAFETY_MARGIN:
+                _cache.set((bucket, path), url, ttl=expires_in - SAFETY_MARGIN)
+
+    return {path: urls.get(path) for path in paths if path}
+
+
+def evict(bucket: str, path: Optional[str]) -> None:
+    """Drops the cached URL of an object that has been deleted."""
+    if path:
+        _cache.invalidate((bucket, path))
+
+
+def stats():
+    return _cache.stats()
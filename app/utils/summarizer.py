@@ -1,10 +1,14 @@
 import os
 import json
-from typing import Dict, Any
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Callable, Optional
 from dotenv import load_dotenv
 from google import genai
 from google.genai import types
 
+from app.utils.disk_cache import CacheBackend, DiskCacheBackend
+
 load_dotenv()
 
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
@@ -14,57 +18,209 @@ if not GEMINI_API_KEY:
 
 client = genai.Client(api_key=GEMINI_API_KEY)
 
-def generate_summary_gemini(transcript_text: str, summary_style: str = "MEETING") -> Dict[str, Any]:
+SUMMARY_MODEL = "gemini-2.5-flash-lite"
+
+# Transcripts estimated above this size are summarized hierarchically (map-reduce)
+MAX_PROMPT_TOKENS = int(os.getenv("SUMMARY_MAX_PROMPT_TOKENS", "200000"))
+CHUNK_TOKENS = int(os.getenv("SUMMARY_CHUNK_TOKENS", "30000"))
+REDUCE_FAN_IN = int(os.getenv("SUMMARY_REDUCE_FAN_IN", "8"))
+MAX_WORKERS = int(os.getenv("SUMMARY_MAX_WORKERS", "4"))
+
+PARTIAL_CACHE_DIR = os.getenv("SUMMARY_CACHE_DIR", ".cache/summaries")
+PARTIAL_CACHE_MAX_MB = float(os.getenv("SUMMARY_CACHE_MAX_MB", "128"))
+
+SUMMARY_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "overview": {"type": "string", "description": "A concise paragraph summarizing the main purpose and outcome of the meeting."},
+        "key_points": {
+            "type": "array",
+            "items": {"type": "string", "description": "Key point discussed"}
+        },
+        "action_items": {
+            "type": "array",
+            "items": {"type": "string", "description": "Action item with owner if applicable"}
+        }
+    },
+    "required": ["overview", "key_points", "action_items"]
+}
+
+MAP_PROMPT = """
+    You are an expert AI meeting assistant. The following text is one consecutive part of a longer meeting transcript.
+    Summarize only this part. Keep every decision, key point and action item (with its owner) that appears in it.
+
+    Transcript part:
+    {text}
     """
-    Generates a summary from transcript text using Gemini.
-    
-    Args:
-        transcript_text: The cleaned transcript text
-        summary_style: The style of summary to generate (default: MEETING)
-        
-    Returns:
-        Dictionary containing the summary structure (overview, key_points, action_items)
+
+REDUCE_PROMPT = """
+    You are an expert AI meeting assistant. The following JSON array contains partial summaries of consecutive parts
+    of one meeting, in chronological order. Merge them into a single summary of the whole meeting.
+    Combine overlapping key points, keep every distinct action item and remove duplicates.
+    {style_line}
+    Partial summaries:
+    {text}
     """
-    
-    prompt = f"""
+
+# Map and intermediate reduce prompts do not depend on summary_style, so their results are reusable
+PARTIAL_VERSION = hashlib.sha256(f"{SUMMARY_MODEL}\n{MAP_PROMPT}\n{REDUCE_PROMPT}".encode("utf-8")).hexdigest()[:16]
+
+_partial_cache: Optional[CacheBackend] = None
+
+
+def get_partial_cache() -> CacheBackend:
+    global _partial_cache
+    if _partial_cache is None:
+        _partial_cache = DiskCacheBackend(PARTIAL_CACHE_DIR, int(PARTIAL_CACHE_MAX_MB * 1024 * 1024))
+    return _partial_cache
+
+
+def set_partial_cache(backend: Optional[CacheBackend]) -> None:
+    global _partial_cache
+    _partial_cache = backend
+
+
+def _call_model(prompt: str) -> Dict[str, Any]:
+    """Sends one prompt to Gemini and returns the parsed summary structure. Raises on failure."""
+    response = client.models.generate_content(
+        model=SUMMARY_MODEL,
+        contents=[prompt],
+        config=types.GenerateContentConfig(
+            response_mime_type='application/json',
+            response_schema=SUMMARY_SCHEMA,
+            thinking_config=types.ThinkingConfig(thinking_budget=0)
+        )
+    )
+    return json.loads(response.text)
+
+
+def _build_prompt(transcript_text: str, summary_style: str) -> str:
+    return f"""
     You are an expert AI meeting assistant. Your task is to summarize the following meeting transcript.
     Summary Style: {summary_style}
-    
+
     Transcript:
     {transcript_text}
     """
-    
-    try:
-        response = client.models.generate_content(
-            model="gemini-2.5-flash-lite",
-            contents=[prompt],
-            config=types.GenerateContentConfig(
-                response_mime_type='application/json',
-                response_schema={
-                    "type": "object",
-                    "properties": {
-                        "overview": {"type": "string", "description": "A concise paragraph summarizing the main purpose and outcome of the meeting."},
-                        "key_points": {
-                            "type": "array",
-                            "items": {"type": "string", "description": "Key point discussed"}
-                        },
-                        "action_items": {
-                            "type": "array",
-                            "items": {"type": "string", "description": "Action item with owner if applicable"}
-                        }
-                    },
-                    "required": ["overview", "key_points", "action_items"]
-                },
-                thinking_config=types.ThinkingConfig(thinking_budget=0)
-            )
-        )
-        
-        return json.loads(response.text)
-    except Exception as e:
-        print(f"Error generating summary: {e}")
-        # Return a fallback structure in case of error
-        return {
-            "overview": "Error generating summary.",
-            "key_points": [],
-            "action_items": []
-        }
+
+
+def estimate_tokens(text: str) -> int:
+    # Rough upper bound; Vietnamese text averages fewer characters per token than English
+    return len(text) // 3 + 1
+
+
+def split_transcript(cleaned_text: str, max_tokens: int = CHUNK_TOKENS) -> List[str]:
+    """
+    Packs speaker turns (one "SPEAKER: content" line each) into chunks of at most max_tokens.
+    A single turn larger than the budget is split on word boundaries.
+    """
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+
+    def flush():
+        nonlocal current, current_tokens
+        if current:
+            chunks.append("\n".join(current))
+        current, current_tokens = [], 0
+
+    for line in cleaned_text.split("\n"):
+        tokens = estimate_tokens(line)
+        if tokens > max_tokens:
+            # Oversized turn: cut it into word-bounded pieces that each fit the budget
+            flush()
+            speaker, _, content = line.partition(": ")
+            budget_chars = max(1, (max_tokens - estimate_tokens(speaker) - 1) * 3)
+            piece: List[str] = []
+            piece_chars = 0
+            for word in content.split():
+                if piece and piece_chars + len(word) + 1 > budget_chars:
+                    chunks.append(f"{speaker}: {' '.join(piece)}")
+                    piece, piece_chars = [], 0
+                piece.append(word)
+                piece_chars += len(word) + 1
+            if piece:
+                line = f"{speaker}: {' '.join(piece)}"
+                tokens = estimate_tokens(line)
+            else:
+                continue
+
+        if current_tokens + tokens > max_tokens:
+            flush()
+        current.append(line)
+        current_tokens += tokens
+
+    flush()
+    return chunks
+
+
+def _cached_partial(prompt: str, call_model: Callable[[str], Dict[str, Any]]) -> Dict[str, Any]:
+    cache = get_partial_cache()
+    key = f"{hashlib.sha256(prompt.encode('utf-8')).hexdigest()}_{PARTIAL_VERSION}"
+    cached = cache.get(key)
+    if cached is not None:
+        return json.loads(cached)
+    result = call_model(prompt)
+    cache.set(key, json.dumps(result, ensure_ascii=False).encode("utf-8"))
+    return result
+
+
+def _reduce_prompt(partials: List[Dict[str, Any]], summary_style: Optional[str]) -> str:
+    style_line = f"Summary Style: {summary_style}\n" if summary_style else ""
+    return REDUCE_PROMPT.format(style_line=style_line, text=json.dumps(partials, ensure_ascii=False))
+
+
+def _group_partials(partials: List[Dict[str, Any]], max_tokens: int, fan_in: int) -> List[List[Dict[str, Any]]]:
+    groups: List[List[Dict[str, Any]]] = [[]]
+    group_tokens = 0
+    for partial in partials:
+        tokens = estimate_tokens(json.dumps(partial, ensure_ascii=False))
+        size = len(groups[-1])
+        # Every group merges at least two partials so each level shrinks the list
+        if size >= max(2, fan_in) or (size >= 2 and group_tokens + tokens > max_tokens):
+            groups.append([])
+            group_tokens = 0
+        groups[-1].append(partial)
+        group_tokens += tokens
+    return groups
+
+
+def summarize_transcript(
+    cleaned_text: str,
+    summary_style: str = "MEETING",
+    call_model: Callable[[str], Dict[str, Any]] = _call_model,
+    max_prompt_tokens: int = MAX_PROMPT_TOKENS,
+    chunk_tokens: int = CHUNK_TOKENS,
+    fan_in: int = REDUCE_FAN_IN,
+    max_workers: int = MAX_WORKERS
+) -> Dict[str, Any]:
+    """
+    Summarizes a cleaned transcript of any length.
+
+    Transcripts that fit in one prompt are summarized directly. Longer ones are split at
+    speaker-turn boundaries, the chunks are summarized concurrently (map), then the partial
+    summaries are merged level by level in groups of fan_in (reduce) until one remains, so
+    the number of sequential model calls grows with log(length).
+
+    Map and intermediate reduce results do not depend on summary_style and are cached,
+    so re-summarizing in another style only pays for the final reduce.
+
+    Raises:
+        Exception from the model call; there is no silent fallback summary.
+    """
+    if estimate_tokens(cleaned_text) <= max_prompt_tokens:
+        return call_model(_build_prompt(cleaned_text, summary_style))
+
+    chunks = split_transcript(cleaned_text, chunk_tokens)
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        partials = list(pool.map(
+            lambda chunk: _cached_partial(MAP_PROMPT.format(text=chunk), call_model), chunks
+        ))
+
+        while True:
+            groups = _group_partials(partials, max_prompt_tokens, fan_in)
+            if len(groups) == 1:
+                return call_model(_reduce_prompt(groups[0], summary_style))
+            partials = list(pool.map(
+                lambda group: _cached_partial(_reduce_prompt(group, None), call_model), groups
+            ))
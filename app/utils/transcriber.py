@@ -12,8 +12,9 @@ if not GEMINI_API_KEY:
 
 client = genai.Client(api_key=GEMINI_API_KEY)
 
-def transcribe(audio_bytes: bytes, file_extension: str):
-    prompt = '''
+TRANSCRIBE_MODEL = "gemini-2.5-flash-lite"
+
+TRANSCRIBE_PROMPT = '''
     Transcribe the provided audio file verbatim, identifying different speakers based on voice changes (label them as SPEAKER_01, SPEAKER_02, etc., starting from SPEAKER_01 for the first voice). For each spoken segment, provide:
     - The start time and end time of the segment in seconds (float).
     - The exact spoken content without any repetition, filler words (unless essential), or summarization.
@@ -29,14 +30,16 @@ def transcribe(audio_bytes: bytes, file_extension: str):
     If the audio has only one speaker, use SPEAKER_01 throughout. Ensure the transcript is complete but concise, covering the entire audio without duplicates.
     '''
 
+
+def transcribe(audio_bytes: bytes, file_extension: str):
     # Tạo audio part từ bytes
     mime_type = f"audio/{file_extension}"
     audio_part = types.Part.from_bytes(data=audio_bytes, mime_type=mime_type)
 
     response = client.models.generate_content(
-        model="gemini-2.5-flash-lite",
+        model=TRANSCRIBE_MODEL,
         contents=[
-            prompt,
+            TRANSCRIBE_PROMPT,
             audio_part
         ],
         config=types.GenerateContentConfig(
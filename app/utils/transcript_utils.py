@@ -1,15 +1,20 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Union
 
-def clean_transcript_for_summary(segments: List[Any]) -> str:
+from app.utils.compact_transcript import CompactTranscript
+
+def clean_transcript_for_summary(segments: Union[CompactTranscript, List[Any]]) -> str:
     """
     Prepares transcript content for summarization by removing timestamps and joining text.
     
     Args:
-        segments: List of transcript segments (Pydantic objects or dicts)
+        segments: A CompactTranscript, or a list of transcript segments (Pydantic objects or dicts)
         
     Returns:
         String containing the cleaned transcript text with speaker labels
     """
+    if isinstance(segments, CompactTranscript):
+        return "\n".join(segments.dialogue_lines())
+
     cleaned_text = []
     for segment in segments:
         if hasattr(segment, "speaker_label"):
@@ -0,0 +1,63 @@
+import os
+import json
+import hashlib
+from typing import Optional, Dict, Any
+
+from app.utils import transcriber
+from app.utils.disk_cache import CacheBackend, DiskCacheBackend
+
+CACHE_ENABLED = os.getenv("TRANSCRIPTION_CACHE_ENABLED", "true").lower() == "true"
+CACHE_DIR = os.getenv("TRANSCRIPTION_CACHE_DIR", ".cache/transcriptions")
+CACHE_MAX_MB = float(os.getenv("TRANSCRIPTION_CACHE_MAX_MB", "512"))
+
+# Changing the prompt or the model must not serve answers produced by the old one
+PROMPT_VERSION = hashlib.sha256(
+    f"{transcriber.TRANSCRIBE_MODEL}\n{transcriber.TRANSCRIBE_PROMPT}".encode("utf-8")
+).hexdigest()[:16]
+
+_backend: Optional[CacheBackend] = None
+
+
+def get_backend() -> CacheBackend:
+    global _backend
+    if _backend is None:
+        _backend = DiskCacheBackend(CACHE_DIR, int(CACHE_MAX_MB * 1024 * 1024))
+    return _backend
+
+
+def set_backend(backend: Optional[CacheBackend]) -> None:
+    """Swap the storage backend (e.g. a MemoryCacheBackend in tests)."""
+    global _backend
+    _backend = backend
+
+
+def cache_key(audio_bytes: bytes, file_extension: str) -> str:
+    audio_hash = hashlib.sha256(audio_bytes).hexdigest()
+    return f"{audio_hash}_{file_extension.lower()}_{PROMPT_VERSION}"
+
+
+def transcribe(audio_bytes: bytes, file_extension: str) -> str:
+    """
+    Drop-in replacement for transcriber.transcribe that serves identical audio from the cache.
+    Only responses that parse as JSON are stored.
+    """
+    if not CACHE_ENABLED:
+        return transcriber.transcribe(audio_bytes, file_extension)
+
+    backend = get_backend()
+    key = cache_key(audio_bytes, file_extension)
+    cached = backend.get(key)
+    if cached is not None:
+        return cached.decode("utf-8")
+
+    result = transcriber.transcribe(audio_bytes, file_extension)
+    try:
+        json.loads(result)
+        backend.set(key, result.encode("utf-8"))
+    except (TypeError, ValueError):
+        pass
+    return result
+
+
+def stats() -> Dict[str, Any]:
+    return get_backend().stats()
@@ -0,0 +1,181 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+class _Flight:
+    """One in-progress load that concurrent callers for the same key wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class TTLCache:
+    """
+    Thread-safe in-process LRU cache whose entries expire after ttl seconds.
+
+    get_or_load collapses concurrent misses for the same key into a single loader call
+    (single flight): the first caller runs the loader, the others wait for its result.
+    A None result is returned but not cached, so a row created later is seen immediately.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._async_flights: Dict[Hashable, asyncio.Future] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            return self._get_locked(key)
+
+    def _get_locked(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self._set_locked(key, value, ttl)
+
+    def _set_locked(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        self._entries[key] = (value, time.monotonic() + (self.ttl if ttl is None else ttl))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        with self._lock:
+            value = self._get_locked(key)
+            if value is not None:
+                self.hits += 1
+                return value
+            self.misses += 1
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                generation = self._generation
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = loader()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self.loads += 1
+                # Skip the store if the key was invalidated while the query was in flight
+                if flight.error is None and flight.value is not None and self._flights.get(key) is flight \
+                        and generation == self._generation:
+                    self._set_locked(key, flight.value, ttl)
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+            flight.done.set()
+        return flight.value
+
+    async def aget_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]], ttl: Optional[float] = None) -> Any:
+        """get_or_load for coroutines: concurrent misses on one event loop await a single load."""
+        with self._lock:
+            value = self._get_locked(key)
+            if value is not None:
+                self.hits += 1
+                return value
+            self.misses += 1
+            flight = self._async_flights.get(key)
+            leader = flight is None or flight.get_loop() is not asyncio.get_running_loop()
+            if leader:
+                flight = self._async_flights[key] = asyncio.get_running_loop().create_future()
+                generation = self._generation
+
+        if not leader:
+            return await asyncio.shield(flight)
+
+        try:
+            value = await loader()
+        except BaseException as e:
+            with self._lock:
+                self.loads += 1
+                if self._async_flights.get(key) is flight:
+                    del self._async_flights[key]
+            if isinstance(e, asyncio.CancelledError):
+                flight.cancel()
+            else:
+                flight.set_exception(e)
+                flight.exception()  # mark retrieved in case nobody else is waiting
+            raise
+
+        with self._lock:
+            self.loads += 1
+            # Skip the store if the key was invalidated while the query was in flight
+            if self._async_flights.get(key) is flight:
+                del self._async_flights[key]
+                if value is not None and generation == self._generation:
+                    self._set_locked(key, value, ttl)
+        flight.set_result(value)
+        return value
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+            self._flights.pop(key, None)
+            self._async_flights.pop(key, None)
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._flights.clear()
+            self._async_flights.clear()
+            self._generation += 1
+            self.invalidations += 1
+
+    def record(self, hit: bool) -> None:
+        """Counts a lookup served outside get_or_load (e.g. batch reads)."""
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "loads": self.loads,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
@@ -0,0 +1,154 @@
+import json
+import os
+import sqlite3
+import tempfile
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import closing
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, List
+
+from app.utils.database import supabase
+
+# Versioned table -> (primary key, "current version" flag, create function, activate function).
+# The functions are defined in database-table.md; each one takes a per-recording lock, then
+# either allocates MAX(version_no) + 1 and inserts (clearing the flag on the old versions unless
+# the new one starts inactive), or moves the flag to an existing version, in one transaction.
+VERSIONED_TABLES = {
+    "transcripts": ("transcript_id", "is_active", "create_transcript_version", "activate_transcript_version"),
+    "summaries": ("summary_id", "is_latest", "create_summary_version", "activate_summary_version"),
+}
+
+
+class VersionStore(ABC):
+    """Creates the next version of a transcript or summary atomically."""
+
+    @abstractmethod
+    def create_version(self, table: str, recording_id: str, row: Dict[str, Any], activate: bool = True) -> Dict[str, Any]:
+        """
+        Inserts row as the next version of the recording's transcript/summary and returns it
+        with its primary key, version_no and flag set. With activate=False the current version
+        stays current until activate_version is called for the new one.
+        """
+        ...
+
+    @abstractmethod
+    def activate_version(self, table: str, recording_id: str, version_id: str) -> Optional[Dict[str, Any]]:
+        """Makes an existing version the current one; returns it, or None if it does not exist."""
+        ...
+
+
+class SupabaseVersionStore(VersionStore):
+    """One RPC per new version instead of select max + update flags + insert."""
+
+    def create_version(self, table: str, recording_id: str, row: Dict[str, Any], activate: bool = True) -> Dict[str, Any]:
+        _, _, function, _ = VERSIONED_TABLES[table]
+        response = supabase.rpc(function, {"p_recording_id": recording_id, "p_row": row, "p_activate": activate}).execute()
+        return self._row(response.data)
+
+    def activate_version(self, table: str, recording_id: str, version_id: str) -> Optional[Dict[str, Any]]:
+        _, _, _, function = VERSIONED_TABLES[table]
+        response = supabase.rpc(function, {"p_recording_id": recording_id, "p_id": version_id}).execute()
+        return self._row(response.data)
+
+    @staticmethod
+    def _row(data) -> Optional[Dict[str, Any]]:
+        if isinstance(data, list):
+            return data[0] if data else None
+        return data
+
+
+class SQLiteVersionStore(VersionStore):
+    """
+    Postgres-free stand-in with the same semantics, for tests and local runs: BEGIN IMMEDIATE
+    plays the part of the per-recording lock, and UNIQUE(recording_id, version_no) is enforced.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        if db_path is None:
+            # A file rather than :memory:, so every thread's connection sees the same database
+            fd, db_path = tempfile.mkstemp(prefix="versions-", suffix=".sqlite3")
+            os.close(fd)
+        self.db_path = db_path
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            for table, (key, flag, _, _) in VERSIONED_TABLES.items():
+                conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {table} ({key} TEXT PRIMARY KEY, recording_id TEXT NOT NULL, "
+                    f"version_no INTEGER NOT NULL, {flag} INTEGER NOT NULL, data TEXT NOT NULL, created_at TEXT NOT NULL, "
+                    f"UNIQUE(recording_id, version_no))"
+                )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def create_version(self, table: str, recording_id: str, row: Dict[str, Any], activate: bool = True) -> Dict[str, Any]:
+        key, flag, _, _ = VERSIONED_TABLES[table]
+        new_row = {**row, key: str(uuid.uuid4()), "recording_id": recording_id, flag: activate,
+                   "created_at": datetime.now(timezone.utc).isoformat()}
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                current = conn.execute(f"SELECT MAX(version_no) FROM {table} WHERE recording_id = ?", (recording_id,)).fetchone()[0]
+                new_row["version_no"] = (current or 0) + 1
+                if activate:
+                    conn.execute(f"UPDATE {table} SET {flag} = 0 WHERE recording_id = ? AND {flag} = 1", (recording_id,))
+                conn.execute(
+                    f"INSERT INTO {table} ({key}, recording_id, version_no, {flag}, data, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    (new_row[key], recording_id, new_row["version_no"], int(activate), json.dumps(row, default=str), new_row["created_at"])
+                )
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        return new_row
+
+    def activate_version(self, table: str, recording_id: str, version_id: str) -> Optional[Dict[str, Any]]:
+        key, flag, _, _ = VERSIONED_TABLES[table]
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if not conn.execute(f"SELECT 1 FROM {table} WHERE recording_id = ? AND {key} = ?", (recording_id, version_id)).fetchone():
+                    conn.execute("ROLLBACK")
+                    return None
+                conn.execute(f"UPDATE {table} SET {flag} = ({key} = ?) WHERE recording_id = ?", (version_id, recording_id))
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        return next(v for v in self.list_versions(table, recording_id) if v[key] == version_id)
+
+    def list_versions(self, table: str, recording_id: str) -> List[Dict[str, Any]]:
+        key, flag, _, _ = VERSIONED_TABLES[table]
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                f"SELECT * FROM {table} WHERE recording_id = ? ORDER BY version_no", (recording_id,)
+            ).fetchall()
+        return [{**json.loads(r["data"]), key: r[key], "recording_id": r["recording_id"],
+                 "version_no": r["version_no"], flag: bool(r[flag]), "created_at": r["created_at"]} for r in rows]
+
+
+_store: Optional[VersionStore] = None
+
+
+def get_store() -> VersionStore:
+    global _store
+    if _store is None:
+        _store = SupabaseVersionStore()
+    return _store
+
+
+def set_store(store: Optional[VersionStore]) -> None:
+    """Swap the store (e.g. a SQLiteVersionStore in tests)."""
+    global _store
+    _store = store
+
+
+def create_version(table: str, recording_id: str, row: Dict[str, Any], activate: bool = True) -> Dict[str, Any]:
+    return get_store().create_version(table, recording_id, row, activate)
+
+
+def activate_version(table: str, recording_id: str, version_id: str) -> Optional[Dict[str, Any]]:
+    return get_store().activate_version(table, recording_id, version_id)
@@ -0,0 +1,156 @@
+"""
+Background worker process for the job queue.
+
+Run next to the API:
+    python -m app.worker
+"""
+import os
+import signal
+import socket
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any, NamedTuple, Optional
+
+from app.utils import job_queue
+
+POLL_INTERVAL = float(os.getenv("WORKER_POLL_INTERVAL", "1"))
+
+# Max jobs of each type running at once across all worker processes
+CONCURRENCY = {
+    job_queue.JOB_TRANSCRIBE: int(os.getenv("JOB_CONCURRENCY_TRANSCRIBE", "2")),
+    job_queue.JOB_SUMMARIZE: int(os.getenv("JOB_CONCURRENCY_SUMMARIZE", "4")),
+    job_queue.JOB_EXPORT: int(os.getenv("JOB_CONCURRENCY_EXPORT", "4")),
+}
+
+
+class JobHandler(NamedTuple):
+    run: Callable[[Dict[str, Any]], Any]
+    on_retry: Optional[Callable[[Dict[str, Any]], None]] = None
+    on_dead: Optional[Callable[[Dict[str, Any]], None]] = None
+
+
+def _transcribe(payload: Dict[str, Any]) -> None:
+    from app.services.recording_service import RecordingService
+    RecordingService.transcribe_recording(payload["recording_id"], payload.get("transcript_id"))
+
+
+def _transcribe_dead(payload: Dict[str, Any]) -> None:
+    # Streaming transcriptions already have a PROCESSING transcript row to close
+    if payload.get("transcript_id"):
+        from app.services.recording_service import RecordingService
+        RecordingService.mark_transcript_failed(payload["transcript_id"])
+
+
+def _summarize(payload: Dict[str, Any]) -> None:
+    from app.services.summary_service import SummaryService
+    SummaryService.generate_summary(payload["recording_id"], payload.get("summary_style") or "MEETING")
+
+
+def _export(payload: Dict[str, Any]) -> None:
+    from app.services.export_job_service import ExportJobService
+    ExportJobService.run_export_job(payload["export_id"], payload.get("options"))
+
+
+def _export_retry(payload: Dict[str, Any]) -> None:
+    from app.services.export_job_service import ExportJobService
+    ExportJobService.mark_export_pending(payload["export_id"])
+
+
+def _export_dead(payload: Dict[str, Any]) -> None:
+    from app.services.export_job_service import ExportJobService
+    ExportJobService.mark_export_failed(payload["export_id"])
+
+
+HANDLERS: Dict[str, JobHandler] = {
+    job_queue.JOB_TRANSCRIBE: JobHandler(run=_transcribe, on_dead=_transcribe_dead),
+    job_queue.JOB_SUMMARIZE: JobHandler(run=_summarize),
+    job_queue.JOB_EXPORT: JobHandler(run=_export, on_retry=_export_retry, on_dead=_export_dead),
+}
+
+
+class Worker:
+    def __init__(
+        self,
+        queue: Optional[job_queue.JobQueue] = None,
+        handlers: Optional[Dict[str, JobHandler]] = None,
+        concurrency: Optional[Dict[str, int]] = None,
+        visibility_timeout: float = job_queue.DEFAULT_VISIBILITY_TIMEOUT
+    ):
+        self.queue = queue or job_queue.get_queue()
+        self.handlers = handlers or HANDLERS
+        self.concurrency = concurrency or CONCURRENCY
+        self.visibility_timeout = visibility_timeout
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.max_threads = max(1, sum(self.concurrency.values()))
+        self._slots = threading.Semaphore(self.max_threads)
+        self._stop = threading.Event()
+
+    def stop(self, *_args) -> None:
+        self._stop.set()
+
+    def _heartbeat(self, job_id: int, done: threading.Event) -> None:
+        # Renew the lease well before it expires; a crashed worker stops renewing
+        while not done.wait(self.visibility_timeout / 3):
+            if not self.queue.heartbeat(job_id, self.worker_id, self.visibility_timeout):
+                return
+
+    def _callback(self, hook: Optional[Callable], payload: Dict[str, Any]) -> None:
+        if hook:
+            try:
+                hook(payload)
+            except Exception as e:
+                print(f"Job hook failed: {e}")
+
+    def run_job(self, job: Dict[str, Any]) -> None:
+        handler = self.handlers[job["job_type"]]
+        if job["attempts"] > job["max_attempts"]:
+            # Lease expired on the final attempt (worker crash or hang)
+            self.queue.fail(job["job_id"], self.worker_id, "visibility timeout expired")
+            self._callback(handler.on_dead, job["payload"])
+            return
+
+        done = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(job["job_id"], done), daemon=True)
+        heartbeat.start()
+        try:
+            handler.run(job["payload"])
+            self.queue.complete(job["job_id"], self.worker_id)
+        except Exception as e:
+            traceback.print_exc()
+            status = self.queue.fail(job["job_id"], self.worker_id, f"{type(e).__name__}: {e}")
+            print(f"Job {job['job_id']} ({job['job_type']}) attempt {job['attempts']} failed -> {status}")
+            self._callback(handler.on_dead if status == job_queue.STATUS_FAILED else handler.on_retry, job["payload"])
+        finally:
+            done.set()
+
+    def _run_and_release(self, job: Dict[str, Any]) -> None:
+        try:
+            self.run_job(job)
+        finally:
+            self._slots.release()
+
+    def run_forever(self) -> None:
+        print(f"Worker {self.worker_id} started (concurrency: {self.concurrency})")
+        with ThreadPoolExecutor(max_workers=self.max_threads) as pool:
+            while not self._stop.is_set():
+                if not self._slots.acquire(timeout=POLL_INTERVAL):
+                    continue
+                job = self.queue.claim(self.worker_id, self.concurrency, self.visibility_timeout)
+                if not job:
+                    self._slots.release()
+                    self._stop.wait(POLL_INTERVAL)
+                    continue
+                pool.submit(self._run_and_release, job)
+        print(f"Worker {self.worker_id} stopped")
+
+
+def main() -> None:
+    worker = Worker()
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    worker.run_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Compares get_current_user with AUTH_MODE=remote (supabase.auth.get_user per request) against
+AUTH_MODE=local (in-process JWT verification with cached JWKS).
+
+Runs against benchmarks/stub_server.py with an artificial per-request latency:
+    python benchmarks/bench_auth.py --latency-ms 20 --requests 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+import uuid
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import ec
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stub_server import StubSupabase
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    user_id = str(uuid.uuid4())
+    private_key = ec.generate_private_key(ec.SECP256R1())
+    public_jwk = json.loads(jwt.algorithms.ECAlgorithm.to_jwk(private_key.public_key()))
+    public_jwk.update({"kid": "bench", "alg": "ES256", "use": "sig"})
+    token = jwt.encode(
+        {"sub": user_id, "aud": "authenticated", "exp": int(time.time()) + 3600, "email": "bench@example.com"},
+        private_key, algorithm="ES256", headers={"kid": "bench"}
+    )
+
+    with StubSupabase(latency=args.latency_ms / 1000) as stub:
+        stub.jwks = {"keys": [public_jwk]}
+        stub.auth_user = {"id": user_id, "aud": "authenticated", "email": "bench@example.com",
+                          "app_metadata": {}, "user_metadata": {}, "created_at": "2024-01-01T00:00:00Z"}
+        stub.tables["users"] = [{"user_id": user_id, "email": "bench@example.com", "full_name": "Bench",
+                                 "tier_id": 1, "role": "USER", "is_active": True, "storage_used_mb": 0.0,
+                                 "email_verified": True}]
+
+        os.environ["SUPABASE_URL"] = stub.url
+        os.environ.setdefault("SUPABASE_ANON_KEY", "bench-anon-key")
+        os.environ.setdefault("GEMINI_API_KEY", "bench-gemini-key")
+
+        from fastapi.security import HTTPAuthorizationCredentials
+        from app import auth
+        from app.utils import jwt_verifier
+
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+        jwt_verifier.set_jwks_cache(jwt_verifier.JWKSCache(url=f"{stub.url}/auth/v1/.well-known/jwks.json"))
+
+        async def run():
+            for mode in ("remote", "local"):
+                jwt_verifier.AUTH_MODE = mode
+                await auth.get_current_user_async(credentials)  # warm up connections and the JWKS cache
+                stub.reset_counts()
+
+                timings = []
+                for _ in range(args.requests):
+                    start = time.perf_counter()
+                    user = await auth.get_current_user_async(credentials)
+                    timings.append((time.perf_counter() - start) * 1000)
+                assert user.user_id == user_id
+
+                timings.sort()
+                print(
+                    f"{mode:>6}: p50 {statistics.median(timings):7.2f} ms  "
+                    f"p95 {timings[int(len(timings) * 0.95) - 1]:7.2f} ms  "
+                    f"auth calls/request {stub.request_count('/auth/v1/user') / args.requests:.2f}  "
+                    f"total round trips/request {stub.request_count() / args.requests:.2f}"
+                )
+
+        print(f"latency per round trip: {args.latency_ms:.0f} ms, {args.requests} requests")
+        asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
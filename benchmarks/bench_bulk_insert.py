@@ -0,0 +1,62 @@
+"""
+Inserting transcript segments: one request with every row (what transcribe_recording used to do)
+versus app/utils/bulk_writer.upsert_rows with 1 and with N parallel batches, against the
+Supabase stub with a per-request latency and an emulated request body limit.
+
+    python benchmarks/bench_bulk_insert.py --sizes 1000 10000 50000 --latency-ms 20 --max-body-mb 6
+"""
+import argparse
+import time
+import uuid
+
+from harness import StubSupabase, start_app
+
+
+def _segments(transcript_id: str, count: int):
+    return [{
+        "transcript_id": transcript_id, "sequence": i + 1, "start_time": i * 5.0, "end_time": i * 5.0 + 4.5,
+        "speaker_label": f"SPEAKER_{i % 3 + 1:02d}", "confidence": 1.0,
+        "content": f"Đây là câu số {i} trong cuộc họp, nói về kế hoạch quý tới và ngân sách của dự án.",
+    } for i in range(count)]
+
+
+def _timed(stub: StubSupabase, write) -> str:
+    stub.reset_counts()
+    start = time.perf_counter()
+    try:
+        rows = write()
+    except Exception as e:
+        return f"{'failed':>9} {stub.request_count('/rest'):>5}  ({type(e).__name__}: {str(e)[:40]})"
+    elapsed = time.perf_counter() - start
+    return f"{elapsed:>8.2f}s {stub.request_count('/rest'):>5}  {len(rows) / elapsed:>9,.0f} rows/s"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="*", default=[1000, 10000, 50000])
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--max-body-mb", type=float, default=6)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    with StubSupabase(latency=args.latency_ms / 1000) as stub:
+        stub.max_body_bytes = int(args.max_body_mb * 1024 * 1024)
+        start_app(stub)
+        from app.utils import bulk_writer
+        from app.utils.database import supabase
+
+        print(f"{'segments':>8}  {'mode':<22} {'time':>9} {'calls':>5}  throughput")
+        for size in args.sizes:
+            modes = [
+                ("single insert", lambda rows: supabase.table("transcript_segments").insert(rows).execute().data),
+                ("batched, 1 worker", lambda rows: bulk_writer.upsert_rows("transcript_segments", rows, "transcript_id,sequence", workers=1)),
+                (f"batched, {args.workers} workers", lambda rows: bulk_writer.upsert_rows("transcript_segments", rows, "transcript_id,sequence", workers=args.workers)),
+            ]
+            for name, write in modes:
+                rows = _segments(str(uuid.uuid4()), size)
+                print(f"{size:>8}  {name:<22} {_timed(stub, lambda: write(rows))}")
+            stub.tables["transcript_segments"] = []
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Memory and CPU of a whole transcript held as rows (list of dicts, TranscriptDetail models)
+versus CompactTranscript, for the paths that walk every segment: building the summary input
+and handing segments to an export renderer. Runs in-process on pre-built response bodies, no
+database: the TranscriptDetail path parses one response with every segment (as
+get_transcript_by_id does), the others parse 1000-row pages (as iter_segments does).
+Time is measured in a separate run without tracemalloc, which slows allocation-heavy code.
+
+    python benchmarks/bench_compact_transcript.py --segments 1000 10000 50000
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_ANON_KEY", "bench-anon-key")
+os.environ.setdefault("GEMINI_API_KEY", "bench-gemini-key")
+
+from app import schemas  # noqa: E402
+from app.utils.compact_transcript import CompactTranscript  # noqa: E402
+from app.utils.transcript_utils import clean_transcript_for_summary  # noqa: E402
+
+
+def _rows(count: int):
+    return [{
+        "segment_id": i + 1, "transcript_id": "00000000-0000-0000-0000-0000000000aa", "sequence": i + 1,
+        "start_time": i * 5.0, "end_time": i * 5.0 + 4.5, "speaker_label": f"SPEAKER_{i % 4 + 1:02d}",
+        "content": f"Đây là câu số {i} trong cuộc họp, nói về kế hoạch quý tới và ngân sách của dự án.",
+        "confidence": 0.9, "is_user_edited": False
+    } for i in range(count)]
+
+
+def _measure(build):
+    """(seconds, MB still held by the result, peak MB while building)"""
+    gc.collect()
+    start = time.perf_counter()
+    build()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return elapsed, held / 1e6, peak / 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--segments", type=int, nargs="*", default=[1000, 10000, 50000])
+    args = parser.parse_args()
+    work_dir = tempfile.mkdtemp(prefix="bench-compact-")
+
+    print(f"{'segments':>8}  {'path':<34} {'seconds':>8} {'held MB':>8} {'peak MB':>8}")
+    for count in args.segments:
+        rows = _rows(count)
+        # What PostgREST returns: everything at once, or page by page
+        body = json.dumps(rows, ensure_ascii=False).encode("utf-8")
+        page_bodies = [json.dumps(rows[i:i + 1000], ensure_ascii=False).encode("utf-8") for i in range(0, count, 1000)]
+        del rows
+
+        def pages():
+            for page in page_bodies:
+                yield from json.loads(page)
+
+        def detail():
+            rows = json.loads(body)
+            return schemas.TranscriptDetail(recording_id="r", version_no=1, type="AI_ORIGINAL",
+                                            transcript_id="t", segments=rows)
+
+        def compact():
+            return CompactTranscript.from_rows(pages())
+
+        def summary_dicts():
+            rows = json.loads(body)
+            return clean_transcript_for_summary(schemas.TranscriptDetail(
+                recording_id="r", version_no=1, type="AI_ORIGINAL", transcript_id="t", segments=rows).segments)
+
+        def summary_compact():
+            return clean_transcript_for_summary(CompactTranscript.from_rows(pages()))
+
+        jsonl_path = os.path.join(work_dir, "segments.jsonl")
+        compact_path = os.path.join(work_dir, "segments.bin")
+
+        def export_jsonl():
+            # The previous render payload: write JSONL, then the renderer parses each line back
+            with open(jsonl_path, "w", encoding="utf-8") as f:
+                for row in pages():
+                    f.write(json.dumps(row, ensure_ascii=False) + "\n")
+            with open(jsonl_path, encoding="utf-8") as f:
+                return sum(len(json.loads(line)["content"]) for line in f)
+
+        def export_compact():
+            CompactTranscript.from_rows(pages()).dump(compact_path)
+            return sum(len(row["content"]) for row in CompactTranscript.load(compact_path))
+
+        for name, build in [
+            ("hold: TranscriptDetail", detail),
+            ("hold: CompactTranscript", compact),
+            ("summary input: TranscriptDetail", summary_dicts),
+            ("summary input: CompactTranscript", summary_compact),
+            ("export payload: JSONL", export_jsonl),
+            ("export payload: CompactTranscript", export_compact),
+        ]:
+            elapsed, held, peak = _measure(build)
+            print(f"{count:>8}  {name:<34} {elapsed:>8.3f} {held:>8.1f} {peak:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
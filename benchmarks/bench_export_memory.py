@@ -0,0 +1,57 @@
+"""
+Peak Python memory (tracemalloc) of transcript exports for synthetic transcripts of different lengths.
+The stub runs in a child process so its tables and stored uploads are not counted.
+
+    python benchmarks/bench_export_memory.py --segments 1000 10000
+"""
+import argparse
+import multiprocessing
+import os
+import time
+import tracemalloc
+
+from harness import StubSupabase, seed_recording
+
+
+def _serve(segment_counts, conn) -> None:
+    with StubSupabase() as stub:
+        recordings = {n: seed_recording(stub, segments=n)["recording_id"] for n in segment_counts}
+        conn.send((stub.url, recordings))
+        conn.recv()  # parent is done
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--segments", type=int, nargs="*", default=[1000, 10000])
+    parser.add_argument("--types", nargs="*", default=["TRANSCRIPT_PDF", "TRANSCRIPT_DOCX", "TRANSCRIPT_SRT", "TRANSCRIPT_VTT", "TRANSCRIPT_JSONL"])
+    args = parser.parse_args()
+
+    parent, child = multiprocessing.Pipe()
+    server = multiprocessing.Process(target=_serve, args=(args.segments, child), daemon=True)
+    server.start()
+    url, recordings = parent.recv()
+
+    os.environ["SUPABASE_URL"] = url
+    os.environ.setdefault("SUPABASE_ANON_KEY", "bench-anon-key")
+    os.environ.setdefault("GEMINI_API_KEY", "bench-gemini-key")
+    from app.utils.export_processor import ExportProcessor
+
+    print(f"{'export':<16} {'segments':>8} {'peak MB':>8} {'seconds':>8}")
+    try:
+        for segments, recording_id in recordings.items():
+            for export_type in args.types:
+                job = {"export_id": f"bench-{segments}", "recording_id": recording_id, "export_type": export_type}
+                tracemalloc.start()
+                start = time.perf_counter()
+                ExportProcessor(job).process()
+                elapsed = time.perf_counter() - start
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                print(f"{export_type:<16} {segments:>8} {peak / 2 ** 20:>8.1f} {elapsed:>8.2f}")
+    finally:
+        parent.send("done")
+        server.join(timeout=5)
+
+
+if __name__ == "__main__":
+    main()
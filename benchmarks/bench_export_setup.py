@@ -0,0 +1,99 @@
+"""
+Per-export setup overhead: building the PDF paragraph styles and the DOCX document skeleton,
+the way every export used to do it ("before") versus the precompiled style sets and cached
+DOCX template in app/utils/export_templates.py ("after"). No segments are rendered.
+
+    python benchmarks/bench_export_setup.py --iterations 200
+"""
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+
+from app.utils import export_templates
+from app.utils.export_templates import docx_heading, docx_paragraph
+
+
+def _pdf_styles_before():
+    styles = getSampleStyleSheet()
+    return (
+        ParagraphStyle('CustomTitle', parent=styles['Heading1'], fontSize=24, textColor='#1a1a1a',
+                       spaceAfter=30, alignment=TA_CENTER),
+        ParagraphStyle('CustomHeading', parent=styles['Heading2'], fontSize=14, textColor='#333333',
+                       spaceAfter=12),
+        ParagraphStyle('CustomNormal', parent=styles['Normal'], fontSize=11, leading=16, spaceAfter=10),
+    )
+
+
+def _pdf_styles_after():
+    return export_templates.get_pdf_styles()
+
+
+def _docx_before(local_path: str) -> None:
+    # Blank Document(), headings via python-docx, saved and re-zipped around the segment stream
+    doc = Document()
+    title = doc.add_heading("Transcript: Bench", 0)
+    title.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    doc.add_paragraph("Created: 2024-01-01T00:00:00+00:00")
+    doc.add_paragraph("Duration: 60.00 seconds")
+    doc.add_paragraph("Version: 1")
+    doc.add_paragraph()
+    doc.add_heading("Transcript Content", level=1)
+    doc.add_paragraph("__TRANSCRIPT_SEGMENTS__")
+    skeleton = io.BytesIO()
+    doc.save(skeleton)
+    with zipfile.ZipFile(skeleton) as template, zipfile.ZipFile(local_path, 'w', zipfile.ZIP_DEFLATED) as out:
+        for item in template.infolist():
+            out.writestr(item, template.read(item.filename))
+
+
+def _docx_after(local_path: str) -> None:
+    export_templates.get_docx_template().write(local_path, [
+        docx_heading("Transcript: Bench", 0),
+        docx_paragraph("Created: 2024-01-01T00:00:00+00:00"),
+        docx_paragraph("Duration: 60.00 seconds"),
+        docx_paragraph("Version: 1"),
+        docx_paragraph(),
+        docx_heading("Transcript Content", 1),
+    ])
+
+
+def _per_call_ms(func, iterations: int, *args) -> float:
+    func(*args)  # first call pays for imports and, for "after", builds the caches
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func(*args)
+    return (time.perf_counter() - start) * 1000 / iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench-setup-") as work_dir:
+        path = os.path.join(work_dir, "transcript.docx")
+        rows = [
+            ("pdf styles", _per_call_ms(_pdf_styles_before, args.iterations),
+             _per_call_ms(_pdf_styles_after, args.iterations)),
+            ("docx skeleton", _per_call_ms(_docx_before, args.iterations, path),
+             _per_call_ms(_docx_after, args.iterations, path)),
+        ]
+
+    print(f"{'setup':<14} {'before ms':>10} {'after ms':>10} {'speedup':>8}")
+    for name, before, after in rows:
+        print(f"{name:<14} {before:>10.3f} {after:>10.3f} {before / after:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
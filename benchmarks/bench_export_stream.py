@@ -0,0 +1,74 @@
+"""
+Time until the client has an export: the job flow (create job, render + upload, poll the job
+for its signed URL, download from storage) versus GET /recordings/{id}/export/stream, served by
+uvicorn (harness.serve) so the stream's first byte can be timed.
+The job is run inline right after it is created, so the job numbers exclude worker pickup delay.
+SRT/VTT/JSONL are sent while segments are read; PDF/DOCX/ZIP are rendered whole before the
+first byte, so for them first byte and complete are close.
+
+    python benchmarks/bench_export_stream.py --segments 5000 --runs 3 --latency-ms 20
+"""
+import argparse
+import statistics
+import time
+
+import httpx
+
+from harness import StubSupabase, seed_recording, serve, start_app
+
+
+def _job_flow(client, recording_id: str, export_type: str) -> float:
+    from app.services.export_job_service import ExportJobService
+    from app.utils.database import supabase
+
+    start = time.perf_counter()
+    job = client.post(f"/recordings/{recording_id}/export", json={"export_type": export_type}).json()
+    ExportJobService.run_export_job(job["export_id"])
+    detail = client.get(f"/recordings/export-jobs/{job['export_id']}").json()
+    assert detail["status"] == "DONE" and detail["download_url"], detail
+    supabase.storage.from_("exports").download(detail["file_path"])
+    return time.perf_counter() - start
+
+
+def _stream_flow(base_url: str, recording_id: str, export_type: str):
+    """(seconds to the first body byte, seconds to the last)"""
+    start = time.perf_counter()
+    first = None
+    with httpx.stream("GET", f"{base_url}/recordings/{recording_id}/export/stream",
+                      params={"export_type": export_type}, timeout=120) as response:
+        assert response.status_code == 200, response.read()
+        for _ in response.iter_raw():
+            first = first or time.perf_counter() - start
+    return first, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--segments", type=int, default=5000)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--types", nargs="*", default=["TRANSCRIPT_SRT", "TRANSCRIPT_JSONL", "TRANSCRIPT_PDF", "TRANSCRIPT_DOCX"])
+    args = parser.parse_args()
+
+    with StubSupabase(latency=args.latency_ms / 1000) as stub:
+        client = start_app(stub)
+        from app.main import app
+        server, base_url = serve(app)
+        print(f"{args.segments} segments, {args.latency_ms:.0f} ms per Supabase round trip")
+        print(f"{'export':<17} {'job flow s':>10} {'stream first byte s':>20} {'stream complete s':>18}")
+        try:
+            for export_type in args.types:
+                # Fresh recordings per run, so no run reuses another run's cached artifact
+                job_times = [_job_flow(client, seed_recording(stub, segments=args.segments)["recording_id"], export_type)
+                             for _ in range(args.runs)]
+                stream_times = [_stream_flow(base_url, seed_recording(stub, segments=args.segments)["recording_id"], export_type)
+                                for _ in range(args.runs)]
+                print(f"{export_type:<17} {statistics.median(job_times):>10.3f} "
+                      f"{statistics.median(t[0] for t in stream_times):>20.3f} "
+                      f"{statistics.median(t[1] for t in stream_times):>18.3f}")
+        finally:
+            server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
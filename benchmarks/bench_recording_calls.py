@@ -0,0 +1,46 @@
+"""
+Counts remote Supabase calls (PostgREST + Storage) made by recording-scoped endpoints.
+Authentication is overridden so only the endpoint's own work is counted.
+
+    python benchmarks/bench_recording_calls.py
+"""
+from harness import USER_ID, StubSupabase, seed_recording, start_app
+
+
+def main() -> None:
+    with StubSupabase() as stub:
+        client = start_app(stub)
+        ids = seed_recording(stub)
+        rid = ids["recording_id"]
+        stub.tables["export_jobs"] = [{
+            "export_id": f"export-{i}", "user_id": USER_ID, "recording_id": rid, "export_type": "TRANSCRIPT_PDF",
+            "status": "DONE", "file_path": f"{USER_ID}/{rid}/export-{i}.pdf", "created_at": f"2024-01-0{i + 1}T00:00:00+00:00"
+        } for i in range(5)]
+
+        endpoints = [
+            ("GET    /recordings/{id}", "GET", f"/recordings/{rid}", None),
+            ("GET    /recordings/{id}?include_audio_url", "GET", f"/recordings/{rid}?include_audio_url=true", None),
+            ("GET    /recordings/{id}?include_audio_url (again)", "GET", f"/recordings/{rid}?include_audio_url=true", None),
+            ("GET    /recordings/{id}/exports (5 done)", "GET", f"/recordings/{rid}/exports", None),
+            ("GET    /recordings/{id}/exports (again)", "GET", f"/recordings/{rid}/exports", None),
+            ("GET    /recordings/export-jobs/{id}", "GET", "/recordings/export-jobs/export-0", None),
+            ("POST   /recordings/{id}/markers", "POST", f"/recordings/{rid}/markers",
+             {"recording_id": rid, "time_seconds": 120, "label": "Decision"}),
+            ("GET    /recordings/{id}/markers", "GET", f"/recordings/{rid}/markers", None),
+            ("GET    /recordings/{id}/tags", "GET", f"/recordings/{rid}/tags", None),
+            ("GET    /recordings/{id}/transcripts", "GET", f"/recordings/{rid}/transcripts", None),
+            ("GET    /recordings/{id}/summaries", "GET", f"/recordings/{rid}/summaries", None),
+            ("GET    /summaries/{id}", "GET", f"/summaries/{ids['summary_id']}", None),
+            ("POST   /recordings/{id}/transcribe", "POST", f"/recordings/{rid}/transcribe", None),
+        ]
+
+        print(f"{'endpoint':<54} {'status':>6} {'remote calls':>13}")
+        for name, method, path, body in endpoints:
+            stub.reset_counts()
+            response = client.request(method, path, json=body)
+            calls = stub.request_count("/rest/") + stub.request_count("/storage/")
+            print(f"{name:<54} {response.status_code:>6} {calls:>13}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Export rendering throughput (exports/minute) of the render pool at different worker counts.
+Workers render from a serialized payload, so no Supabase (or stub) is involved; 0 workers is
+the in-process thread pool for comparison. Scaling is bounded by the number of CPU cores.
+
+    python benchmarks/bench_render_pool.py --workers 0 1 2 4 8 --exports 32 --segments 500
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils import render_pool
+
+
+def _payload(work_dir: str, segments: int) -> dict:
+    segments_path = os.path.join(work_dir, "segments.jsonl")
+    with open(segments_path, "w", encoding="utf-8") as f:
+        for i in range(segments):
+            f.write(json.dumps({"sequence": i, "start_time": i * 5.0, "end_time": i * 5.0 + 4.0,
+                                "speaker_label": f"SPEAKER_0{i % 3}",
+                                "content": f"Câu số {i}: nội dung cuộc họp được ghi lại và chép lời."}, ensure_ascii=False))
+            f.write("\n")
+    return {
+        "recording": {"recording_id": "bench", "title": "Bench", "duration_seconds": segments * 5.0,
+                      "created_at": "2024-01-01T00:00:00+00:00"},
+        "transcript": {"transcript_id": "t1", "version_no": 1},
+        "summary": {"summary_id": "s1", "created_at": "2024-01-01T00:00:00+00:00", "summary_style": "MEETING",
+                    "content_structure": {"overview": "Overview", "key_points": ["a", "b"], "action_items": ["c"]}},
+        "segments_path": segments_path,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="*", default=[0, 1, 2, 4, 8])
+    parser.add_argument("--exports", type=int, default=32)
+    parser.add_argument("--segments", type=int, default=500)
+    parser.add_argument("--parts", nargs="*", default=["transcript.pdf", "transcript.docx"])
+    args = parser.parse_args()
+
+    print(f"cpus: {os.cpu_count()}")
+    print(f"{'workers':>7} {'exports':>7} {'seconds':>8} {'exports/min':>12}")
+    with tempfile.TemporaryDirectory(prefix="bench-render-") as work_dir:
+        payload = _payload(work_dir, args.segments)
+        for workers in args.workers:
+            render_pool.RENDER_WORKERS = workers
+            # Start and warm the workers before timing, like a long-running API process
+            for future in [render_pool.submit(payload, "summary.pdf", os.path.join(work_dir, f"warm-{i}.pdf"))
+                           for i in range(max(workers, 1))]:
+                future.result()
+
+            start = time.perf_counter()
+            futures = [
+                render_pool.submit(payload, part, os.path.join(work_dir, f"{i}-{part}"))
+                for i in range(args.exports) for part in args.parts
+            ]
+            for future in futures:
+                future.result()
+            elapsed = time.perf_counter() - start
+            render_pool.shutdown_render_pool()
+            print(f"{workers:>7} {args.exports:>7} {elapsed:>8.2f} {args.exports * 60 / elapsed:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Search over a synthetic Vietnamese corpus: indexing throughput of app/utils/search_index.py and
+query latency of the FTS5 index versus an ILIKE-style '%q%' scan of the same segments (what a
+content search would cost without an index). Everything runs locally; no Supabase needed.
+
+    python benchmarks/bench_search.py --recordings 200 --segments 500 --queries 200
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.search_index import SearchIndex, fold
+
+ONSETS = ["", "b", "c", "ch", "d", "đ", "g", "gi", "h", "k", "kh", "l", "m", "n", "ng", "nh", "ph", "qu", "r", "s", "t", "th", "tr", "v", "x"]
+RHYMES = ["a", "ai", "an", "anh", "ao", "ach", "e", "em", "en", "ên", "i", "im", "inh", "o", "oa", "oan", "ong", "ô", "ôi", "ơn",
+          "u", "uy", "ung", "ư", "ươi", "ương", "ươc", "âu", "ây", "iêt", "iên", "uôc"]
+TONES = ["", "\u0301", "\u0300", "\u0309", "\u0303", "\u0323"]
+
+
+def _vocabulary(rng: random.Random, size: int):
+    import unicodedata
+    words = set()
+    while len(words) < size:
+        words.add(unicodedata.normalize("NFC", rng.choice(ONSETS) + rng.choice(RHYMES)[0] + rng.choice(TONES)
+                                        + rng.choice(RHYMES)[1:]))
+    return sorted(words)
+
+
+def _corpus(rng: random.Random, vocabulary, recordings: int, segments: int, users: int):
+    # Zipf-like word frequencies, like real speech: a few syllables everywhere, most of them rare
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    for r in range(recordings):
+        user_id = f"user-{r % users}"
+        yield user_id, f"rec-{r}", [{
+            "segment_id": r * segments + i, "start_time": i * 5.0, "end_time": i * 5.0 + 4.5,
+            "content": " ".join(rng.choices(vocabulary, weights, k=rng.randint(8, 20))).capitalize() + ".",
+        } for i in range(segments)]
+
+
+def _percentile(samples, pct):
+    return sorted(samples)[min(len(samples) - 1, int(len(samples) * pct))] * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--recordings", type=int, default=200)
+    parser.add_argument("--segments", type=int, default=500)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--vocabulary", type=int, default=3000)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    vocabulary = _vocabulary(rng, args.vocabulary)
+
+    index = SearchIndex(":memory:")
+    scan = sqlite3.connect(":memory:")
+    scan.execute("CREATE TABLE segments (user_id TEXT, recording_id TEXT, segment_id INTEGER, content TEXT)")
+
+    start = time.perf_counter()
+    total = 0
+    for user_id, recording_id, segments in _corpus(rng, vocabulary, args.recordings, args.segments, args.users):
+        index.index_transcript(user_id, recording_id, f"t-{recording_id}", segments)
+        scan.executemany("INSERT INTO segments VALUES (?, ?, ?, ?)",
+                         [(user_id, recording_id, s["segment_id"], s["content"]) for s in segments])
+        total += len(segments)
+    elapsed = time.perf_counter() - start
+    print(f"indexed {total} segments in {elapsed:.2f}s ({total / elapsed:,.0f} segments/s, scan table included)")
+
+    fts_times, scan_times = [], []
+    for _ in range(args.queries):
+        # Two-word queries drawn from the common half of the vocabulary, typed with or without accents
+        words = rng.sample(vocabulary[:len(vocabulary) // 2], 2)
+        query = " ".join(words) if rng.random() < 0.5 else fold(" ".join(words))
+        user_id = f"user-{rng.randrange(args.users)}"
+        t0 = time.perf_counter()
+        index.search(user_id, query, limit=20)
+        fts_times.append(time.perf_counter() - t0)
+        t0 = time.perf_counter()
+        # Like ILIKE '%a%' AND ILIKE '%b%' (no accent folding, no ranking): every row of the user is read
+        scan.execute("SELECT recording_id, segment_id FROM segments WHERE user_id = ? AND content LIKE ? AND content LIKE ? LIMIT 20",
+                     (user_id, *[f"%{word}%" for word in query.split()])).fetchall()
+        scan_times.append(time.perf_counter() - t0)
+
+    print(f"{'query':<10} {'p50 ms':>8} {'p95 ms':>8}")
+    for name, samples in (("fts5", fts_times), ("like scan", scan_times)):
+        print(f"{name:<10} {statistics.median(samples) * 1000:>8.2f} {_percentile(samples, 0.95):>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Relabelling a speaker across N segments: one PATCH /transcripts/{id}/segments/{segment_id} per
+segment versus a single PATCH /transcripts/{id}/segments bulk edit, against the Supabase stub
+with a per-request latency.
+
+    python benchmarks/bench_segment_edit.py --latency-ms 20 --sizes 10 50 200 500
+"""
+import argparse
+import time
+
+from harness import StubSupabase, seed_recording, start_app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--sizes", type=int, nargs="*", default=[10, 50, 200, 500])
+    args = parser.parse_args()
+
+    with StubSupabase(latency=args.latency_ms / 1000) as stub:
+        client = start_app(stub)
+        print(f"{'segments':>8} {'per-segment s':>14} {'calls':>6} {'bulk s':>8} {'calls':>6}")
+        for size in args.sizes:
+            ids = seed_recording(stub, segments=size)
+            transcript_id = ids["transcript_id"]
+            segment_ids = [s["segment_id"] for s in stub.tables["transcript_segments"] if s["transcript_id"] == transcript_id]
+
+            stub.reset_counts()
+            start = time.perf_counter()
+            for segment_id in segment_ids:
+                response = client.patch(f"/transcripts/{transcript_id}/segments/{segment_id}", json={"speaker_label": "Lan"})
+                assert response.status_code == 200, response.text
+            single, single_calls = time.perf_counter() - start, stub.request_count("/rest")
+
+            stub.reset_counts()
+            start = time.perf_counter()
+            response = client.patch(f"/transcripts/{transcript_id}/segments",
+                                    json={"relabel": {"from_label": "Lan", "to_label": "Minh"}})
+            assert response.status_code == 200 and len(response.json()) == size, response.text
+            bulk, bulk_calls = time.perf_counter() - start, stub.request_count("/rest")
+
+            print(f"{size:>8} {single:>14.2f} {single_calls:>6} {bulk:>8.2f} {bulk_calls:>6}")
+
+
+if __name__ == "__main__":
+    main()
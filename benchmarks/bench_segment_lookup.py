@@ -0,0 +1,75 @@
+"""
+"What is playing at t" and "what lies between two times": loading every segment and scanning
+it client-side (GET /transcripts/{id}/segments) versus the server-side time index
+(GET /transcripts/{id}/segments/at and /segments/window), against the Supabase stub.
+
+    python benchmarks/bench_segment_lookup.py --segments 10000 --queries 50 --latency-ms 20
+"""
+import argparse
+import random
+import statistics
+import time
+
+from harness import StubSupabase, seed_recording, start_app
+
+
+def _timed(run, queries):
+    times, sizes = [], []
+    for query in queries:
+        start = time.perf_counter()
+        size = run(query)
+        times.append((time.perf_counter() - start) * 1000)
+        sizes.append(size)
+    return statistics.median(times), max(times), statistics.mean(sizes)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--segments", type=int, default=10000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    args = parser.parse_args()
+
+    with StubSupabase(latency=args.latency_ms / 1000) as stub:
+        client = start_app(stub)
+        ids = seed_recording(stub, segments=args.segments)
+        transcript_id = ids["transcript_id"]
+        rnd = random.Random(1)
+        duration = args.segments * 5.0
+        times = [rnd.uniform(0, duration) for _ in range(args.queries)]
+
+        def full_at(t):
+            response = client.get(f"/transcripts/{transcript_id}/segments")
+            next((s for s in response.json() if s["start_time"] <= t <= s["end_time"]), None)
+            return len(response.content)
+
+        def full_window(t):
+            response = client.get(f"/transcripts/{transcript_id}/segments")
+            [s for s in response.json() if s["start_time"] <= t + 60 and s["end_time"] >= t]
+            return len(response.content)
+
+        def index_at(t):
+            return len(client.get(f"/transcripts/{transcript_id}/segments/at", params={"t": t}).content)
+
+        def index_window(t):
+            return len(client.get(f"/transcripts/{transcript_id}/segments/window", params={"start": t, "end": t + 60}).content)
+
+        start = time.perf_counter()
+        client.get(f"/transcripts/{transcript_id}/segments/at", params={"t": 0})
+        build_ms = (time.perf_counter() - start) * 1000
+
+        print(f"{args.segments} segments, {args.queries} queries, stub latency {args.latency_ms:.0f} ms; "
+              f"first index query (load + build) {build_ms:.0f} ms")
+        print(f"{'query':<26} {'p50 ms':>8} {'max ms':>8} {'bytes/response':>15}")
+        for name, run in [
+            ("full list + scan (at t)", full_at),
+            ("index /segments/at", index_at),
+            ("full list + scan (60 s)", full_window),
+            ("index /segments/window", index_window),
+        ]:
+            p50, worst, size = _timed(run, times)
+            print(f"{name:<26} {p50:>8.1f} {worst:>8.1f} {size:>15,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Time to first segment: transcribe_recording inserting every segment at the end versus the
+streaming mode (POST /recordings/{id}/transcribe?stream=true) followed over
+GET /recordings/{id}/transcribe/stream, against the Supabase stub. The transcription model is
+replaced by a fake that takes --window-seconds per audio window. The SSE feed is read from
+uvicorn in a thread (harness.serve).
+
+    python benchmarks/bench_streaming_transcription.py --minutes 60 --window-seconds 1 --workers 4
+"""
+import argparse
+import io
+import json
+import os
+import threading
+import time
+import wave
+
+import httpx
+
+from harness import StubSupabase, start_app, seed_recording, serve
+
+
+def _wav(seconds: float, rate: int = 1000) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(b"\x00\x00" * int(seconds * rate))
+    return buffer.getvalue()
+
+
+def _fake_transcribe(window_seconds: float, segments_per_window: int):
+    def transcribe(audio_bytes: bytes, file_extension: str) -> str:
+        with wave.open(io.BytesIO(audio_bytes), "rb") as w:
+            duration = w.getnframes() / w.getframerate()
+        time.sleep(window_seconds)
+        step = duration / segments_per_window
+        return json.dumps([{
+            "speaker_label": f"SPEAKER_{i % 2 + 1:02d}", "start_time": round(i * step, 2),
+            "end_time": round((i + 1) * step - 0.1, 2), "content": f"Câu số {i} của đoạn này."
+        } for i in range(segments_per_window)])
+    return transcribe
+
+
+def _first_new_segment(stub: StubSupabase, known: set, started: float, done: threading.Event) -> float:
+    while not done.is_set():
+        if any(s["transcript_id"] not in known for s in list(stub.tables.get("transcript_segments", []))):
+            return time.perf_counter() - started
+        time.sleep(0.01)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--minutes", type=float, default=60)
+    parser.add_argument("--window-seconds", type=float, default=1.0)
+    parser.add_argument("--segments-per-window", type=int, default=60)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=5)
+    args = parser.parse_args()
+    os.environ["TRANSCRIPT_STREAM_POLL_SECONDS"] = "0.05"
+
+    with StubSupabase(latency=args.latency_ms / 1000) as stub:
+        client = start_app(stub)
+        from app.services.recording_service import RecordingService
+        from app.utils import chunked_transcriber, transcription_cache
+
+        chunked_transcriber.MAX_WORKERS = args.workers
+        transcription_cache.transcribe = _fake_transcribe(args.window_seconds, args.segments_per_window)
+        duration = args.minutes * 60
+        windows = len(chunked_transcriber.plan_windows(duration))
+
+        ids = seed_recording(stub)
+        recording = next(r for r in stub.tables["recordings"] if r["recording_id"] == ids["recording_id"])
+        recording["file_path"] = recording["file_path"].rsplit(".", 1)[0] + ".wav"
+        recording["duration_seconds"] = duration
+        stub.objects["recordings/" + recording["file_path"]] = _wav(duration)
+        print(f"{args.minutes:.0f} min recording, {windows} windows of {chunked_transcriber.CHUNK_SECONDS:.0f}s, "
+              f"{args.workers} workers, {args.window_seconds}s per window")
+        print(f"{'mode':<12} {'first segment':>14} {'complete':>9}")
+
+        # Blocking: segments appear only once the whole file is transcribed
+        known = {t["transcript_id"] for t in stub.tables["transcripts"]}
+        done = threading.Event()
+        started = time.perf_counter()
+        worker = threading.Thread(target=lambda: (RecordingService.transcribe_recording(ids["recording_id"]), done.set()))
+        worker.start()
+        first = _first_new_segment(stub, known, started, done)
+        worker.join()
+        print(f"{'blocking':<12} {first:>13.2f}s {time.perf_counter() - started:>8.2f}s")
+
+        # Streaming: the API creates the transcript, the worker fills it, the client follows the SSE feed
+        from app.main import app
+        server, base_url = serve(app)
+        started = time.perf_counter()
+        response = client.post(f"/recordings/{ids['recording_id']}/transcribe", params={"stream": "true"})
+        transcript_id = response.json()["transcript_id"]
+        worker = threading.Thread(target=RecordingService.transcribe_recording, args=(ids["recording_id"], transcript_id))
+        worker.start()
+        first, received, event = None, 0, None
+        with httpx.stream("GET", f"{base_url}/recordings/{ids['recording_id']}/transcribe/stream", timeout=60) as stream:
+            for line in stream.iter_lines():
+                if line.startswith("event: "):
+                    event = line[len("event: "):]
+                elif line.startswith("data: ") and event == "segments":
+                    received += len(json.loads(line[len("data: "):]))
+                    first = first or time.perf_counter() - started
+                elif line.startswith("data: ") and event == "done":
+                    break
+        complete = time.perf_counter() - started
+        worker.join()
+        server.should_exit = True
+        print(f"{'streaming':<12} {first:>13.2f}s {complete:>8.2f}s  ({received} segments over SSE)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Shared setup for benchmarks that drive the FastAPI app against StubSupabase.
+
+The app modules create their Supabase client at import time, so start_app() must run
+before anything under app/ is imported.
+"""
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from typing import Any, Dict, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stub_server import StubSupabase
+
+USER_ID = "00000000-0000-0000-0000-000000000001"
+
+
+def start_app(stub: StubSupabase, user_id: str = USER_ID):
+    """Points the app at the stub and returns a TestClient authenticated as user_id."""
+    os.environ["SUPABASE_URL"] = stub.url
+    os.environ.setdefault("SUPABASE_ANON_KEY", "bench-anon-key")
+    os.environ.setdefault("GEMINI_API_KEY", "bench-gemini-key")
+    os.environ.setdefault("JOB_QUEUE_DB", os.path.join(tempfile.mkdtemp(), "jobs.sqlite3"))
+
+    from fastapi.testclient import TestClient
+    from app import schemas
+    from app.auth import get_current_user
+    from app.main import app
+
+    user = schemas.User(user_id=user_id, email="bench@example.com", tier_id=None, role=schemas.UserRole.USER)
+    app.dependency_overrides[get_current_user] = lambda: user
+    return TestClient(app)
+
+
+def serve(app) -> Tuple[Any, str]:
+    """
+    Runs app under uvicorn in a daemon thread and returns (server, base URL); set
+    server.should_exit to stop it. For measurements TestClient cannot make, such as time to
+    first byte: it only hands back a response once the body is complete.
+    """
+    import uvicorn
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, f"http://127.0.0.1:{port}"
+
+
+def seed_recording(stub: StubSupabase, user_id: str = USER_ID, segments: int = 0) -> Dict[str, Any]:
+    """Adds one processed recording with a transcript, a summary, a marker and a tag."""
+    recording_id = str(uuid.uuid4())
+    transcript_id = str(uuid.uuid4())
+    summary_id = str(uuid.uuid4())
+    stub.tables.setdefault("recordings", []).append({
+        "recording_id": recording_id, "user_id": user_id, "folder_id": None, "title": "Weekly sync",
+        "file_path": f"{user_id}/{recording_id}.mp3", "duration_seconds": 3600.0, "file_size_mb": 30.0,
+        "source_type": "RECORDED", "original_file_name": "sync.mp3", "status": "PROCESSED",
+        "is_pinned": False, "is_trashed": False, "auto_title": False,
+        "created_at": "2024-01-01T00:00:00+00:00", "deleted_at": None
+    })
+    stub.tables.setdefault("transcripts", []).append({
+        "transcript_id": transcript_id, "recording_id": recording_id, "version_no": 1, "type": "AI_ORIGINAL",
+        "language": "vi", "is_active": True, "created_at": "2024-01-01T00:00:00+00:00"
+    })
+    segment_table = stub.tables.setdefault("transcript_segments", [])
+    first_id = len(segment_table) + 1
+    segment_table.extend({
+        "segment_id": first_id + i, "transcript_id": transcript_id, "sequence": i,
+        "start_time": i * 5.0, "end_time": i * 5.0 + 4.5, "speaker_label": f"SPEAKER_{i % 3 + 1:02d}",
+        "content": f"Đây là câu số {i} trong cuộc họp, nói về kế hoạch quý tới.", "confidence": 0.9, "is_user_edited": False
+    } for i in range(segments))
+    stub.tables.setdefault("summaries", []).append({
+        "summary_id": summary_id, "recording_id": recording_id, "version_no": 1, "type": "AI_GENERATED",
+        "summary_style": "MEETING", "is_latest": True, "generated_by": "AI",
+        "content_structure": {"overview": "Overview", "key_points": ["a"], "action_items": ["b"]},
+        "created_at": "2024-01-01T00:00:00+00:00"
+    })
+    stub.tables.setdefault("markers", []).append({
+        "marker_id": str(uuid.uuid4()), "recording_id": recording_id, "time_seconds": 60.0,
+        "label": "Start", "type": "NORMAL", "created_at": "2024-01-01T00:00:00+00:00"
+    })
+    stub.tables.setdefault("recording_tags", []).append({"id": str(uuid.uuid4()), "recording_id": recording_id, "tag": "sync"})
+    return {"recording_id": recording_id, "transcript_id": transcript_id, "summary_id": summary_id}
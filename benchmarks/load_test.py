@@ -0,0 +1,157 @@
+"""
+Load test: runs the API under uvicorn (separate process) against StubSupabase and measures
+requests/sec and latency for a few endpoints at a given concurrency.
+
+    python benchmarks/load_test.py --concurrency 100 --duration 10 --latency-ms 20
+    python benchmarks/load_test.py --concurrency 100 --duration 10 --latency-ms 20 --async-endpoints
+
+Every stub request sleeps --latency-ms to stand in for the round trip to a hosted project,
+so the numbers show how many requests the app keeps in flight, not raw CPU speed.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+
+import httpx
+import jwt
+from cryptography.hazmat.primitives.asymmetric import ec
+
+from harness import USER_ID, StubSupabase, seed_recording
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _signing_key():
+    private_key = ec.generate_private_key(ec.SECP256R1())
+    public_jwk = json.loads(jwt.algorithms.ECAlgorithm.to_jwk(private_key.public_key()))
+    public_jwk.update({"kid": "load", "alg": "ES256", "use": "sig"})
+    token = jwt.encode(
+        {"sub": USER_ID, "aud": "authenticated", "exp": int(time.time()) + 3600, "email": "load@example.com"},
+        private_key, algorithm="ES256", headers={"kid": "load"}
+    )
+    return public_jwk, token
+
+
+async def _request(reader, writer, request: bytes) -> int:
+    # Minimal HTTP/1.1 keep-alive client; far cheaper per request than a full client library,
+    # which matters because the load generator shares the CPU with the server
+    writer.write(request)
+    await writer.drain()
+    status_line = await reader.readline()
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return int(status_line.split()[1])
+
+
+async def _hammer(port: int, path: str, token: str, concurrency: int, duration: float):
+    latencies, errors = [], 0
+    request = (f"GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nAuthorization: Bearer {token}\r\n\r\n").encode()
+    deadline = time.perf_counter() + duration
+
+    async def user():
+        nonlocal errors
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        try:
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                status = await _request(reader, writer, request)
+                if status == 200:
+                    latencies.append((time.perf_counter() - start) * 1000)
+                else:
+                    errors += 1
+        finally:
+            writer.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--paths", nargs="*", help="endpoints to test (default: hot endpoints)")
+    parser.add_argument("--async-endpoints", action="store_true", help="run the server with ASYNC_ENDPOINTS=true")
+    args = parser.parse_args()
+
+    public_jwk, token = _signing_key()
+    with StubSupabase(latency=args.latency_ms / 1000) as stub:
+        stub.jwks = {"keys": [public_jwk]}
+        stub.tables["users"] = [{"user_id": USER_ID, "email": "load@example.com", "tier_id": None, "role": "USER",
+                                 "is_active": True, "storage_used_mb": 0.0, "email_verified": True}]
+        ids = [seed_recording(stub) for _ in range(20)]
+        rid, tid = ids[0]["recording_id"], ids[0]["transcript_id"]
+        paths = args.paths or [
+            "/users/me",
+            "/recordings/?page_size=10",
+            f"/recordings/{rid}/transcripts",
+            f"/transcripts/{tid}",
+            f"/recordings/{rid}/tags",
+        ]
+
+        port = _free_port()
+        env = dict(os.environ,
+                   SUPABASE_URL=stub.url,
+                   SUPABASE_ANON_KEY="load-anon-key",
+                   GEMINI_API_KEY="load-gemini-key",
+                   AUTH_MODE="local",
+                   ASYNC_ENDPOINTS="true" if args.async_endpoints else "false",
+                   SUPABASE_JWKS_URL=f"{stub.url}/auth/v1/.well-known/jwks.json",
+                   JOB_QUEUE_DB=os.path.join(ROOT, ".cache", f"load-{uuid.uuid4().hex}.sqlite3"))
+        os.makedirs(os.path.join(ROOT, ".cache"), exist_ok=True)
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+            cwd=ROOT, env=env
+        )
+        base_url = f"http://127.0.0.1:{port}"
+        try:
+            for _ in range(100):
+                try:
+                    httpx.get(f"{base_url}/", timeout=1)
+                    break
+                except httpx.HTTPError:
+                    time.sleep(0.1)
+
+            print(f"concurrency {args.concurrency}, {args.duration:.0f}s per endpoint, "
+                  f"{args.latency_ms:.0f} ms per Supabase round trip, "
+                  f"{'async' if args.async_endpoints else 'sync'} endpoints")
+            print(f"{'endpoint':<48} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'errors':>7}")
+            for path in paths:
+                asyncio.run(_hammer(port, path, token, min(args.concurrency, 10), 1))  # warm up
+                latencies, errors, elapsed = asyncio.run(
+                    _hammer(port, path, token, args.concurrency, args.duration)
+                )
+                latencies.sort()
+                p50 = statistics.median(latencies) if latencies else 0
+                p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0
+                label = path if len(path) <= 48 else path[:45] + "..."
+                print(f"{label:<48} {len(latencies) / elapsed:>8.1f} {p50:>8.1f} {p95:>8.1f} {errors:>7}")
+        finally:
+            server.terminate()
+            server.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    main()
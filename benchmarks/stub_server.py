@@ -0,0 +1,386 @@
+"""
+In-process stand-in for the Supabase HTTP APIs used by the benchmarks.
+
+Serves just enough of PostgREST (/rest/v1), Storage (/storage/v1) and Auth (/auth/v1) for the
+real supabase-py client to talk to it, keeps tables in memory, counts every request and can
+add a fixed latency per request to mimic the network round trip to a hosted project.
+"""
+import json
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+
+def _coerce(value: str) -> Any:
+    if value == "null":
+        return None
+    if value in ("true", "false"):
+        return value == "true"
+    return value
+
+
+def _split_top_level(expr: str) -> List[str]:
+    """Split "a.eq.1,and(b.eq.2,c.eq.3)" on commas outside parentheses and double quotes"""
+    parts, depth, quoted, current = [], 0, False, ""
+    for i, ch in enumerate(expr):
+        if ch == '"' and (i == 0 or expr[i - 1] != "\\"):
+            quoted = not quoted
+        elif not quoted and ch in "()":
+            depth += 1 if ch == "(" else -1
+        elif not quoted and depth == 0 and ch == ",":
+            parts.append(current)
+            current = ""
+            continue
+        current += ch
+    return parts + [current] if current else parts
+
+
+def _matches_logic(row: Dict[str, Any], combinator: str, expr: str) -> bool:
+    results = []
+    for condition in _split_top_level(expr[1:-1]):
+        if condition.startswith(("and(", "or(")):
+            nested, _, inner = condition.partition("(")
+            results.append(_matches_logic(row, nested, "(" + inner))
+        else:
+            column, _, rest = condition.partition(".")
+            results.append(_matches(row, column, rest))
+    return all(results) if combinator == "and" else any(results)
+
+
+def _matches(row: Dict[str, Any], column: str, expr: str) -> bool:
+    if column in ("or", "and"):
+        return _matches_logic(row, column, expr)
+    op, _, value = expr.partition(".")
+    if value.startswith('"') and value.endswith('"'):
+        value = value[1:-1].replace('\\"', '"').replace("\\\\", "\\")
+    negate = op == "not"
+    if negate:
+        op, _, value = value.partition(".")
+    current = row.get(column)
+    if op == "eq":
+        result = str(current) == value or current == _coerce(value)
+    elif op == "neq":
+        result = str(current) != value
+    elif op == "is":
+        result = current is _coerce(value)
+    elif op == "in":
+        result = str(current) in [v.strip('"') for v in value.strip("()").split(",")]
+    elif op in ("gt", "gte", "lt", "lte"):
+        if current is None:
+            return False
+        try:
+            left, right = float(current), float(value)
+        except (TypeError, ValueError):
+            left, right = str(current), value
+        result = {"gt": left > right, "gte": left >= right, "lt": left < right, "lte": left <= right}[op]
+    elif op in ("like", "ilike"):
+        pattern = re.escape(value).replace("\\*", ".*").replace("%", ".*")
+        result = re.fullmatch(pattern, str(current or ""), re.I if op == "ilike" else 0) is not None
+    else:
+        result = True
+    return not result if negate else result
+
+
+# Tables whose primary key is not "<singular table name>_id"
+PRIMARY_KEYS = {"export_jobs": "export_id", "audit_logs": "log_id", "transcript_segments": "segment_id"}
+
+
+class StubSupabase:
+    """
+    Usage:
+        with StubSupabase(latency=0.02) as stub:
+            stub.tables["users"] = [{...}]
+            client = create_client(stub.url, "anon-key")
+            ...
+            stub.request_count()
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.tables: Dict[str, List[Dict[str, Any]]] = {}
+        self.objects: Dict[str, bytes] = {}
+        self.auth_user: Dict[str, Any] = {}
+        self.jwks: Dict[str, Any] = {"keys": []}
+        self.rpc: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+            "create_transcript_version": lambda params: self._create_version("transcripts", "transcript_id", "is_active", params),
+            "create_summary_version": lambda params: self._create_version("summaries", "summary_id", "is_latest", params),
+            "activate_transcript_version": lambda params: self._activate_version("transcripts", "transcript_id", "is_active", params),
+            "activate_summary_version": lambda params: self._activate_version("summaries", "summary_id", "is_latest", params),
+        }
+        self.requests: Counter = Counter()
+        # Request bodies above this size get 413, like an API gateway limit (None = unlimited)
+        self.max_body_bytes: Optional[int] = None
+        self._conflict_indexes: Dict[tuple, Any] = {}
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    # ------------------------------------------------------------------ lifecycle
+
+    def __enter__(self) -> "StubSupabase":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def _handle(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                status, headers, payload = stub.handle(self.command, self.path, dict(self.headers), body)
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_POST = do_PATCH = do_PUT = do_DELETE = do_HEAD = _handle
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def request_count(self, prefix: str = "") -> int:
+        return sum(n for key, n in self.requests.items() if key.split(" ", 1)[1].startswith(prefix))
+
+    def reset_counts(self) -> None:
+        self.requests.clear()
+
+    # ------------------------------------------------------------------ dispatch
+
+    def handle(self, method: str, raw_path: str, headers: Dict[str, str], body: bytes):
+        if self.latency:
+            time.sleep(self.latency)
+        parts = urlsplit(raw_path)
+        path = unquote(parts.path)
+        query = parse_qsl(parts.query, keep_blank_values=True)
+        with self._lock:
+            self.requests[f"{method} {path}"] += 1
+            if self.max_body_bytes is not None and len(body or b"") > self.max_body_bytes:
+                return self._json(413, {"message": "Payload Too Large"})
+            try:
+                if path.startswith("/rest/v1/"):
+                    return self._rest(method, path[len("/rest/v1/"):], query, headers, body)
+                if path.startswith("/storage/v1/"):
+                    return self._storage(method, path[len("/storage/v1/"):], body)
+                if path.startswith("/auth/v1/"):
+                    return self._auth(path[len("/auth/v1/"):])
+            except Exception as e:
+                return self._json(500, {"message": f"{type(e).__name__}: {e}"})
+        return self._json(404, {"message": f"no route for {path}"})
+
+    @staticmethod
+    def _json(status: int, data: Any, headers: Optional[Dict[str, str]] = None):
+        out = {"Content-Type": "application/json"}
+        out.update(headers or {})
+        return status, out, json.dumps(data, default=str).encode("utf-8")
+
+    # ------------------------------------------------------------------ auth
+
+    def _auth(self, route: str):
+        if route == "user":
+            if not self.auth_user:
+                return self._json(401, {"message": "invalid JWT"})
+            return self._json(200, self.auth_user)
+        if route == ".well-known/jwks.json":
+            return self._json(200, self.jwks)
+        return self._json(404, {"message": route})
+
+    # ------------------------------------------------------------------ storage
+
+    def _storage(self, method: str, route: str, body: bytes):
+        if route.startswith("object/sign/"):
+            target = route[len("object/sign/"):]
+            data = json.loads(body or b"{}")
+            if "paths" in data:
+                return self._json(200, [
+                    {"path": p, "signedURL": f"/object/sign/{target}/{p}?token={uuid.uuid4().hex}", "error": None}
+                    for p in data["paths"]
+                ])
+            return self._json(200, {"signedURL": f"/object/sign/{target}?token={uuid.uuid4().hex}"})
+        if route.startswith("object/"):
+            target = route[len("object/"):]
+            if method in ("POST", "PUT"):
+                self.objects[target] = body
+                return self._json(200, {"Key": target})
+            if method == "GET":
+                if target not in self.objects:
+                    return self._json(404, {"message": "not found"})
+                return 200, {"Content-Type": "application/octet-stream"}, self.objects[target]
+            if method == "DELETE":
+                prefixes = json.loads(body or b"{}").get("prefixes", [])
+                removed = [{"name": p} for p in prefixes if self.objects.pop(f"{target}/{p}", None) is not None]
+                return self._json(200, removed)
+        return self._json(404, {"message": route})
+
+    # ------------------------------------------------------------------ postgrest
+
+    def _create_version(self, table: str, key: str, flag: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        # Same effect as the Postgres functions in database-table.md; requests hold self._lock
+        rows = self.tables.setdefault(table, [])
+        recording_id = params["p_recording_id"]
+        activate = params.get("p_activate", True)
+        current = [r for r in rows if r["recording_id"] == recording_id]
+        if activate:
+            for r in current:
+                r[flag] = False
+        row = {**params["p_row"], key: str(uuid.uuid4()), "recording_id": recording_id, flag: activate,
+               "version_no": max((r["version_no"] for r in current), default=0) + 1,
+               "created_at": time.strftime("%Y-%m-%dT%H:%M:%S+00:00", time.gmtime())}
+        rows.append(row)
+        return row
+
+    def _activate_version(self, table: str, key: str, flag: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        current = [r for r in self.tables.get(table, []) if r["recording_id"] == params["p_recording_id"]]
+        if not any(r[key] == params["p_id"] for r in current):
+            return []
+        for r in current:
+            r[flag] = r[key] == params["p_id"]
+        return [r for r in current if r[key] == params["p_id"]]
+
+    def _rest(self, method: str, route: str, query, headers: Dict[str, str], body: bytes):
+        if route.startswith("rpc/"):
+            fn = self.rpc.get(route[len("rpc/"):])
+            if not fn:
+                return self._json(404, {"message": f"function {route} not found"})
+            return self._json(200, fn(json.loads(body or b"{}")))
+
+        table = route
+        rows = self.tables.setdefault(table, [])
+        filters = [(k, v) for k, v in query if k not in ("select", "order", "limit", "offset", "on_conflict", "columns")]
+        params = dict(query)
+        prefer = headers.get("Prefer", "") or headers.get("prefer", "")
+
+        def selected() -> List[Dict[str, Any]]:
+            return [r for r in rows if all(_matches(r, col, expr) for col, expr in filters)]
+
+        if method in ("GET", "HEAD"):
+            result = selected()
+            for order in reversed((params.get("order") or "").split(",")):
+                if order:
+                    col, *mods = order.split(".")
+                    result.sort(key=lambda r: (r.get(col) is None, "" if r.get(col) is None else r.get(col)),
+                                reverse="desc" in mods)
+            total = len(result)
+            offset = int(params.get("offset") or 0)
+            if "limit" in params:
+                result = result[offset:offset + int(params["limit"])]
+            elif offset:
+                result = result[offset:]
+            result = [self._embed(table, r, params.get("select") or "*") for r in result]
+            extra = {}
+            if "count=" in prefer:
+                end = offset + len(result) - 1
+                extra["Content-Range"] = f"{offset}-{end}/{total}" if result else f"*/{total}"
+            if method == "HEAD":
+                return 200, extra, b""
+            return self._single_or_list(headers, result, extra)
+
+        if method == "POST":
+            data = json.loads(body or b"[]")
+            incoming = data if isinstance(data, list) else [data]
+            conflict = [c for c in (params.get("on_conflict") or "").split(",") if c]
+            merge = "resolution=merge-duplicates" in prefer
+            ignore = "resolution=ignore-duplicates" in prefer
+            upsert = bool(conflict) and (merge or ignore)
+            by_key = self._conflict_index(table, rows, conflict) if upsert else {}
+            key = PRIMARY_KEYS.get(table, f"{table.rstrip('s')}_id")
+            # segment_id is a BIGSERIAL; every other key is a UUID
+            next_serial = max((r[key] for r in rows), default=0) + 1 if key == "segment_id" else None
+            out = []
+            for item in incoming:
+                natural_key = tuple(str(item.get(c)) for c in conflict)
+                existing = by_key.get(natural_key) if upsert else None
+                if existing is not None and ignore:
+                    continue
+                if existing is not None:
+                    existing.update(item)
+                    out.append(existing)
+                    continue
+                if next_serial is not None:
+                    new_id, next_serial = next_serial, next_serial + 1
+                else:
+                    new_id = str(uuid.uuid4())
+                row = {key: new_id, "created_at": time.strftime("%Y-%m-%dT%H:%M:%S+00:00")}
+                row.update(item)
+                rows.append(row)
+                out.append(row)
+                if upsert:
+                    by_key[natural_key] = row
+            return self._single_or_list(headers, out, {}, status=201)
+
+        if method == "PATCH":
+            self._conflict_indexes.clear()
+            data = json.loads(body or b"{}")
+            result = selected()
+            for r in result:
+                r.update(data)
+            return self._single_or_list(headers, result, {})
+
+        if method == "DELETE":
+            result = selected()
+            self.tables[table] = [r for r in rows if r not in result]
+            return self._single_or_list(headers, result, {})
+
+        return self._json(405, {"message": method})
+
+    def _conflict_index(self, table: str, rows: List[Dict[str, Any]], conflict: List[str]) -> Dict[tuple, Dict[str, Any]]:
+        # Stands in for the unique index behind on_conflict, so batched upserts into a large
+        # table are not dominated by rescanning it; rebuilt when rows were replaced or deleted
+        key = (table, tuple(conflict))
+        cached = self._conflict_indexes.get(key)
+        if cached is None or cached[0] is not rows or len(rows) < cached[1]:
+            index = {tuple(str(r.get(c)) for c in conflict): r for r in rows}
+        else:
+            index = cached[2]
+            for r in rows[cached[1]:]:
+                index[tuple(str(r.get(c)) for c in conflict)] = r
+        self._conflict_indexes[key] = (rows, len(rows), index)
+        return index
+
+    def _embed(self, table: str, row: Dict[str, Any], select: str) -> Dict[str, Any]:
+        # Supports "*, child(count)" style embeds joined on the shared *_id column
+        embeds = re.findall(r"(\w+)\(count\)", select)
+        if not embeds:
+            return row
+        out = dict(row)
+        for child in embeds:
+            children = self.tables.get(child, [])
+            key = next((k for k in row if k.endswith("_id") and children and k in children[0]
+                        and k == f"{table.rstrip('s')}_id"), None)
+            count = sum(1 for c in children if key and c.get(key) == row.get(key))
+            out[child] = [{"count": count}]
+        return out
+
+    def _single_or_list(self, headers: Dict[str, str], result: List[Dict[str, Any]], extra: Dict[str, str], status: int = 200):
+        accept = headers.get("Accept", "") or headers.get("accept", "")
+        if "vnd.pgrst.object" in accept:
+            if len(result) != 1:
+                return self._json(406, {"code": "PGRST116", "message": f"JSON object requested, {len(result)} rows returned"})
+            return self._json(status, result[0], extra)
+        return self._json(status, result, extra)
@@ -0,0 +1,9 @@
+import os
+
+# The app modules build their clients at import time; give them dummy credentials so the
+# test suite can import them without a .env file (no test talks to the real services).
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_ANON_KEY", "test-anon-key")
+os.environ.setdefault("GEMINI_API_KEY", "test-gemini-key")
+# Each test run gets a fresh, throwaway search index
+os.environ.setdefault("SEARCH_INDEX_PATH", ":memory:")
@@ -0,0 +1,99 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from postgrest.exceptions import APIError
+
+from app.utils import audit
+
+
+class FakeTable:
+    def __init__(self, db):
+        self.db = db
+
+    def insert(self, rows):
+        self.rows = rows
+        return self
+
+    def execute(self):
+        if self.db.down:
+            raise ConnectionError("database unavailable")
+        if any(row["resource_id"] in self.db.rejects for row in self.rows):
+            raise APIError({"code": "23503", "message": "insert violates foreign key constraint"})
+        self.db.batches.append(list(self.rows))
+
+
+@pytest.fixture
+def db(monkeypatch):
+    db = SimpleNamespace(down=False, batches=[], rejects=set())
+    monkeypatch.setattr(audit, "supabase", SimpleNamespace(table=lambda name: FakeTable(db)))
+    return db
+
+
+def _row(i):
+    return {"action_type": "UPDATE", "resource_type": "RECORDING", "resource_id": str(i)}
+
+
+def test_rows_are_written_in_batches(db, tmp_path):
+    writer = audit.AuditWriter(batch_size=3, flush_interval=60, spill_path=str(tmp_path / "spill.jsonl"))
+    for i in range(7):
+        writer.enqueue(_row(i))
+    writer.shutdown()
+
+    assert [len(batch) for batch in db.batches] == [3, 3, 1]
+    assert writer.stats()["written"] == 7 and writer.stats()["buffered"] == 0
+
+
+def test_failed_flush_spills_and_replays_in_order(db, tmp_path):
+    spill = tmp_path / "spill.jsonl"
+    writer = audit.AuditWriter(batch_size=10, flush_interval=60, spill_path=str(spill))
+    db.down = True
+    writer.enqueue(_row(1))
+    writer.enqueue(_row(2))
+    writer.flush()
+    assert db.batches == [] and writer.stats()["spilled"] == 2
+
+    writer.enqueue(_row(3))
+    writer.flush()  # still down: the new row queues behind the spilled ones
+    db.down = False
+    writer.enqueue(_row(4))
+    writer.shutdown()
+
+    written = [row["resource_id"] for batch in db.batches for row in batch]
+    assert written == ["1", "2", "3", "4"]
+    assert not spill.exists()
+
+
+def test_overflow_policies(db, tmp_path):
+    spill = tmp_path / "spill.jsonl"
+    writer = audit.AuditWriter(batch_size=10, flush_interval=60, max_buffer=2, spill_path=str(spill))
+    for i in range(3):
+        writer.enqueue(_row(i))
+    assert writer.stats()["buffered"] == 2 and writer.stats()["spilled"] == 1
+
+    dropping = audit.AuditWriter(batch_size=10, flush_interval=60, max_buffer=2,
+                                 overflow_policy="drop_oldest", spill_path=str(spill))
+    for i in range(3):
+        dropping.enqueue(_row(i))
+    dropping.shutdown()
+    assert db.batches[-1] == [_row(1), _row(2)]
+    assert dropping.stats()["dropped"] == 1
+    writer.shutdown()
+
+
+def test_rejected_rows_are_set_aside_and_the_rest_written(db, tmp_path):
+    spill = tmp_path / "spill.jsonl"
+    rejected = tmp_path / "rejected.jsonl"
+    writer = audit.AuditWriter(batch_size=4, flush_interval=60, spill_path=str(spill), rejected_path=str(rejected))
+    db.rejects = {"2"}
+    for i in range(6):
+        writer.enqueue(_row(i))
+    writer.flush()
+    writer.enqueue(_row(6))
+    writer.shutdown()
+
+    written = [row["resource_id"] for batch in db.batches for row in batch]
+    assert written == ["0", "1", "3", "4", "5", "6"]
+    assert not spill.exists()
+    assert [json.loads(line)["resource_id"] for line in rejected.read_text().splitlines()] == ["2"]
+    assert writer.stats()["rejected"] == 1 and writer.stats()["spilled"] == 0
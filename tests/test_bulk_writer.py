@@ -0,0 +1,64 @@
+import threading
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from postgrest.exceptions import APIError
+
+from app.utils import bulk_writer
+
+
+class FakeTable:
+    def __init__(self, db):
+        self.db = db
+
+    def upsert(self, rows, on_conflict, ignore_duplicates=False):
+        self.rows = rows
+        return self
+
+    def execute(self):
+        with self.db.lock:
+            self.db.calls += 1
+            fail = self.db.failures.pop(0) if self.db.failures else None
+            # A lost response: the server stored the batch, the client sees an error
+            for row in self.rows:
+                self.db.stored[(row["transcript_id"], row["sequence"])] = row
+        if fail:
+            raise fail
+        return SimpleNamespace(data=list(self.rows))
+
+
+@pytest.fixture
+def db(monkeypatch):
+    db = SimpleNamespace(lock=threading.Lock(), calls=0, failures=[], stored={})
+    monkeypatch.setattr(bulk_writer, "supabase", SimpleNamespace(table=lambda name: FakeTable(db)))
+    monkeypatch.setattr(bulk_writer, "RETRY_DELAY", 0)
+    return db
+
+
+def _rows(count, content="x"):
+    return [{"transcript_id": "t1", "sequence": i, "content": content} for i in range(count)]
+
+
+def test_batches_are_bounded_by_rows_and_bytes():
+    assert [len(b) for b in bulk_writer.split_batches(_rows(25), max_rows=10)] == [10, 10, 5]
+    assert [len(b) for b in bulk_writer.split_batches(_rows(6, "y" * 100), max_rows=100, max_bytes=350)] == [2, 2, 2]
+
+
+def test_parallel_batches_keep_input_order(db):
+    written = bulk_writer.upsert_rows("transcript_segments", _rows(1000), "transcript_id,sequence", max_rows=64, workers=4)
+    assert [row["sequence"] for row in written] == list(range(1000))
+    assert db.calls == 16
+
+
+def test_failed_batch_is_retried_without_duplicates(db):
+    db.failures = [httpx.ReadTimeout("timed out")]
+    written = bulk_writer.upsert_rows("transcript_segments", _rows(10), "transcript_id,sequence", max_rows=5, workers=1)
+    assert len(written) == 10 and len(db.stored) == 10 and db.calls == 3
+
+
+def test_database_errors_are_not_retried(db):
+    db.failures = [APIError({"code": "23503", "message": "foreign key violation"})]
+    with pytest.raises(APIError):
+        bulk_writer.upsert_rows("transcript_segments", _rows(3), "transcript_id,sequence")
+    assert db.calls == 1
@@ -0,0 +1,116 @@
+import io
+import json
+import threading
+import wave
+
+from app.utils.chunked_transcriber import AudioSlicer, plan_windows, merge_window_segments, stream_windows, transcribe_in_windows
+
+
+def make_wav(seconds: float, rate: int = 8000) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(b"\x00\x00" * int(seconds * rate))
+    return buffer.getvalue()
+
+
+def wav_duration(audio_bytes: bytes) -> float:
+    with wave.open(io.BytesIO(audio_bytes), "rb") as w:
+        return w.getnframes() / w.getframerate()
+
+
+def test_plan_windows_cover_recording_without_gaps():
+    windows = plan_windows(100, chunk_seconds=30, overlap_seconds=4)
+    assert windows[0].start == 0 and windows[-1].end == 100
+    for prev, nxt in zip(windows, windows[1:]):
+        assert nxt.start < prev.end  # windows overlap
+        assert prev.keep_end == nxt.keep_start
+
+
+def test_merge_shifts_offsets_and_drops_overlap_duplicates():
+    windows = plan_windows(50, chunk_seconds=30, overlap_seconds=10)
+    first = [
+        {"speaker_label": "SPEAKER_01", "start_time": 0.0, "end_time": 20.0, "content": "hello"},
+        {"speaker_label": "SPEAKER_01", "start_time": 22.0, "end_time": 26.0, "content": "in overlap"},
+    ]
+    # second window starts at 20s: the overlapping segment comes back with slightly different times
+    second = [
+        {"speaker_label": "SPEAKER_01", "start_time": 1.9, "end_time": 6.1, "content": "In overlap"},
+        {"speaker_label": "SPEAKER_02", "start_time": 10.0, "end_time": 20.0, "content": "bye"},
+    ]
+    merged = merge_window_segments([(windows[1], second), (windows[0], first)])
+    assert [s["content"].lower() for s in merged] == ["hello", "in overlap", "bye"]
+    assert merged[-1]["start_time"] == 30.0
+
+
+def test_speaker_labels_follow_voices_across_windows():
+    windows = plan_windows(50, chunk_seconds=30, overlap_seconds=10)
+    first = [
+        {"speaker_label": "SPEAKER_01", "start_time": 0.0, "end_time": 15.0, "content": "opening"},
+        {"speaker_label": "SPEAKER_02", "start_time": 21.0, "end_time": 29.0, "content": "budget is tight"},
+    ]
+    # The second window calls the voice from the overlap SPEAKER_01 and a new voice SPEAKER_02
+    second = [
+        {"speaker_label": "SPEAKER_01", "start_time": 1.2, "end_time": 9.0, "content": "Budget is tight"},
+        {"speaker_label": "SPEAKER_02", "start_time": 11.0, "end_time": 18.0, "content": "new voice"},
+        {"speaker_label": "SPEAKER_01", "start_time": 19.0, "end_time": 25.0, "content": "same voice again"},
+    ]
+    merged = merge_window_segments([(windows[0], first), (windows[1], second)])
+    assert [(s["content"], s["speaker_label"]) for s in merged] == [
+        ("opening", "SPEAKER_01"),
+        ("Budget is tight", "SPEAKER_02"),
+        ("new voice", "SPEAKER_03"),
+        ("same voice again", "SPEAKER_02"),
+    ]
+
+
+def test_windows_are_transcribed_concurrently():
+    lock = threading.Lock()
+    active, peak = 0, 0
+    # Every window waits until all 5 are in flight; run one at a time, the barrier times out
+    all_started = threading.Barrier(5, timeout=10)
+
+    def fake_transcribe(chunk: bytes, ext: str) -> str:
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        all_started.wait()
+        with lock:
+            active -= 1
+        return json.dumps([{"speaker_label": "SPEAKER_01", "start_time": 0.0,
+                            "end_time": wav_duration(chunk), "content": f"{len(chunk)}"}])
+
+    segments = transcribe_in_windows(make_wav(40), "wav", 40, fake_transcribe,
+                                     chunk_seconds=10, overlap_seconds=1, max_workers=5)
+
+    assert peak == 5  # 5 windows, all in flight at once
+    assert [s["start_time"] for s in segments] == sorted(s["start_time"] for s in segments)
+
+
+def test_stream_windows_hands_off_in_order_as_windows_finish():
+    windows = plan_windows(40, chunk_seconds=10, overlap_seconds=1)
+    first_window_seen = threading.Event()
+    timed_out = []
+
+    def fake_transcribe(chunk: bytes, ext: str) -> str:
+        # Later windows only finish once the caller received the first one
+        if chunk != first_chunk and not first_window_seen.wait(timeout=10):
+            timed_out.append(chunk)
+        return json.dumps([{"speaker_label": "SPEAKER_01", "start_time": 1.0, "end_time": 2.0, "content": str(len(chunk))}])
+
+    audio = make_wav(40)
+    first_chunk = AudioSlicer(audio, "wav").slice(windows[0].start, windows[0].end)
+    stream = stream_windows(audio, "wav", 40, fake_transcribe, chunk_seconds=10, overlap_seconds=1, max_workers=5)
+
+    window, count, segments = next(stream)
+    first_window_seen.set()
+    rest = list(stream)
+
+    assert not timed_out
+    assert (window.index, count) == (0, len(windows))
+    assert [w.index for w, _, _ in rest] == list(range(1, len(windows)))
+    streamed = segments + [s for _, _, kept in rest for s in kept]
+    assert streamed == transcribe_in_windows(audio, "wav", 40, fake_transcribe, chunk_seconds=10, overlap_seconds=1)
@@ -0,0 +1,43 @@
+from app import schemas
+from app.utils.compact_transcript import CompactTranscript
+from app.utils.transcript_utils import clean_transcript_for_summary
+
+
+def make_rows(count: int):
+    return [{
+        "segment_id": 100 + i, "transcript_id": "t1", "sequence": i + 1,
+        "start_time": i * 2.5, "end_time": i * 2.5 + 2.0,
+        "content": f"Câu thứ {i}: kế hoạch đợt {i % 3}" if i != 3 else "",
+        "speaker_label": None if i == 4 else f"SPEAKER_{i % 2 + 1:02d}",
+        "confidence": None if i % 5 == 0 else 0.9, "is_user_edited": i == 2,
+    } for i in range(count)]
+
+
+def test_rows_round_trip_through_columns(tmp_path):
+    rows = make_rows(12)
+    compact = CompactTranscript.from_rows(rows)
+
+    assert len(compact) == 12 and compact.transcript_id == "t1"
+    assert list(compact) == rows
+    assert compact[-1] == rows[-1]
+    assert compact.speakers == ["SPEAKER_01", "SPEAKER_02", None]  # interned once each
+
+    path = str(tmp_path / "segments.bin")
+    compact.dump(path)
+    assert list(CompactTranscript.load(path)) == rows
+
+
+def test_api_models_in_and_out_match_validated_ones():
+    rows = make_rows(6)
+    validated = [schemas.TranscriptSegment(**row) for row in rows]
+
+    compact = CompactTranscript.from_rows(validated)
+    assert compact.to_segments() == validated
+    assert [s.model_dump() for s in compact.to_segments()] == [s.model_dump() for s in validated]
+
+
+def test_summary_text_matches_the_per_segment_path():
+    rows = [row for row in make_rows(8) if row["speaker_label"]]
+    compact = CompactTranscript.from_rows(rows)
+    assert clean_transcript_for_summary(compact) == clean_transcript_for_summary(rows)
+    assert clean_transcript_for_summary(CompactTranscript.from_rows([])) == ""
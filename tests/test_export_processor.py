@@ -0,0 +1,279 @@
+import io
+import json
+import zipfile
+from types import SimpleNamespace
+
+from docx import Document
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+
+from app import schemas
+from app.services.recording_service import RecordingService
+from app.services.transcript_segment_service import TranscriptSegmentService
+from app.services.summary_service import SummaryService
+from app.services.transcript_service import TranscriptService
+from app.services.user_service import UserService
+from app.utils import export_processor, export_templates, render_pool
+from app.utils.export_processor import ExportProcessor
+from app.utils.export_renderers import ExportRenderer
+
+
+def _segments(count, content="Câu số {i}"):
+    for i in range(count):
+        yield {"sequence": i, "start_time": i * 5.0, "end_time": i * 5.0 + 4.0,
+               "speaker_label": "SPEAKER_01", "content": content.format(i=i)}
+
+
+def _processor(monkeypatch, segments, export_type="TRANSCRIPT_DOCX", options=None):
+    recording = schemas.Recording(
+        recording_id="r1", user_id="u1", title="Weekly sync", file_path="u1/r1.mp3", duration_seconds=60.0,
+        source_type="RECORDED", status="PROCESSED", created_at="2024-01-01T00:00:00+00:00"
+    )
+    monkeypatch.setattr(RecordingService, "get_recording_by_id", staticmethod(lambda recording_id: recording))
+    monkeypatch.setattr(UserService, "get_user_by_id", staticmethod(lambda user_id: SimpleNamespace(tier_id=2)))
+    monkeypatch.setattr(TranscriptService, "get_transcripts_by_recording_id",
+                        staticmethod(lambda recording_id, latest=False: [{"transcript_id": "t1", "version_no": 2}]))
+    monkeypatch.setattr(SummaryService, "get_summaries_by_recording_id", staticmethod(lambda recording_id, latest=False: [{
+        "summary_id": "s1", "version_no": 1, "created_at": "2024-01-01T00:00:00+00:00", "summary_style": "MEETING",
+        "content_structure": {"overview": "Overview", "key_points": ["a"], "action_items": ["b"]}
+    }]))
+    segments = list(segments)
+    monkeypatch.setattr(TranscriptSegmentService, "iter_segments",
+                        staticmethod(lambda transcript_id: list(segments)))
+    monkeypatch.setattr(TranscriptSegmentService, "segments_fingerprint",
+                        staticmethod(lambda transcript_id: [len(segments), len(segments)]))
+    return ExportProcessor({"export_id": "e1", "recording_id": "r1", "export_type": export_type}, options)
+
+
+def _payload(monkeypatch, tmp_path, segments, parts=("transcript.pdf",)):
+    return _processor(monkeypatch, segments).build_payload(str(tmp_path), list(parts))
+
+
+def test_streamed_docx_is_a_valid_document(monkeypatch, tmp_path):
+    path = tmp_path / "transcript.docx"
+    ExportRenderer(_payload(monkeypatch, tmp_path, _segments(300, "Câu số {i} <a & b>"))).transcript_docx(str(path))
+
+    paragraphs = [p.text for p in Document(str(path)).paragraphs]
+    assert "Transcript: Weekly sync" in paragraphs
+    assert "Version: 2" in paragraphs
+    segments = [p for p in paragraphs if p.startswith("SPEAKER_01")]
+    assert len(segments) == 300
+    assert segments[1] == "SPEAKER_01 [00:05 - 00:09]\nCâu số 1 <a & b>\n"
+
+
+def test_template_docx_round_trips_through_python_docx(monkeypatch, tmp_path):
+    path = tmp_path / "transcript.docx"
+    ExportRenderer(_payload(monkeypatch, tmp_path, _segments(2, "Dòng 1\nDòng 2 {i}"))).transcript_docx(str(path))
+
+    doc = Document(str(path))
+    title, heading = doc.paragraphs[0], doc.paragraphs[5]
+    assert (title.text, title.style.name, title.alignment) == ("Transcript: Weekly sync", "Title", WD_ALIGN_PARAGRAPH.CENTER)
+    assert (heading.text, heading.style.name) == ("Transcript Content", "Heading 1")
+    assert doc.paragraphs[4].text == ""
+    assert doc.paragraphs[-1].text == "SPEAKER_01 [00:05 - 00:09]\nDòng 1\nDòng 2 1\n"
+    # The rest of the package comes from the template unchanged
+    assert doc.sections[0].page_width is not None
+    assert len(doc.styles) == len(Document().styles)
+
+
+def test_streamed_pdf_renders_all_pages(monkeypatch, tmp_path):
+    path = tmp_path / "transcript.pdf"
+    ExportRenderer(_payload(monkeypatch, tmp_path, _segments(400))).transcript_pdf(str(path))
+
+    data = path.read_bytes()
+    assert data.startswith(b"%PDF")
+    assert data.count(b"/Type /Page\n") > 10
+
+
+def test_process_pool_renders_from_the_serialized_payload(monkeypatch, tmp_path):
+    payload = _payload(monkeypatch, tmp_path, _segments(3), ["transcript.srt", "summary.json"])
+    monkeypatch.setattr(render_pool, "RENDER_WORKERS", 1)
+    monkeypatch.setattr(render_pool, "_pool", None)
+    try:
+        srt = render_pool.submit(payload, "transcript.srt", str(tmp_path / "transcript.srt")).result(timeout=60)
+        summary = render_pool.submit(payload, "summary.json", str(tmp_path / "summary.json")).result(timeout=60)
+    finally:
+        render_pool.shutdown_render_pool()
+
+    assert open(srt, encoding="utf-8").read().count(" --> ") == 3
+    assert json.load(open(summary, encoding="utf-8"))["summary_id"] == "s1"
+
+
+def test_full_zip_is_rendered_locally_and_uploaded_once(monkeypatch):
+    uploads = []
+
+    def upload(path, file, file_options):
+        uploads.append((path, file.read()))
+
+    bucket = SimpleNamespace(upload=upload, download=lambda path: (_ for _ in ()).throw(AssertionError(path)))
+    monkeypatch.setattr(export_processor, "supabase", SimpleNamespace(storage=SimpleNamespace(from_=lambda name: bucket)))
+    segments = list(_segments(3))
+    processor = _processor(monkeypatch, segments, "FULL_ZIP", {"bundle_formats": ["docx", "json", "srt"]})
+
+    file_path = processor.process()
+    assert file_path.startswith("r1/artifacts/full_zip-") and file_path.endswith(".zip")
+    assert len(uploads) == 1
+    archive = zipfile.ZipFile(io.BytesIO(uploads[0][1]))
+    assert sorted(archive.namelist()) == sorted([
+        "transcript.pdf", "summary.pdf", "transcript.docx", "summary.docx",
+        "transcript.json", "summary.json", "transcript.srt"
+    ])
+    assert archive.read("transcript.srt").decode().startswith(
+        "1\n00:00:00,000 --> 00:00:04,000\nSPEAKER_01: Câu số 0\n\n2\n00:00:05,000"
+    )
+    assert len(json.loads(archive.read("transcript.json"))["segments"]) == 3
+
+
+def test_artifact_path_changes_only_with_rendered_inputs(monkeypatch):
+    path = _processor(monkeypatch, [], "TRANSCRIPT_PDF").artifact_path()
+    assert _processor(monkeypatch, [], "TRANSCRIPT_PDF").artifact_path() == path
+    assert _processor(monkeypatch, [], "TRANSCRIPT_DOCX").artifact_path() != path
+
+    # A newer summary does not affect a transcript export
+    monkeypatch.setattr(SummaryService, "get_summaries_by_recording_id",
+                        staticmethod(lambda recording_id, latest=False: [{"summary_id": "s2", "version_no": 2}]))
+    processor = ExportProcessor({"export_id": "e2", "recording_id": "r1", "export_type": "TRANSCRIPT_PDF"})
+    assert processor.artifact_path() == path
+
+    monkeypatch.setattr(TranscriptService, "get_transcripts_by_recording_id",
+                        staticmethod(lambda recording_id, latest=False: [{"transcript_id": "t2", "version_no": 3}]))
+    processor = ExportProcessor({"export_id": "e3", "recording_id": "r1", "export_type": "TRANSCRIPT_PDF"})
+    assert processor.artifact_path() != path
+
+    bundle = ExportProcessor({"export_id": "e4", "recording_id": "r1", "export_type": "FULL_ZIP"})
+    with_srt = ExportProcessor({"export_id": "e5", "recording_id": "r1", "export_type": "FULL_ZIP"}, {"bundle_formats": ["srt"]})
+    assert bundle.artifact_path() != with_srt.artifact_path()
+
+
+def test_adding_or_deleting_a_segment_invalidates_the_export(monkeypatch):
+    from app.services import transcript_segment_service
+    from app.services.export_job_service import ExportJobService
+
+    fingerprint = TranscriptSegmentService.__dict__["segments_fingerprint"]
+    rows = [dict(segment, segment_id=i + 1, transcript_id="t1") for i, segment in enumerate(_segments(3))]
+
+    class Segments:
+        def __init__(self):
+            self.count, self.ops = None, []
+
+        def __getattr__(self, name):
+            return lambda *args, **kwargs: self.ops.append((name, args, kwargs)) or self
+
+        def execute(self):
+            ops, self.ops = self.ops, []
+            name, args, _ = ops[0]
+            if name == "insert":
+                rows.append(dict(args[0], segment_id=max(row["segment_id"] for row in rows) + 1))
+                return SimpleNamespace(data=[rows[-1]])
+            if name == "delete":
+                segment_id = next(a[1] for op, a, _ in ops if op == "eq" and a[0] == "segment_id")
+                rows[:] = [row for row in rows if row["segment_id"] != segment_id]
+                return SimpleNamespace(data=[])
+            if name == "select" and args[0] == "recording_id":
+                return SimpleNamespace(data=[{"recording_id": "r1"}])
+            return SimpleNamespace(data=rows[-1:], count=len(rows))
+
+    stale = []
+    monkeypatch.setattr(transcript_segment_service, "supabase", SimpleNamespace(table=lambda name: Segments()))
+    monkeypatch.setattr(transcript_segment_service.SearchService, "upsert_segment", staticmethod(lambda *args: None))
+    monkeypatch.setattr(transcript_segment_service.SearchService, "remove_segment", staticmethod(lambda *args: None))
+    monkeypatch.setattr(ExportJobService, "collect_stale_artifacts", staticmethod(lambda *args: stale.append(args)))
+
+    def artifact_path():
+        processor = _processor(monkeypatch, rows, "TRANSCRIPT_SRT")
+        # The fingerprint is read from the fake table rather than the stub _processor installs
+        monkeypatch.setattr(TranscriptSegmentService, "segments_fingerprint", fingerprint)
+        return processor.artifact_path()
+
+    original = artifact_path()
+    created = TranscriptSegmentService.create_transcript_segment("t1", schemas.TranscriptSegmentCreate(
+        transcript_id="t1", sequence=4, start_time=20.0, end_time=24.0, content="added later", speaker_label="SPEAKER_02"))
+    after_create = artifact_path()
+    TranscriptSegmentService.delete_transcript_segment("t1", created.segment_id)
+    TranscriptSegmentService.delete_transcript_segment("t1", 2)
+    after_delete = artifact_path()
+
+    assert len({original, after_create, after_delete}) == 3
+    assert stale == [("r1", "TRANSCRIPT")] * 3
+
+
+def test_tier_branding_is_applied_to_cached_templates(monkeypatch, tmp_path):
+    templates_file = tmp_path / "export_templates.json"
+    templates_file.write_text(json.dumps({"2": {"title_color": "#0b5394"}}))
+    monkeypatch.setattr(export_templates, "EXPORT_TEMPLATES_FILE", str(templates_file))
+    export_templates.reload_templates()
+    try:
+        unbranded = export_templates.get_pdf_styles()
+        processor = _processor(monkeypatch, [], "SUMMARY_DOCX")
+        payload = processor.build_payload(str(tmp_path), ["summary.docx"])
+        assert payload["template"] == "2"
+        assert export_templates.get_pdf_styles("2").title.textColor == "#0b5394"
+        assert export_templates.get_pdf_styles() is unbranded
+
+        path = tmp_path / "summary.docx"
+        ExportRenderer(payload).summary_docx(str(path))
+        doc = Document(str(path))
+        assert str(doc.styles["Title"].font.color.rgb) == "0B5394"
+        assert [p.text for p in doc.paragraphs][:3] == ["Summary: Weekly sync", "Created: 2024-01-01T00:00:00+00:00", "Style: MEETING"]
+        assert doc.paragraphs[0].style.name == "Title"
+        branded_path = processor.artifact_path()
+
+        monkeypatch.setattr(export_templates, "EXPORT_TEMPLATES_FILE", str(tmp_path / "missing.json"))
+        export_templates.reload_templates()
+        assert _processor(monkeypatch, [], "SUMMARY_DOCX").artifact_path() != branded_path
+    finally:
+        export_templates.reload_templates()
+
+
+def test_segment_formats_are_generated_from_the_segment_stream(monkeypatch):
+    uploads = []
+    bucket = SimpleNamespace(upload=lambda path, file, file_options: uploads.append((path, file.read(), file_options)))
+    monkeypatch.setattr(export_processor, "supabase", SimpleNamespace(storage=SimpleNamespace(from_=lambda name: bucket)))
+    segments = list(_segments(2, "a <b> & c\n\nd"))
+
+    vtt = "".join(_processor(monkeypatch, segments, "TRANSCRIPT_VTT").iter_segment_format())
+    assert vtt == ("WEBVTT\n\n"
+                   "1\n00:00:00.000 --> 00:00:04.000\n<v SPEAKER_01>a &lt;b&gt; &amp; c d\n\n"
+                   "2\n00:00:05.000 --> 00:00:09.000\n<v SPEAKER_01>a &lt;b&gt; &amp; c d\n\n")
+
+    file_path = _processor(monkeypatch, segments, "TRANSCRIPT_JSONL").process()
+    assert file_path.startswith("r1/artifacts/transcript_jsonl-") and file_path.endswith(".jsonl")
+    lines = uploads[0][1].decode().splitlines()
+    assert [json.loads(line) for line in lines] == segments
+    assert uploads[0][2]["content-type"] == "application/x-ndjson"
+
+
+def test_stream_endpoint_downloads_and_caches_the_export(monkeypatch):
+    from fastapi.testclient import TestClient
+    from app.auth import get_current_user
+    from app.main import app
+    from app.services.export_job_service import ExportJobService
+
+    uploads, completed = [], []
+    bucket = SimpleNamespace(upload=lambda path, file, file_options: uploads.append((path, file.read())))
+    monkeypatch.setattr(export_processor, "supabase", SimpleNamespace(storage=SimpleNamespace(from_=lambda name: bucket)))
+    monkeypatch.setattr(RecordingService, "check_recording_access", staticmethod(
+        lambda user_id, recording_id: {"recording_id": recording_id, "user_id": user_id} if recording_id == "r1" else None))
+    monkeypatch.setattr(ExportJobService, "find_artifact_job", staticmethod(lambda *args: None))
+    monkeypatch.setattr(ExportJobService, "create_export_job",
+                        staticmethod(lambda user_id, recording_id, export_type: SimpleNamespace(export_id="e9")))
+    monkeypatch.setattr(ExportJobService, "complete_export_job",
+                        staticmethod(lambda export_id, file_path: completed.append((export_id, file_path))))
+    _processor(monkeypatch, list(_segments(3000)), "TRANSCRIPT_SRT")
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(user_id="u1")
+    try:
+        response = TestClient(app).get("/recordings/r1/export/stream", params={"export_type": "TRANSCRIPT_SRT", "cache": True})
+        rejected = TestClient(app).get("/recordings/r1/export/stream", params={"export_type": "TRANSCRIPT_MP3"})
+        missing = TestClient(app).get("/recordings/r2/export/stream", params={"export_type": "TRANSCRIPT_SRT"})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-subrip")
+    assert response.headers["content-disposition"] == (
+        "attachment; filename=\"Weekly sync - transcript.srt\"; filename*=UTF-8''Weekly%20sync%20-%20transcript.srt"
+    )
+    assert response.text.count(" --> ") == 3000
+    assert uploads == [(completed[0][1], response.content)]
+    assert completed[0][1].startswith("r1/artifacts/transcript_srt-")
+    assert rejected.status_code == 400
+    assert missing.status_code == 404
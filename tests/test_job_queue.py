@@ -0,0 +1,50 @@
+import time
+
+from app.utils import job_queue
+from app.utils.job_queue import JobQueue
+from app.worker import Worker, JobHandler
+
+
+def test_concurrency_limit_per_job_type(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"))
+    for i in range(3):
+        queue.enqueue("export", {"n": i})
+    queue.enqueue("transcribe", {"n": 99})
+
+    limits = {"export": 2, "transcribe": 1}
+    claimed = [queue.claim("w1", limits) for _ in range(4)]
+    types = sorted(job["job_type"] for job in claimed if job)
+    assert types == ["export", "export", "transcribe"]
+
+
+def test_expired_lease_is_redelivered(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"))
+    job_id = queue.enqueue("export", {"export_id": "e1"})
+
+    first = queue.claim("crashed-worker", {"export": 1}, visibility_timeout=0.05)
+    assert first["job_id"] == job_id
+    assert queue.claim("w2", {"export": 1}) is None  # still leased
+    time.sleep(0.1)
+    second = queue.claim("w2", {"export": 1})
+    assert second["job_id"] == job_id and second["attempts"] == 2
+
+
+def test_failed_job_is_retried_then_dead_lettered(tmp_path, monkeypatch):
+    monkeypatch.setattr(job_queue, "RETRY_BASE_DELAY", 0)
+    queue = JobQueue(str(tmp_path / "jobs.db"))
+    job_id = queue.enqueue("export", {"export_id": "e1"}, max_attempts=2)
+    events = []
+
+    def boom(payload):
+        raise RuntimeError("render failed")
+
+    handlers = {"export": JobHandler(run=boom, on_retry=lambda p: events.append("retry"),
+                                     on_dead=lambda p: events.append("dead"))}
+    worker = Worker(queue=queue, handlers=handlers, concurrency={"export": 1})
+    worker.run_job(queue.claim(worker.worker_id, worker.concurrency))
+    worker.run_job(queue.claim(worker.worker_id, worker.concurrency))
+
+    job = queue.get_job(job_id)
+    assert events == ["retry", "dead"]
+    assert job["status"] == job_queue.STATUS_FAILED
+    assert "render failed" in job["last_error"]
@@ -0,0 +1,81 @@
+import asyncio
+import json
+import threading
+import time
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import ec
+
+from app.utils import jwt_verifier
+
+
+def make_key(kid):
+    private_key = ec.generate_private_key(ec.SECP256R1())
+    public_jwk = json.loads(jwt.algorithms.ECAlgorithm.to_jwk(private_key.public_key()))
+    public_jwk.update({"kid": kid, "alg": "ES256", "use": "sig"})
+    return private_key, public_jwk
+
+
+def sign(private_key, kid, **claims):
+    payload = {"sub": "user-1", "aud": "authenticated", "exp": int(time.time()) + 60,
+               "email": "a@example.com", **claims}
+    return jwt.encode(payload, private_key, algorithm="ES256", headers={"kid": kid})
+
+
+@pytest.fixture
+def jwks():
+    published = {"keys": []}
+    fetches = []
+
+    def fetch(url):
+        fetches.append(threading.current_thread())
+        return published
+
+    jwt_verifier.set_jwks_cache(jwt_verifier.JWKSCache("http://jwks", refresh_interval=600,
+                                                       min_refetch_interval=600, fetch=fetch))
+    yield published, fetches
+    jwt_verifier.set_jwks_cache(jwt_verifier.JWKSCache())
+
+
+def test_valid_token_is_verified_with_cached_key(jwks):
+    published, fetches = jwks
+    private_key, public_jwk = make_key("k1")
+    published["keys"].append(public_jwk)
+
+    for _ in range(5):
+        claims = jwt_verifier.verify_token(sign(private_key, "k1"))
+    assert claims["sub"] == "user-1"
+    assert len(fetches) == 1
+
+    with pytest.raises(jwt.ExpiredSignatureError):
+        jwt_verifier.verify_token(sign(private_key, "k1", exp=int(time.time()) - 60))
+
+
+def test_unknown_key_falls_back_without_refetch_storm(jwks):
+    published, fetches = jwks
+    private_key, public_jwk = make_key("k1")
+    published["keys"].append(public_jwk)
+    jwt_verifier.verify_token(sign(private_key, "k1"))
+
+    rotated_key, _ = make_key("k2")
+    for _ in range(3):
+        with pytest.raises(jwt_verifier.UnknownSigningKey):
+            jwt_verifier.verify_token(sign(rotated_key, "k2"))
+    assert len(fetches) == 1  # refetch is rate limited by min_refetch_interval
+
+
+def test_async_verification_refreshes_keys_off_the_event_loop(jwks):
+    published, fetches = jwks
+    private_key, public_jwk = make_key("k1")
+    published["keys"].append(public_jwk)
+
+    async def verify_twice():
+        first = await jwt_verifier.verify_token_async(sign(private_key, "k1"))
+        second = await jwt_verifier.verify_token_async(sign(private_key, "k1"))
+        return first, second
+
+    first, second = asyncio.run(verify_twice())
+    assert first["sub"] == second["sub"] == "user-1"
+    assert len(fetches) == 1  # the second call used the cached key
+    assert fetches[0] is not threading.main_thread()
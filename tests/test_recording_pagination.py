@@ -0,0 +1,90 @@
+import re
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import recording_service
+from app.services.recording_service import RecordingService, recording_count_cache
+from app.utils.pagination import decode_cursor, encode_cursor
+
+KEYSET = re.compile(r'created_at\.lt\."(.+)",and\(created_at\.eq\."(.+)",recording_id\.lt\."(.+)"\)')
+
+
+class FakeQuery:
+    """Just enough of the PostgREST builder for the recordings listing query"""
+
+    def __init__(self, db, count):
+        self.db = db
+        self.count = count
+        self.rows = list(db.rows)
+        self.window = None
+        db.counts.append(count)
+
+    def eq(self, column, value):
+        self.rows = [r for r in self.rows if r[column] == value]
+        return self
+
+    def order(self, column, desc=False):
+        return self
+
+    def or_(self, expr):
+        created_at, _, recording_id = KEYSET.fullmatch(expr).groups()
+        self.rows = [r for r in self.rows if (r["created_at"], r["recording_id"]) < (created_at, recording_id)]
+        return self
+
+    def limit(self, size):
+        self.window = (0, size)
+        return self
+
+    def range(self, start, end):
+        self.window = (start, end - start + 1)
+        return self
+
+    def execute(self):
+        rows = sorted(self.rows, key=lambda r: (r["created_at"], r["recording_id"]), reverse=True)
+        start, size = self.window
+        return SimpleNamespace(data=rows[start:start + size], count=len(rows) if self.count else None)
+
+
+@pytest.fixture
+def db(monkeypatch):
+    # Pairs of rows share a created_at, so the page boundary has to use the recording_id tie-breaker
+    rows = [{"recording_id": f"r{i:02d}", "user_id": "u1", "is_trashed": False,
+             "created_at": f"2024-01-{i // 2 + 1:02d}T00:00:00+00:00"} for i in range(25)]
+    db = SimpleNamespace(rows=rows, counts=[])
+    client = SimpleNamespace(table=lambda name: SimpleNamespace(select=lambda columns, count=None: FakeQuery(db, count)))
+    monkeypatch.setattr(recording_service, "supabase", client)
+    recording_count_cache.clear()
+    return db
+
+
+def test_cursor_pages_cover_every_row_once(db):
+    seen, cursor = [], None
+    while True:
+        page = RecordingService.get_filtered_recordings("u1", page_size=10, cursor=cursor, pagination="cursor")
+        seen.extend(r["recording_id"] for r in page["data"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    assert seen == [f"r{i:02d}" for i in reversed(range(25))]
+    assert decode_cursor(encode_cursor(["2024-01-01", "r01"]), 2) == ["2024-01-01", "r01"]
+
+
+def test_totals_are_cached_until_invalidated(db):
+    first = RecordingService.get_filtered_recordings("u1", page=1)
+    second = RecordingService.get_filtered_recordings("u1", page=2)
+    assert first["total"] == second["total"] == 25
+    assert db.counts == ["exact", None]
+
+    none = RecordingService.get_filtered_recordings("u1", count="none")
+    assert none["total"] is None and db.counts[-1] is None
+
+    RecordingService.invalidate_recording_counts("u1")
+    RecordingService.get_filtered_recordings("u1", page=3)
+    assert db.counts[-1] == "exact"
+
+
+def test_malformed_cursor_is_rejected(db):
+    with pytest.raises(ValueError):
+        RecordingService.get_filtered_recordings("u1", cursor="not-a-cursor", pagination="cursor")
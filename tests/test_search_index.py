@@ -0,0 +1,52 @@
+import pytest
+
+from app.utils.search_index import SearchIndex, build_match, fold
+
+
+@pytest.fixture
+def index():
+    index = SearchIndex(":memory:")
+    index.index_transcript("u1", "r1", "t1", [
+        {"segment_id": 1, "start_time": 0.0, "end_time": 4.0, "content": "Chúng ta bàn về kế hoạch quý tới."},
+        {"segment_id": 2, "start_time": 5.0, "end_time": 9.0, "content": "Đội ngũ cần thêm người."},
+        {"segment_id": 3, "start_time": 10.0, "end_time": 14.0, "content": "Ke hoach viết không dấu."},
+    ])
+    index.index_transcript("u2", "r2", "t2", [
+        {"segment_id": 4, "start_time": 0.0, "end_time": 4.0, "content": "Kế hoạch của người khác."},
+    ])
+    yield index
+    index.close()
+
+
+def test_fold_strips_vietnamese_diacritics():
+    assert fold("Kế Hoạch ĐỢT 2") == "ke hoach dot 2"
+    assert build_match("ke") == 'folded: ("ke"*)'
+
+
+def test_search_is_per_user_and_accent_insensitive(index):
+    hits = index.search("u1", "ke hoach")
+    assert sorted(hit["segment_id"] for hit in hits) == [1, 3]
+    assert hits[0]["start_time"] is not None
+    assert [hit["segment_id"] for hit in index.search("u1", "doi ngu")] == [2]
+
+
+def test_typed_accents_rank_exact_matches_first(index):
+    assert [hit["segment_id"] for hit in index.search("u1", "kế hoạch")] == [1, 3]
+    assert [hit["segment_id"] for hit in index.search("u1", "Ke hoach viet")] == [3]
+
+
+def test_incremental_updates(index):
+    index.upsert_segment("t1", {"segment_id": 2, "start_time": 5.0, "end_time": 9.0, "content": "Ngân sách đã duyệt."})
+    assert index.search("u1", "doi ngu") == []
+    assert [hit["segment_id"] for hit in index.search("u1", "ngan sach")] == [2]
+
+    # Segments of a transcript version that is not indexed are ignored
+    assert not index.upsert_segment("old-version", {"segment_id": 9, "content": "ngan sach"})
+
+    index.index_summary("u1", "r1", {"overview": "Tổng quan", "action_items": ["Gửi báo cáo ngân sách"]})
+    summary = index.search("u1", "bao cao", kind="summary")
+    assert [(hit["section"], hit["content"]) for hit in summary] == [("action_items", "Gửi báo cáo ngân sách")]
+
+    index.remove_recording("r1")
+    assert index.search("u1", "ngan sach") == []
+    assert index.stats() == {"docs": 1, "recordings": 1}
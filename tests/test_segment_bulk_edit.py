@@ -0,0 +1,103 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app import schemas
+from app.services import transcript_segment_service
+from app.services.export_job_service import ExportJobService
+from app.services.transcript_segment_service import TranscriptSegmentService
+
+
+class FakeQuery:
+    def __init__(self, db, table):
+        self.db, self.table, self.filters, self.rows = db, table, [], None
+
+    def select(self, columns):
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda r: r.get(column) == value)
+        return self
+
+    def gt(self, column, value):
+        self.filters.append(lambda r: r[column] > value)
+        return self
+
+    def gte(self, column, value):
+        self.filters.append(lambda r: r[column] >= value)
+        return self
+
+    def lte(self, column, value):
+        self.filters.append(lambda r: r[column] <= value)
+        return self
+
+    def in_(self, column, values):
+        self.filters.append(lambda r: r[column] in values)
+        return self
+
+    def order(self, column):
+        return self
+
+    def limit(self, size):
+        return self
+
+    def upsert(self, rows, on_conflict):
+        self.rows = rows
+        return self
+
+    def execute(self):
+        self.db.calls.append("upsert" if self.rows is not None else "select")
+        if self.rows is not None:
+            by_id = {r["segment_id"]: r for r in self.db.tables[self.table]}
+            for row in self.rows:
+                by_id[row["segment_id"]].update(row)
+            return SimpleNamespace(data=[dict(r) for r in self.rows])
+        data = [dict(r) for r in self.db.tables[self.table] if all(f(r) for f in self.filters)]
+        return SimpleNamespace(data=sorted(data, key=lambda r: r.get("sequence", 0)))
+
+
+@pytest.fixture
+def db(monkeypatch):
+    segments = [{"segment_id": i, "transcript_id": "t1", "sequence": i, "start_time": i * 5.0, "end_time": i * 5.0 + 4,
+                 "speaker_label": "SPEAKER_01" if i % 2 else "SPEAKER_02", "content": f"Chao anh {i}",
+                 "confidence": 1.0, "is_user_edited": False} for i in range(1, 501)]
+    db = SimpleNamespace(tables={"transcript_segments": segments, "transcripts": [{"transcript_id": "t1", "recording_id": "r1"}]},
+                         calls=[], audits=[])
+    monkeypatch.setattr(transcript_segment_service, "supabase", SimpleNamespace(table=lambda name: FakeQuery(db, name)))
+    monkeypatch.setattr(transcript_segment_service, "create_audit_log", lambda **entry: db.audits.append(entry))
+    monkeypatch.setattr(ExportJobService, "collect_stale_artifacts", staticmethod(lambda *args: None))
+    return db
+
+
+def test_bulk_edit_is_one_read_one_upsert_and_one_audit(db):
+    edit = schemas.TranscriptSegmentBulkEdit(
+        relabel={"from_label": "SPEAKER_01", "to_label": "Lan", "start_sequence": 1, "end_sequence": 500},
+        find_replace={"find": "chao", "replace": "Xin chào"},
+        segments=[{"segment_id": 2, "speaker_label": "Minh"}],
+    )
+    changed = TranscriptSegmentService.bulk_edit_segments("t1", edit, user_id="u1")
+
+    assert len(changed) == 500
+    assert db.calls.count("upsert") == 1 and len(db.audits) == 1
+    rows = {r["segment_id"]: r for r in db.tables["transcript_segments"]}
+    assert (rows[1]["speaker_label"], rows[1]["content"]) == ("Lan", "Xin chào anh 1")
+    assert rows[2]["speaker_label"] == "Minh" and rows[4]["speaker_label"] == "SPEAKER_02"
+    assert all(r["is_user_edited"] for r in rows.values())
+    assert "500 segments" in db.audits[0]["details"]
+
+
+def test_relabel_respects_the_range_and_skips_unchanged_rows(db):
+    edit = schemas.TranscriptSegmentBulkEdit(relabel={"from_label": "SPEAKER_01", "to_label": "Lan", "start_sequence": 10, "end_sequence": 19})
+    changed = TranscriptSegmentService.bulk_edit_segments("t1", edit)
+    assert [s.segment_id for s in changed] == [11, 13, 15, 17, 19]
+
+    assert TranscriptSegmentService.bulk_edit_segments("t1", edit) == []
+    assert db.calls.count("upsert") == 1 and len(db.audits) == 1
+
+
+def test_unknown_segment_is_rejected_before_writing(db):
+    edit = schemas.TranscriptSegmentBulkEdit(segments=[{"segment_id": 9999, "content": "x"}])
+    with pytest.raises(HTTPException) as exc:
+        TranscriptSegmentService.bulk_edit_segments("t1", edit)
+    assert exc.value.status_code == 404 and "upsert" not in db.calls
@@ -0,0 +1,79 @@
+import random
+from types import SimpleNamespace
+
+from app.services import transcript_segment_service
+from app.services.transcript_segment_service import TranscriptSegmentService
+from app.utils.segment_index import SegmentTimeIndex
+
+
+def make_segments(count: int, nested: bool = False, seed: int = 7):
+    rnd = random.Random(seed)
+    segments, t = [], 0.0
+    for i in range(count):
+        start = t + rnd.choice([0.0, 0.5, 2.0])
+        t = start + rnd.uniform(0.5, 6.0)
+        # With nested, every 10th segment is long and the following ones sit inside it
+        end = t + 30 if nested and i % 10 == 0 else t
+        segments.append({"segment_id": i + 1, "sequence": i + 1, "start_time": round(start, 2), "end_time": round(end, 2),
+                         "content": f"line {i}"})
+    rnd.shuffle(segments)
+    return segments
+
+
+def brute_overlapping(segments, start, end):
+    hits = [s for s in segments if s["start_time"] <= end and s["end_time"] >= start]
+    return sorted(hits, key=lambda s: (s["start_time"], s["end_time"], s["sequence"]))
+
+
+def test_range_queries_match_a_full_scan():
+    for nested in (False, True):
+        segments = make_segments(400, nested=nested)
+        index = SegmentTimeIndex(segments)
+        assert index.nested == nested
+        rnd = random.Random(1)
+        for _ in range(200):
+            start = rnd.uniform(-5, 1200)
+            end = start + rnd.uniform(0, 60)
+            expected = brute_overlapping(segments, start, end)
+            assert index.count_overlapping(start, end) == len(expected)
+            pages = [index.overlapping(start, end, offset, 7) for offset in range(0, len(expected) + 7, 7)]
+            assert [s for page in pages for s in page] == expected
+
+
+def test_segment_at_and_around_markers():
+    segments = [
+        {"segment_id": 1, "sequence": 1, "start_time": 0.0, "end_time": 4.0, "content": "a"},
+        {"segment_id": 2, "sequence": 2, "start_time": 5.0, "end_time": 9.0, "content": "b"},
+        {"segment_id": 3, "sequence": 3, "start_time": 9.0, "end_time": 12.0, "content": "c"},
+        {"segment_id": 4, "sequence": 4, "start_time": 15.0, "end_time": 20.0, "content": "d"},
+    ]
+    index = SegmentTimeIndex(reversed(segments))
+
+    assert index.at(2.0)["content"] == "a"
+    assert index.at(9.0)["content"] == "c"  # the later segment wins at a shared boundary
+    assert index.at(4.5) is None
+    assert index.at(25.0) is None
+    assert [s["content"] for s in index.around(10.0, context=1)] == ["b", "c", "d"]
+    assert [s["content"] for s in index.around(0.0, context=2)] == ["a", "b", "c"]
+    assert [s["content"] for s in index.around(30.0, context=1)] == ["c", "d"]
+
+
+def test_time_index_is_cached_until_segments_change(monkeypatch):
+    loads = []
+    transcripts = SimpleNamespace(
+        select=lambda columns: SimpleNamespace(eq=lambda column, value: SimpleNamespace(
+            execute=lambda: SimpleNamespace(data=[{"status": "COMPLETED"}])))
+    )
+    monkeypatch.setattr(transcript_segment_service, "supabase", SimpleNamespace(table=lambda name: transcripts))
+    monkeypatch.setattr(TranscriptSegmentService, "iter_segments",
+                        staticmethod(lambda transcript_id: loads.append(transcript_id) or make_segments(50)))
+    transcript_segment_service.segment_index_cache.clear()
+
+    first = TranscriptSegmentService.get_segments_in_window("t1", 0, 30, limit=5)
+    TranscriptSegmentService.get_segment_at("t1", 10)
+    assert len(first["data"]) == 5 and first["total"] > 5
+    assert loads == ["t1"]
+
+    TranscriptSegmentService.invalidate_time_index("t1")
+    TranscriptSegmentService.get_segment_at("t1", 10)
+    assert loads == ["t1", "t1"]
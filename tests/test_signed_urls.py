@@ -0,0 +1,55 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.utils import signed_urls
+from app.utils.ttl_cache import TTLCache
+
+
+class FakeBucket:
+    def __init__(self, calls):
+        self.calls = calls
+
+    def create_signed_url(self, path, expires_in):
+        self.calls.append(("one", path))
+        return {"signedURL": f"https://storage/{path}?n={len(self.calls)}"}
+
+    def create_signed_urls(self, paths, expires_in):
+        self.calls.append(("batch", tuple(paths)))
+        return [{"path": p, "signedURL": f"https://storage/{p}?n={len(self.calls)}", "error": None} for p in paths]
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = []
+    fake = SimpleNamespace(storage=SimpleNamespace(from_=lambda bucket: FakeBucket(calls)))
+    monkeypatch.setattr(signed_urls, "supabase", fake)
+    monkeypatch.setattr(signed_urls, "_cache", TTLCache("signed_urls", maxsize=100, ttl=60))
+    return calls
+
+
+def test_url_is_reused_until_evicted(calls):
+    first = signed_urls.get_signed_url("exports", "u/a.pdf")
+    assert signed_urls.get_signed_url("exports", "u/a.pdf") == first
+    assert len(calls) == 1
+
+    signed_urls.evict("exports", "u/a.pdf")
+    assert signed_urls.get_signed_url("exports", "u/a.pdf") != first
+    assert len(calls) == 2
+
+    # Shorter than the safety margin: never cached
+    signed_urls.get_signed_url("exports", "u/b.pdf", expires_in=signed_urls.SAFETY_MARGIN)
+    signed_urls.get_signed_url("exports", "u/b.pdf", expires_in=signed_urls.SAFETY_MARGIN)
+    assert len(calls) == 4
+
+
+def test_batch_signs_only_missing_paths(calls):
+    cached = signed_urls.get_signed_url("exports", "u/a.pdf")
+    urls = signed_urls.get_signed_urls("exports", ["u/a.pdf", "u/b.pdf", "u/c.pdf", "u/b.pdf"])
+
+    assert urls["u/a.pdf"] == cached
+    assert set(urls) == {"u/a.pdf", "u/b.pdf", "u/c.pdf"}
+    assert calls[-1] == ("batch", ("u/b.pdf", "u/c.pdf"))
+
+    signed_urls.get_signed_urls("exports", ["u/b.pdf", "u/c.pdf"])
+    assert len(calls) == 2
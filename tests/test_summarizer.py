@@ -0,0 +1,40 @@
+import json
+
+from app.utils import summarizer
+from app.utils.disk_cache import MemoryCacheBackend
+
+
+def fake_model(calls):
+    def call(prompt: str):
+        calls.append(prompt)
+        return {"overview": f"part {len(calls)}", "key_points": [str(len(calls))], "action_items": []}
+    return call
+
+
+def test_split_transcript_keeps_speaker_turns_whole():
+    lines = [f"SPEAKER_0{i % 3 + 1}: " + "word " * 20 for i in range(30)]
+    chunks = summarizer.split_transcript("\n".join(lines), max_tokens=100)
+    assert len(chunks) > 1
+    assert all(summarizer.estimate_tokens(c) <= 100 for c in chunks)
+    assert "\n".join(chunks).split("\n") == [l for l in lines]
+
+
+def test_long_transcript_is_reduced_hierarchically_and_map_stage_is_cached():
+    text = "\n".join(f"SPEAKER_01: sentence number {i} " + "x" * 50 for i in range(400))
+    summarizer.set_partial_cache(MemoryCacheBackend(max_bytes=10 * 1024 * 1024))
+    try:
+        calls = []
+        result = summarizer.summarize_transcript(text, "MEETING", call_model=fake_model(calls),
+                                                 max_prompt_tokens=2000, chunk_tokens=500, fan_in=4)
+        first_run = len(calls)
+
+        calls.clear()
+        summarizer.summarize_transcript(text, "BULLET", call_model=fake_model(calls),
+                                        max_prompt_tokens=2000, chunk_tokens=500, fan_in=4)
+    finally:
+        summarizer.set_partial_cache(None)
+
+    assert set(result) == {"overview", "key_points", "action_items"}
+    assert first_run > 20
+    # only the style-specific final reduce runs again
+    assert len(calls) == 1 and "BULLET" in calls[0]
@@ -0,0 +1,40 @@
+import json
+
+from app.utils import transcriber, transcription_cache
+from app.utils.disk_cache import DiskCacheBackend, MemoryCacheBackend
+
+
+def test_identical_audio_skips_the_model(monkeypatch):
+    calls = []
+
+    def fake_transcribe(audio_bytes, file_extension):
+        calls.append(audio_bytes)
+        return json.dumps([{"speaker_label": "SPEAKER_01", "start_time": 0, "end_time": 1, "content": "hi"}])
+
+    monkeypatch.setattr(transcriber, "transcribe", fake_transcribe)
+    transcription_cache.set_backend(MemoryCacheBackend(max_bytes=1024 * 1024))
+    try:
+        first = transcription_cache.transcribe(b"audio", "mp3")
+        second = transcription_cache.transcribe(b"audio", "mp3")
+        transcription_cache.transcribe(b"other audio", "mp3")
+        stats = transcription_cache.stats()
+    finally:
+        transcription_cache.set_backend(None)
+
+    assert first == second
+    assert len(calls) == 2
+    assert stats["hits"] == 1 and stats["misses"] == 2
+
+
+def test_disk_backend_evicts_least_recently_used(tmp_path):
+    cache = DiskCacheBackend(str(tmp_path), max_bytes=10)
+    cache.set("a", b"aaaa")
+    cache.set("b", b"bbbb")
+    assert cache.get("a") == b"aaaa"  # "b" is now the oldest
+    cache.set("c", b"cccc")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"aaaa"
+    assert cache.size_bytes() == 8
+    # index is rebuilt from disk
+    assert DiskCacheBackend(str(tmp_path), max_bytes=10).size_bytes() == 8
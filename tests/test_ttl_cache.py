@@ -0,0 +1,82 @@
+import asyncio
+import threading
+import time
+
+from app.utils.ttl_cache import TTLCache
+
+
+def test_entries_expire_and_are_bounded():
+    cache = TTLCache("t", maxsize=2, ttl=0.05)
+    loads = []
+
+    def loader(key):
+        loads.append(key)
+        return f"value-{key}"
+
+    assert cache.get_or_load("a", lambda: loader("a")) == "value-a"
+    assert cache.get_or_load("a", lambda: loader("a")) == "value-a"
+    cache.get_or_load("b", lambda: loader("b"))
+    cache.get_or_load("c", lambda: loader("c"))  # evicts "a"
+    assert cache.get("a") is None
+    time.sleep(0.06)
+    assert cache.get("c") is None
+
+    stats = cache.stats()
+    assert loads == ["a", "b", "c"]
+    assert stats["hits"] == 1 and stats["misses"] == 3 and stats["evictions"] == 1
+
+
+def test_concurrent_misses_share_one_load():
+    cache = TTLCache("t", maxsize=10, ttl=60)
+    calls = []
+    release = threading.Event()
+
+    def loader():
+        calls.append(1)
+        release.wait(1)
+        return {"tier_id": 1}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_load(1, loader))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert results == [{"tier_id": 1}] * 8
+
+
+def test_invalidation_drops_entry_and_in_flight_result():
+    cache = TTLCache("t", maxsize=10, ttl=60)
+    cache.set("u1", "old")
+    cache.invalidate("u1")
+    assert cache.get("u1") is None
+
+    def loader():
+        cache.invalidate("u1")  # an update lands while the read is in flight
+        return "stale"
+
+    assert cache.get_or_load("u1", loader) == "stale"
+    assert cache.get("u1") is None
+    assert cache.get_or_load("missing", lambda: None) is None
+    assert cache.stats()["size"] == 0
+
+
+def test_async_concurrent_misses_share_one_load():
+    cache = TTLCache("t", maxsize=10, ttl=60)
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"user_id": "u1"}
+
+    async def run():
+        return await asyncio.gather(*(cache.aget_or_load("u1", loader) for _ in range(8)))
+
+    assert asyncio.run(run()) == [{"user_id": "u1"}] * 8
+    assert len(calls) == 1
+    assert cache.get("u1") == {"user_id": "u1"}
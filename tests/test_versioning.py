@@ -0,0 +1,112 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import recording_service, summary_service
+from app.services.export_job_service import ExportJobService
+from app.services.recording_service import RecordingService
+from app.services.search_service import SearchService
+from app.services.summary_service import SummaryService
+from app.services.transcript_service import TranscriptService
+from app.utils import bulk_writer, chunked_transcriber, summarizer, transcription_cache, versioning
+from app.utils.compact_transcript import CompactTranscript
+from app.utils.versioning import SQLiteVersionStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteVersionStore(str(tmp_path / "versions.sqlite3"))
+    versioning.set_store(store)
+    yield store
+    versioning.set_store(None)
+
+
+def test_versions_are_sequential_with_one_current(store):
+    for _ in range(3):
+        store.create_version("transcripts", "r1", {"type": "AI_ORIGINAL", "language": "vi"})
+    store.create_version("transcripts", "r2", {"type": "AI_ORIGINAL"})
+
+    versions = store.list_versions("transcripts", "r1")
+    assert [v["version_no"] for v in versions] == [1, 2, 3]
+    assert [v["is_active"] for v in versions] == [False, False, True]
+    assert versions[0]["language"] == "vi"
+    assert [v["version_no"] for v in store.list_versions("transcripts", "r2")] == [1]
+
+
+def test_inactive_version_waits_for_activation(store):
+    first = store.create_version("transcripts", "r1", {"type": "AI_ORIGINAL"})
+    second = store.create_version("transcripts", "r1", {"type": "AI_ORIGINAL"}, activate=False)
+
+    assert second["version_no"] == 2 and second["is_active"] is False
+    assert [v["transcript_id"] for v in store.list_versions("transcripts", "r1") if v["is_active"]] == [first["transcript_id"]]
+
+    assert store.activate_version("transcripts", "r1", second["transcript_id"])["is_active"] is True
+    assert [v["transcript_id"] for v in store.list_versions("transcripts", "r1") if v["is_active"]] == [second["transcript_id"]]
+    assert store.activate_version("transcripts", "r2", second["transcript_id"]) is None
+
+
+def test_failed_transcription_keeps_the_previous_version_active(store, monkeypatch):
+    previous = store.create_version("transcripts", "r1", {"type": "AI_ORIGINAL", "status": "COMPLETED"})
+    updates = []
+
+    def table(name):
+        def update(values):
+            return SimpleNamespace(eq=lambda column, value: SimpleNamespace(execute=lambda: updates.append((value, values))))
+        return SimpleNamespace(update=update)
+
+    storage = SimpleNamespace(from_=lambda bucket: SimpleNamespace(download=lambda path: b"audio"))
+    monkeypatch.setattr(recording_service, "supabase", SimpleNamespace(table=table, storage=storage))
+    monkeypatch.setattr(RecordingService, "_fetch_transcribable",
+                        staticmethod(lambda recording_id: {"recording_id": recording_id, "user_id": "u1", "file_path": "u1/r1.mp3"}))
+    monkeypatch.setattr(chunked_transcriber, "should_chunk", lambda duration, ext: False)
+    monkeypatch.setattr(transcription_cache, "transcribe",
+                        lambda audio, ext: '[{"start_time": 0, "end_time": 1, "content": "Xin chao", "speaker_label": "SPEAKER_01"}]')
+    monkeypatch.setattr(RecordingService, "_finish_transcription", staticmethod(lambda *args: None))
+
+    def rejected(table, rows, **kwargs):
+        raise RuntimeError("segment insert failed")
+
+    monkeypatch.setattr(bulk_writer, "upsert_rows", rejected)
+    with pytest.raises(RuntimeError):
+        RecordingService.transcribe_recording("r1")
+
+    failed = store.list_versions("transcripts", "r1")[-1]
+    assert [v["transcript_id"] for v in store.list_versions("transcripts", "r1") if v["is_active"]] == [previous["transcript_id"]]
+    assert failed["status"] == "PROCESSING" and (failed["transcript_id"], {"status": "FAILED"}) in updates
+
+    monkeypatch.setattr(bulk_writer, "upsert_rows", lambda table, rows, **kwargs: rows)
+    completed = RecordingService.transcribe_recording("r1")
+
+    assert completed["version_no"] == 3 and completed["is_active"] is True
+    assert [v["version_no"] for v in store.list_versions("transcripts", "r1") if v["is_active"]] == [3]
+    assert (completed["transcript_id"], {"status": "COMPLETED", "progress": 1}) in updates
+
+
+def test_parallel_summary_generations_get_distinct_versions(store, monkeypatch):
+    parallel = 20
+    barrier = threading.Barrier(parallel)
+
+    def summarize(text, style):
+        # Every generation reaches the versioning step at the same time
+        barrier.wait(timeout=10)
+        return {"overview": style}
+
+    monkeypatch.setattr(summarizer, "summarize_transcript", summarize)
+    monkeypatch.setattr(TranscriptService, "get_transcripts_by_recording_id",
+                        staticmethod(lambda recording_id, latest=False: [{"transcript_id": "t1"}]))
+    monkeypatch.setattr(TranscriptService, "get_compact_transcript", staticmethod(lambda transcript_id: CompactTranscript.from_rows([])))
+    monkeypatch.setattr(ExportJobService, "collect_stale_artifacts", staticmethod(lambda *args: None))
+    monkeypatch.setattr(SearchService, "index_summary", staticmethod(lambda *args, **kwargs: None))
+    monkeypatch.setattr(summary_service, "create_audit_log", lambda **entry: None)
+    ai_usage = SimpleNamespace(insert=lambda row: SimpleNamespace(execute=lambda: None))
+    monkeypatch.setattr(summary_service, "supabase", SimpleNamespace(table=lambda name: ai_usage))
+
+    with ThreadPoolExecutor(parallel) as pool:
+        summaries = list(pool.map(lambda i: SummaryService.generate_summary("r1", f"STYLE_{i}"), range(parallel)))
+
+    assert sorted(s["version_no"] for s in summaries) == list(range(1, parallel + 1))
+    versions = store.list_versions("summaries", "r1")
+    assert len(versions) == parallel
+    assert [v["version_no"] for v in versions if v["is_latest"]] == [parallel]